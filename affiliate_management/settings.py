@@ -55,6 +55,7 @@ INSTALLED_APPS = [
     'apps.validation',
     'apps.dashboard',
     'apps.users',
+    'apps.core',
     'django.contrib.humanize',
     # Ensure 'users' app is in INSTALLED_APPS for custom templatetags
 ]
@@ -171,3 +172,18 @@ DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000  # Default is 1000
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760   # 10MB
 
+# Offers matcher: MatchHistory rows are written in bulk batches of this size.
+# Set OFFERS_MATCHER_DEFER_HISTORY to write them after the response is sent.
+OFFERS_MATCHER_HISTORY_BATCH_SIZE = 500
+OFFERS_MATCHER_DEFER_HISTORY = False
+
+# Engine for the default offers matcher results: 'precomputed' (matches recorded
+# on write), 'python' or 'pandas'. See apps/offers/engines.py.
+OFFERS_MATCHER_ENGINE = 'precomputed'
+
+# Matcher result cache, keyed by the search and the matcher data version.
+# BACKEND: 'lru' (per process), 'django' (uses CACHES[ALIAS]) or 'none'.
+OFFERS_MATCHER_CACHE = {
+    'BACKEND': 'lru',
+    'MAX_ENTRIES': 128,
+}
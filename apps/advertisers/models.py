@@ -43,4 +43,17 @@ class Advertiser(models.Model):
     def save(self, *args, **kwargs):
         # Run validation before saving
         self.full_clean()  # This calls clean() and validates all fields
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+        # Company names take part in matching and in the DRS form options
+        from apps.offers.models import MatcherDataVersion
+        from apps.drs.models import ChoiceCatalogVersion
+        MatcherDataVersion.bump()
+        ChoiceCatalogVersion.bump()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from apps.offers.models import MatcherDataVersion
+        from apps.drs.models import ChoiceCatalogVersion
+        MatcherDataVersion.bump()
+        ChoiceCatalogVersion.bump()
+        return result
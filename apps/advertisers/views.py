@@ -3,8 +3,9 @@ from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from .models import Advertiser
 from .forms import AdvertiserForm
-from django.db.models import Count
+from django.db.models import Count, Max
 from apps.offers.models import Offer
+from apps.offers.incremental import record_offer_matches
 from django.views.generic import TemplateView
 from django.http import JsonResponse
 from django.template.loader import render_to_string
@@ -426,13 +427,21 @@ class AdvertiserOfferUploadView(TemplateView):
                     if offers_to_create:
                         try:
                             with transaction.atomic():
+                                last_id = Offer.objects.aggregate(last_id=Max('id'))['last_id'] or 0
                                 # Create in batches to avoid memory issues
                                 batch_size = 100
                                 for i in range(0, len(offers_to_create), batch_size):
                                     batch = offers_to_create[i:i + batch_size]
+                                    for offer in batch:
+                                        offer.refresh_search_fields()
                                     created_offers = Offer.objects.bulk_create(batch, ignore_conflicts=False)
                                     created_count += len(batch)
                                     logger.info(f"Created batch {i//batch_size + 1}: {len(batch)} offers")
+                                # bulk_create skips save(), so index the new offers here.
+                                # MySQL does not return ids from bulk_create; find them by id instead.
+                                new_offers = list(Offer.objects.filter(advertiser=advertiser, id__gt=last_id))
+                                Offer.sync_search_index(new_offers)
+                                record_offer_matches(new_offers)
                         
                         except Exception as e:
                             logger.error(f"Error during bulk create: {e}")
@@ -0,0 +1,33 @@
+"""
+Streaming CSV responses, shared by the DRS and matcher exports.
+
+MySQLdb buffers whole result sets on the client, so a bare .iterator()
+would still hold every row in memory. The exports therefore read their
+rows in bounded keyset chunks and hand them to stream_csv(), which writes
+each line to the response as it is produced.
+"""
+import csv
+
+from django.http import StreamingHttpResponse
+
+
+class Echo:
+    """File-like object whose write() hands the CSV line back, for streaming."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, filename, header=None):
+    """StreamingHttpResponse writing `header` (if given), then `rows` (an iterable of sequences) as CSV."""
+    writer = csv.writer(Echo())
+
+    def lines():
+        if header is not None:
+            yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
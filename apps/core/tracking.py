@@ -0,0 +1,111 @@
+"""
+Dirty-field tracking for models whose save() needs the stored values.
+
+TrackedFieldsMixin snapshots the concrete field values an instance is
+loaded with (from_db, refresh_from_db) and after every save, so save paths
+can ask what changed without reading their own row again:
+
+  * changed_fields - names of the fields that differ from the stored values
+  * old_value(name) - the stored value of a field
+
+save() of a loaded instance writes only the changed columns (plus auto_now
+ones) and skips the UPDATE when nothing changed. New instances, and
+instances built by hand with a pk, are written in full as before; their
+old_value() falls back to one read of the row.
+"""
+from django.db import models
+
+
+class TrackedFieldsMixin(models.Model):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_fields()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot_fields(fields)
+
+    def save(self, *args, **kwargs):
+        if not args and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = self.changed_update_fields()
+        super().save(*args, **kwargs)
+        self._snapshot_fields(kwargs.get('update_fields'))
+
+    def _snapshot_fields(self, names=None):
+        """Record the current values of the loaded fields (of `names` only, when given) as stored."""
+        if not hasattr(self, '_loaded_values'):
+            self._loaded_values = {}
+        names = None if names is None else set(names)
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue  # deferred
+            if names is None or field.name in names or field.attname in names:
+                self._loaded_values[field.attname] = self.__dict__[field.attname]
+
+    def _tracked(self):
+        """Whether the snapshot describes the row this instance saves to (not a new row or a copy)."""
+        loaded = getattr(self, '_loaded_values', None)
+        return (
+            not self._state.adding and self.pk is not None and loaded is not None
+            and loaded.get(self._meta.pk.attname) == self.pk
+        )
+
+    def _field_changed(self, field):
+        value = self.__dict__[field.attname]
+        if field.attname not in self._loaded_values:
+            return True
+        if getattr(value, '_committed', True) is False:
+            return True  # newly assigned file, not in storage yet
+        return value != self._loaded_values[field.attname]
+
+    @property
+    def changed_fields(self):
+        """
+        Names of the concrete fields whose value differs from the stored one;
+        every field for a new instance (or a copy with its pk cleared) and
+        for one not loaded from the database.
+        """
+        fields = [field for field in self._meta.concrete_fields if not field.primary_key]
+        if not self._tracked():
+            return {field.name for field in fields}
+        return {
+            field.name for field in fields
+            if field.attname in self.__dict__ and self._field_changed(field)
+        }
+
+    def changed_update_fields(self):
+        """
+        update_fields that write only the changed columns (and the auto_now
+        ones along with them), or None when the whole row must be written.
+        """
+        if not self._tracked():
+            return None
+        changed = self.changed_fields
+        if changed:
+            changed |= {
+                field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)
+            }
+        return changed
+
+    def old_value(self, name):
+        """Stored value of field `name` (attnames such as 'drs_id' work too); None for a new instance."""
+        field = self._meta.get_field(name)
+        if self.pk is None:
+            return None
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is not None and loaded.get(self._meta.pk.attname) != self.pk:
+            loaded = None  # snapshot of another row (pk reassigned)
+        if loaded is None or field.attname not in loaded:
+            # Not loaded through the ORM (or deferred): read the row once
+            stored = type(self)._base_manager.filter(pk=self.pk).values(
+                *(f.attname for f in self._meta.concrete_fields)
+            ).first()
+            if stored is None:
+                return None
+            loaded = self._loaded_values = {**stored, **(loaded or {})}
+        return loaded[field.attname]
@@ -0,0 +1,28 @@
+"""
+Single-row version counters for in-process caches.
+
+Each cache (matcher results, DRS form choices, currency rates) owns a
+concrete subclass of VersionCounter; writers bump() it and readers compare
+current() with the version their cached data was built from.
+"""
+from django.db import models
+from django.db.models import F
+
+
+class VersionCounter(models.Model):
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self._meta.verbose_name.capitalize()} {self.version}"
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=F('version') + 1):
+            cls.objects.get_or_create(pk=1, defaults={'version': 1})
@@ -5,10 +5,20 @@ from apps.advertisers.models import Advertiser
 from apps.publishers.models import Publisher
 from apps.offers.models import Offer
 from apps.invoicing.models import Invoice
-from django.db.models import Sum
-from django.utils.timezone import now, timedelta
+from django.db.models import Q, Sum
+from django.utils.timezone import now, timedelta, make_aware
+from datetime import datetime, time
 import json
 
+def _day_start(day):
+    """Start of `day` in the current time zone (what created_at__date compares against)."""
+    return make_aware(datetime.combine(day, time.min))
+
+
+def _created_on(day):
+    return {'created_at__gte': _day_start(day), 'created_at__lt': _day_start(day + timedelta(days=1))}
+
+
 # -- FULL ADMIN DASHBOARD (Admins/Subadmins Only)
 @login_required
 @role_required(['admin', 'subadmin'])
@@ -30,9 +40,10 @@ def dashboard_view(request):
     unpaid_invoices = Invoice.objects.filter(status='Pending').count()
     overdue_invoices = Invoice.objects.filter(status='Overdue').count()
 
-    today_revenue = Invoice.objects.filter(created_at__date=today).aggregate(total=Sum('drs__campaign_revenue'))['total'] or 0
-    week_revenue = Invoice.objects.filter(created_at__date__gte=start_of_week).aggregate(total=Sum('drs__campaign_revenue'))['total'] or 0
-    month_revenue = Invoice.objects.filter(created_at__date__gte=start_of_month).aggregate(total=Sum('drs__campaign_revenue'))['total'] or 0
+    # Datetime ranges rather than created_at__date, so the created_at index is usable
+    today_revenue = Invoice.objects.filter(**_created_on(today)).aggregate(total=Sum('drs__campaign_revenue'))['total'] or 0
+    week_revenue = Invoice.objects.filter(created_at__gte=_day_start(start_of_week)).aggregate(total=Sum('drs__campaign_revenue'))['total'] or 0
+    month_revenue = Invoice.objects.filter(created_at__gte=_day_start(start_of_month)).aggregate(total=Sum('drs__campaign_revenue'))['total'] or 0
 
     # Ensure numbers are simple floats for templates
     today_revenue = float(today_revenue)
@@ -43,8 +54,8 @@ def dashboard_view(request):
     daily_stats = []
     for i in range(7):
         day = today - timedelta(days=i)
-        day_revenue = Invoice.objects.filter(created_at__date=day).aggregate(total=Sum('drs__campaign_revenue'))['total'] or 0
-        day_profit = Invoice.objects.filter(created_at__date=day).aggregate(total=Sum('drs__profit'))['total'] or 0
+        day_revenue = Invoice.objects.filter(**_created_on(day)).aggregate(total=Sum('drs__campaign_revenue'))['total'] or 0
+        day_profit = Invoice.objects.filter(**_created_on(day)).aggregate(total=Sum('drs__profit'))['total'] or 0
         daily_stats.append({'date': day.strftime('%Y-%m-%d'), 'revenue': float(day_revenue), 'profit': float(day_profit)})
     daily_stats.reverse()
 
@@ -79,7 +90,7 @@ def publisher_dashboard(request):
     print("Role: {}".format(request.user.role))
     
     # Import models
-    from apps.drs.models import DailyRevenueSheet
+    from apps.drs.models import DailyRevenueSheet, DRSDailyRollup
     from apps.validation.models import Validation
     
     user = request.user
@@ -112,13 +123,13 @@ def publisher_dashboard(request):
         
         # Option 4: Directly from DRS if there's a publisher relation
         elif hasattr(DailyRevenueSheet, 'publisher') and hasattr(user, 'publisher'):
-            total_income = DailyRevenueSheet.objects.filter(publisher=user.publisher).aggregate(
+            total_income = DRSDailyRollup.objects.filter(publisher=user.publisher).aggregate(
                 total=Sum('campaign_revenue')
             )['total'] or 0
         
         # Option 5: Fallback - get all DRS records (you might want to filter this better)
         else:
-            total_income = DailyRevenueSheet.objects.aggregate(
+            total_income = DRSDailyRollup.objects.aggregate(
                 total=Sum('campaign_revenue')
             )['total'] or 0
             
@@ -153,17 +164,15 @@ def publisher_dashboard(request):
             ).aggregate(total=Sum('campaign_revenue'))['total'] or 0
             
         elif hasattr(DailyRevenueSheet, 'start_date'):
-            today_revenue = DailyRevenueSheet.objects.filter(
-                start_date=today
-            ).aggregate(total=Sum('campaign_revenue'))['total'] or 0
-            
-            week_revenue = DailyRevenueSheet.objects.filter(
-                start_date__gte=start_of_week
-            ).aggregate(total=Sum('campaign_revenue'))['total'] or 0
-            
-            month_revenue = DailyRevenueSheet.objects.filter(
-                start_date__gte=start_of_month
-            ).aggregate(total=Sum('campaign_revenue'))['total'] or 0
+            # One query over the daily rollups instead of three over the DRS table
+            periods = DRSDailyRollup.objects.filter(day__gte=min(start_of_week, start_of_month)).aggregate(
+                today=Sum('campaign_revenue', filter=Q(day=today)),
+                week=Sum('campaign_revenue', filter=Q(day__gte=start_of_week)),
+                month=Sum('campaign_revenue', filter=Q(day__gte=start_of_month)),
+            )
+            today_revenue = periods['today'] or 0
+            week_revenue = periods['week'] or 0
+            month_revenue = periods['month'] or 0
             
         elif hasattr(DailyRevenueSheet, 'created_at'):
             today_revenue = DailyRevenueSheet.objects.filter(
@@ -227,44 +236,27 @@ def publisher_dashboard(request):
         submitted_reports_count = 0
         pending_invoices_count = 0
     
-    # Generate chart data for last 7 days
+    # Generate chart data for last 7 days, from one grouped query over the daily rollups
+    week_rollups = DRSDailyRollup.objects.filter(day__gt=today - timedelta(days=7), day__lte=today)
+    if hasattr(user, 'publisher'):
+        week_rollups = week_rollups.filter(publisher=user.publisher)
+    try:
+        per_day = {
+            row['day']: row
+            for row in week_rollups.values('day').annotate(revenue=Sum('campaign_revenue'), profit=Sum('profit'))
+        }
+    except Exception as e:
+        print(f"Error calculating daily revenue: {e}")
+        per_day = {}
+
     daily_stats = []
     for i in range(7):
         day = today - timedelta(days=i)
-        try:
-            # Determine which date field to use
-            if hasattr(DailyRevenueSheet, 'date'):
-                day_filter = {'date': day}
-            elif hasattr(DailyRevenueSheet, 'start_date'):
-                day_filter = {'start_date': day}
-            elif hasattr(DailyRevenueSheet, 'created_at'):
-                day_filter = {'created_at__date': day}
-            else:
-                day_revenue = day_profit = 0
-                
-            if 'day_filter' in locals():
-                # Filter by publisher if user has one
-                if hasattr(user, 'publisher'):
-                    day_filter['publisher'] = user.publisher
-                
-                day_revenue = DailyRevenueSheet.objects.filter(
-                    **day_filter
-                ).aggregate(total=Sum('campaign_revenue'))['total'] or 0
-                
-                day_profit = DailyRevenueSheet.objects.filter(
-                    **day_filter
-                ).aggregate(total=Sum('profit'))['total'] or 0
-            else:
-                day_revenue = day_profit = 0
-                
-        except Exception as e:
-            print(f"Error calculating day {day} revenue: {e}")
-            day_revenue = day_profit = 0
-            
+        totals = per_day.get(day, {})
         daily_stats.append({
             'date': day.strftime('%Y-%m-%d'), 
-            'revenue': float(day_revenue), 
-            'profit': float(day_profit)
+            'revenue': float(totals.get('revenue') or 0), 
+            'profit': float(totals.get('profit') or 0)
         })
     
     daily_stats.reverse()
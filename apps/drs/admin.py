@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import DailyRevenueSheet
+from .models import ROLLUP_KEY_FIELDS, DailyRevenueSheet
+from .rollups import refresh_rollups
 
 @admin.register(DailyRevenueSheet)
 class DailyRevenueSheetAdmin(admin.ModelAdmin):
@@ -16,6 +17,12 @@ class DailyRevenueSheetAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         # Only select related on actual ForeignKey fields
         return super().get_queryset(request).select_related('advertiser', 'publisher')
+
+    def delete_queryset(self, request, queryset):
+        # Bulk delete skips DailyRevenueSheet.delete(); refresh the rollups it touched
+        keys = set(queryset.order_by().values_list(*ROLLUP_KEY_FIELDS).distinct())
+        super().delete_queryset(request, queryset)
+        refresh_rollups(keys)
     
     fieldsets = (
         ('Campaign Information', {
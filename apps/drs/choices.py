@@ -0,0 +1,77 @@
+"""
+Cached option lists for DailyRevenueSheetForm.
+
+Building the account manager list means reading every user and scanning the
+DRS table for account managers that are not users (any more). The lists are
+built once per ChoiceCatalogVersion and kept in process; a form only checks
+the version (one indexed lookup) and copies the lists. The version is bumped
+by User, DailyRevenueSheet, Advertiser and Publisher saves/deletes and by
+the DRS bulk import.
+"""
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from apps.advertisers.models import Advertiser
+from apps.publishers.models import Publisher
+
+from .models import ChoiceCatalogVersion, DailyRevenueSheet
+
+EMPTY_CHOICE = ('', '---------')
+
+_lock = threading.Lock()
+_cache = {'version': None, 'catalogs': None}
+
+
+def _account_managers():
+    User = get_user_model()
+    roles = dict(User.ROLE_CHOICES)
+
+    choices = [EMPTY_CHOICE]
+    seen = set()
+    users = User.objects.order_by('username').values_list('username', 'first_name', 'last_name', 'role')
+    for username, first_name, last_name, role in users:
+        display_name = username
+        full_name = f"{first_name} {last_name}".strip()
+        if full_name:
+            display_name = f"{username} - {full_name}"
+        display_name = f"{display_name} ({roles.get(role, role)})"
+        choices.append((username, display_name))
+        seen.add(username)
+
+    # Account managers on DRS rows that are not (or no longer) users
+    existing_managers = DailyRevenueSheet.objects.exclude(
+        Q(account_manager__isnull=True) | Q(account_manager='')
+    ).values_list('account_manager', flat=True).distinct()
+    for manager in existing_managers:
+        if manager not in seen:
+            seen.add(manager)
+            choices.append((manager, manager))
+    return tuple(choices)
+
+
+def _companies(model):
+    return (EMPTY_CHOICE,) + tuple(model.objects.order_by('id').values_list('id', 'company_name'))
+
+
+def build_catalogs():
+    return {
+        'account_manager': _account_managers(),
+        'advertiser': _companies(Advertiser),
+        'publisher': _companies(Publisher),
+    }
+
+
+def get_catalogs():
+    """{'account_manager', 'advertiser', 'publisher'} option tuples, current version."""
+    version = ChoiceCatalogVersion.current()
+    with _lock:
+        if _cache['version'] == version:
+            return _cache['catalogs']
+
+    catalogs = build_catalogs()
+    with _lock:
+        _cache['version'] = version
+        _cache['catalogs'] = catalogs
+    return catalogs
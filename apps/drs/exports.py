@@ -0,0 +1,82 @@
+"""
+Streaming DRS export.
+
+Rows come straight from `values_list` (no model instances, no FK __str__
+per row) in keyset chunks by id, which keeps memory flat for month-end
+exports of hundreds of thousands of rows (see apps.core.streaming).
+
+  * CSV  - apps.core.streaming.stream_csv, one line per row as it is read
+  * XLSX - openpyxl write-only workbook spooled to a temporary file, then
+           streamed from there
+"""
+import tempfile
+
+from django.http import FileResponse
+from django.utils import timezone
+
+from apps.core.streaming import stream_csv
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (header, values_list path), in the order of the original export; 'id' must
+# stay first (keyset column)
+COLUMNS = [
+    ('ID', 'id'),
+    ('Advertiser', 'advertiser__company_name'),
+    ('Campaign Name', 'campaign_name'),
+    ('Affiliate', 'publisher__company_name'),
+    ('Start Date', 'start_date'),
+    ('End Date', 'end_date'),
+    ('Adv Convs', 'advertiser_conversions'),
+    ('Pub Convs', 'publisher_conversions'),
+    ('Rev/Conv', 'campaign_revenue'),
+    ('Payout/Conv', 'publisher_payout'),
+    ('Revenue', 'revenue'),
+    ('Payout', 'payout'),
+    ('Profit', 'profit'),
+    ('PID', 'pid'),
+    ('af_prt', 'af_prt'),
+    ('Account Manager', 'account_manager'),
+    ('Updated', 'updated_at'),
+]
+HEADERS = [header for header, _ in COLUMNS]
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one tuple per DRS in `queryset`, by ascending id."""
+    rows = queryset.order_by('id').values_list(*(path for _, path in COLUMNS))
+    last_id = 0
+    while True:
+        chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        yield from chunk
+        last_id = chunk[-1][0]
+
+
+def csv_response(rows, filename='drs.csv'):
+    return stream_csv(rows, filename, header=HEADERS)
+
+
+def _xlsx_value(value):
+    # Excel has no time zones
+    if hasattr(value, 'tzinfo') and value.tzinfo is not None:
+        return timezone.localtime(value).replace(tzinfo=None)
+    return value
+
+
+def xlsx_response(rows, filename='drs.xlsx'):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('DRS')
+    sheet.append(HEADERS)
+    for row in rows:
+        sheet.append([_xlsx_value(value) for value in row])
+
+    spool = tempfile.TemporaryFile()
+    workbook.save(spool)
+    spool.seek(0)
+    return FileResponse(spool, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
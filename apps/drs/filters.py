@@ -0,0 +1,56 @@
+"""
+Request filters shared by the DRS list and the DRS export:
+status, advertiser, publisher and a start_date range.
+"""
+from urllib.parse import urlencode
+
+from django.utils.dateparse import parse_date
+
+from .models import DailyRevenueSheet
+
+
+def _date(value):
+    # parse_date() raises ValueError for well-formed but impossible dates (2024-02-30)
+    try:
+        return parse_date((value or '').strip())
+    except ValueError:
+        return None
+
+
+def parse_filters(params):
+    """Filters from request parameters; invalid values are dropped."""
+    filters = {
+        'status': (params.get('status') or '').strip(),
+        'advertiser': (params.get('advertiser') or '').strip(),
+        'publisher': (params.get('publisher') or '').strip(),
+        'date_from': _date(params.get('date_from')),
+        'date_to': _date(params.get('date_to')),
+    }
+    if filters['status'] not in dict(DailyRevenueSheet.STATUS_CHOICES):
+        filters['status'] = ''
+    for key in ('advertiser', 'publisher'):
+        if not filters[key].isdigit():
+            filters[key] = ''
+    return filters
+
+
+def apply_filters(queryset, filters):
+    if filters['status']:
+        queryset = queryset.filter(status=filters['status'])
+    if filters['advertiser']:
+        queryset = queryset.filter(advertiser_id=filters['advertiser'])
+    if filters['publisher']:
+        queryset = queryset.filter(publisher_id=filters['publisher'])
+    if filters['date_from']:
+        queryset = queryset.filter(start_date__gte=filters['date_from'])
+    if filters['date_to']:
+        queryset = queryset.filter(start_date__lte=filters['date_to'])
+    return queryset
+
+
+def filter_query(filters):
+    """The active filters as a query string, e.g. for export links."""
+    return urlencode({
+        key: value.isoformat() if hasattr(value, 'isoformat') else value
+        for key, value in filters.items() if value
+    })
@@ -0,0 +1,354 @@
+"""
+Bulk DRS import from CSV / XLSX.
+
+  * rows are read one at a time (csv reader over the upload, openpyxl
+    read-only mode), never loading the whole file
+  * advertiser / publisher company names are resolved with one query each
+  * revenue, payout and profit are computed row by row in Decimal
+    arithmetic, exactly as DailyRevenueSheet.save() computes them (not a
+    vectorized numpy pass: numpy has no exact decimal type):
+        revenue = advertiser_revenue if > 0 else advertiser_conversions * campaign_revenue
+        payout  = publisher_revenue  if > 0 else publisher_conversions  * publisher_payout
+        profit  = revenue - payout
+        validation_required = status in (paused, completed)
+  * amounts, derived ones included, and counts must fit their columns, so
+    a row that the database would reject is reported instead
+  * valid rows are inserted with chunked bulk_create in one transaction,
+    refreshing the daily rollups of each chunk; every rejected row is
+    reported with its row number and reasons
+
+Headers are matched case- and space-insensitively and the DRS export's
+names (Affiliate, Adv Convs, Rev/Conv, ...) are accepted; derived Revenue /
+Payout / Profit columns in the file are ignored and recomputed.
+"""
+import csv
+import io
+import logging
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from zipfile import BadZipFile
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.advertisers.models import Advertiser
+from apps.publishers.models import Publisher
+
+from .models import ChoiceCatalogVersion, DailyRevenueSheet
+from .rollups import refresh_rollups
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+# model field -> accepted headers (compared lower-cased without spaces)
+COLUMNS = {
+    'advertiser': ['advertiser'],
+    'publisher': ['affiliate', 'publisher'],
+    'campaign_name': ['campaignname', 'campaign'],
+    'start_date': ['startdate', 'start'],
+    'end_date': ['enddate', 'end'],
+    'status': ['status'],
+    'geo': ['geo'],
+    'mmp': ['mmp'],
+    'account_manager': ['accountmanager', 'amanager'],
+    'advertiser_conversions': ['advconvs', 'adv/convs', 'advertiserconversions'],
+    'publisher_conversions': ['pubconvs', 'pub/convs', 'publisherconversions'],
+    'campaign_revenue': ['rev/conv', 'campaignrevenue'],
+    'publisher_payout': ['payout/conv', 'publisherpayout'],
+    'advertiser_revenue': ['advertiserrevenue'],
+    'publisher_revenue': ['publisherrevenue'],
+    'conversions_postbacks': ['conversionspostbacks', 'postbacks'],
+    'pid': ['pid'],
+    'af_prt': ['af_prt', 'af/prt'],
+    'payable_event_name': ['payableeventname', 'payableevent'],
+}
+REQUIRED = ['advertiser', 'publisher', 'campaign_name', 'start_date', 'geo']
+DECIMAL_FIELDS = ['campaign_revenue', 'publisher_payout', 'advertiser_revenue', 'publisher_revenue']
+INTEGER_FIELDS = ['advertiser_conversions', 'publisher_conversions', 'conversions_postbacks']
+DATE_FIELDS = ['start_date', 'end_date']
+DERIVED_FIELDS = ['revenue', 'payout', 'profit']
+DATE_FORMATS = ['%d/%m/%Y', '%d-%m-%Y', '%m/%d/%Y']
+# IntegerField is a signed 32-bit column on MySQL
+MAX_INTEGER = 2 ** 31 - 1
+
+
+class ImportFileError(ValueError):
+    """The file as a whole cannot be imported (type, encoding, headers)."""
+
+
+def _header_key(value):
+    return str(value or '').strip().lower().replace(' ', '')
+
+
+def _map_headers(headers):
+    """Model field -> column index."""
+    keys = [_header_key(h) for h in headers]
+    mapping = {}
+    for field, aliases in COLUMNS.items():
+        for alias in aliases:
+            if alias in keys:
+                mapping[field] = keys.index(alias)
+                break
+    missing = [field for field in REQUIRED if field not in mapping]
+    if missing:
+        raise ImportFileError(f"Missing required column(s): {', '.join(missing)}")
+    return mapping
+
+
+def iter_rows(upload, filename):
+    """Yield (row number, {field: raw value}) from a CSV or XLSX upload."""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        upload.seek(0)
+        reader = csv.reader(io.TextIOWrapper(upload, encoding='utf-8-sig', newline=''))
+        rows = enumerate(_decoded(reader), start=1)
+    elif name.endswith(('.xlsx', '.xlsm')):
+        from openpyxl import load_workbook
+
+        upload.seek(0)
+        try:
+            workbook = load_workbook(upload, read_only=True, data_only=True)
+        except (BadZipFile, KeyError, OSError, ValueError):
+            raise ImportFileError('The file is not a readable XLSX workbook.')
+        rows = enumerate(workbook.active.iter_rows(values_only=True), start=1)
+    else:
+        raise ImportFileError('Please upload a CSV or XLSX file.')
+
+    try:
+        _, headers = next(rows)
+    except StopIteration:
+        raise ImportFileError('The file is empty.')
+    mapping = _map_headers(headers)
+
+    for row_number, values in rows:
+        if not values or not any(str(v or '').strip() for v in values):
+            continue
+        yield row_number, {
+            field: values[index] if index < len(values) else None
+            for field, index in mapping.items()
+        }
+
+
+def _decoded(reader):
+    """CSV rows, with decoding errors (raised while reading) as ImportFileError."""
+    try:
+        yield from reader
+    except UnicodeDecodeError:
+        raise ImportFileError('The CSV file is not UTF-8 encoded.')
+    except csv.Error as e:
+        raise ImportFileError(f"The CSV file cannot be read: {e}")
+
+
+def _max_amount(field_name):
+    """Exclusive bound of a DecimalField's values, e.g. 10**10 for max_digits=12, decimal_places=2."""
+    field = DailyRevenueSheet._meta.get_field(field_name)
+    return Decimal(10) ** (field.max_digits - field.decimal_places)
+
+
+def _text(value, max_length):
+    text = '' if value is None else str(value).strip()
+    if len(text) > max_length:
+        raise ValueError(f"longer than {max_length} characters")
+    return text
+
+
+def _decimal(value, max_amount):
+    if value is None or str(value).strip() == '':
+        return Decimal('0')
+    try:
+        number = Decimal(str(value).strip().replace(',', '').replace('$', ''))
+    except InvalidOperation:
+        raise ValueError(f"{value!r} is not a number")
+    if not number.is_finite():
+        raise ValueError(f"{value!r} is not a number")
+    if number != number.quantize(Decimal('0.01')):
+        raise ValueError(f"{value!r} has more than 2 decimal places")
+    if abs(number) >= max_amount:
+        raise ValueError(f"{value!r} is too large")
+    return number.quantize(Decimal('0.01'))
+
+
+def _integer(value):
+    if value is None or str(value).strip() == '':
+        return 0
+    try:
+        number = Decimal(str(value).strip().replace(',', ''))
+    except InvalidOperation:
+        raise ValueError(f"{value!r} is not a whole number")
+    if not number.is_finite() or number != number.to_integral_value():
+        raise ValueError(f"{value!r} is not a whole number")
+    if abs(number) > MAX_INTEGER:
+        raise ValueError(f"{value!r} is too large")
+    return int(number)
+
+
+def _date(value):
+    if value is None or str(value).strip() == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    try:
+        parsed = parse_date(text[:10])
+    except ValueError:
+        parsed = None
+    if parsed:
+        return parsed
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"{value!r} is not a date")
+
+
+class _Names:
+    """Company name (case-insensitive) -> id, from a single query."""
+
+    def __init__(self, model):
+        self.ids = {}
+        self.ambiguous = set()
+        for pk, company_name in model.objects.order_by('id').values_list('id', 'company_name'):
+            key = (company_name or '').strip().casefold()
+            if key in self.ids:
+                self.ambiguous.add(key)
+            else:
+                self.ids[key] = pk
+
+    def resolve(self, value):
+        key = str(value or '').strip().casefold()
+        if key in self.ambiguous:
+            raise ValueError(f"{value!r} matches more than one company")
+        try:
+            return self.ids[key]
+        except KeyError:
+            raise ValueError(f"no company named {value!r}")
+
+
+def _clean_row(raw, advertisers, publishers):
+    """Model field values of one row, or raise ValueError with all problems."""
+    cleaned, errors = {}, []
+
+    def clean(field, convert, target=None):
+        try:
+            cleaned[target or field] = convert(raw.get(field))
+        except ValueError as e:
+            errors.append(f"{field}: {e}")
+
+    clean('advertiser', advertisers.resolve, 'advertiser_id')
+    clean('publisher', publishers.resolve, 'publisher_id')
+    for field, max_length in (('campaign_name', 255), ('geo', 100), ('mmp', 100), ('account_manager', 100),
+                              ('pid', 100), ('af_prt', 100), ('payable_event_name', 255)):
+        clean(field, lambda value, max_length=max_length: _text(value, max_length))
+    for field in DECIMAL_FIELDS:
+        clean(field, lambda value, max_amount=_max_amount(field): _decimal(value, max_amount))
+    for field in INTEGER_FIELDS:
+        clean(field, _integer)
+    for field in DATE_FIELDS:
+        clean(field, _date)
+
+    status = _header_key(raw.get('status')) or 'active'
+    if status in dict(DailyRevenueSheet.STATUS_CHOICES):
+        cleaned['status'] = status
+    else:
+        errors.append(f"status: {raw.get('status')!r} is not one of {', '.join(dict(DailyRevenueSheet.STATUS_CHOICES))}")
+
+    for field in ('campaign_name', 'geo'):
+        if field in cleaned and not cleaned[field]:
+            errors.append(f"{field}: required")
+    if not cleaned.get('start_date') and 'start_date' in cleaned:
+        errors.append('start_date: required')
+    if cleaned.get('end_date') and cleaned.get('start_date') and cleaned['end_date'] < cleaned['start_date']:
+        errors.append('end_date: before start_date')
+
+    if errors:
+        raise ValueError(errors)
+
+    derive_amounts([cleaned])
+    for field in DERIVED_FIELDS:
+        if abs(cleaned[field]) >= _max_amount(field):
+            errors.append(f"{field}: {cleaned[field]} is too large")
+    if errors:
+        raise ValueError(errors)
+    return cleaned
+
+
+def derive_amounts(rows):
+    """
+    Fill revenue / payout / profit / validation_required of cleaned rows,
+    row by row with the rules and Decimal arithmetic of DailyRevenueSheet.save().
+    """
+    for row in rows:
+        if row['advertiser_revenue'] > 0:
+            revenue = row['advertiser_revenue']
+        else:
+            revenue = row['advertiser_conversions'] * row['campaign_revenue']
+        if row['publisher_revenue'] > 0:
+            payout = row['publisher_revenue']
+        else:
+            payout = row['publisher_conversions'] * row['publisher_payout']
+        row['revenue'] = revenue
+        row['payout'] = payout
+        row['profit'] = revenue - payout
+        row['validation_required'] = row['status'] in ('paused', 'completed')
+    return rows
+
+
+def _insert(rows, batch_size):
+    now = timezone.now()
+    objs = []
+    for row in rows:
+        drs = DailyRevenueSheet(**row)
+        if drs.status == 'paid':
+            drs.paid_at = now
+        objs.append(drs)
+    DailyRevenueSheet.objects.bulk_create(objs, batch_size=batch_size)
+    # bulk_create skips save(), which maintains the daily rollups
+    refresh_rollups({drs.rollup_key() for drs in objs})
+    return len(objs)
+
+
+def import_drs(upload, filename, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Import DRS rows from `upload` (a binary file object).
+
+    Returns {'rows', 'created', 'errors'}; 'errors' lists
+    {'row': row number, 'errors': [...]} for every rejected row (up to
+    MAX_REPORTED_ERRORS; 'rejected' has the full count). Raises
+    ImportFileError when the file itself is unusable.
+    """
+    advertisers = _Names(Advertiser)
+    publishers = _Names(Publisher)
+
+    total = created = rejected = 0
+    errors = []
+    pending = []
+    with transaction.atomic():
+        for row_number, raw in iter_rows(upload, filename):
+            total += 1
+            try:
+                pending.append(_clean_row(raw, advertisers, publishers))
+            except ValueError as e:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'row': row_number, 'errors': e.args[0]})
+                continue
+
+            if len(pending) >= batch_size:
+                created += len(pending) if dry_run else _insert(pending, batch_size)
+                pending = []
+
+        if pending:
+            created += len(pending) if dry_run else _insert(pending, batch_size)
+
+        # bulk_create skips save(); new account managers feed the form options
+        if created and not dry_run:
+            ChoiceCatalogVersion.bump()
+
+    logger.info(f"📥 DRS import {filename}: {created} created, {rejected} rejected of {total} row(s)")
+    return {'rows': total, 'created': created, 'rejected': rejected, 'errors': errors}
@@ -0,0 +1,108 @@
+import json
+import re
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from apps.drs.models import DailyRevenueSheet
+from apps.invoicing.models import Invoice
+from apps.publishers.models import Publisher
+from apps.validation.models import Validation
+
+
+def hot_queries():
+    """(name, queryset, table that must not be fully scanned) for the queries the views run most."""
+    publisher_id = Publisher.objects.order_by('id').values_list('id', flat=True).first() or 0
+    today = timezone.localdate()
+    day_start = timezone.make_aware(datetime.combine(today, time.min))
+    month = today.strftime('%B %Y')
+
+    drs = DailyRevenueSheet._meta.db_table
+    validation = Validation._meta.db_table
+    invoice = Invoice._meta.db_table
+    return [
+        ('DRS awaiting validation',
+         DailyRevenueSheet.objects.filter(status__in=['paused', 'completed']).order_by('-start_date'),
+         drs),
+        ('DRS awaiting validation for a publisher',
+         DailyRevenueSheet.objects.filter(status__in=['paused', 'completed'], publisher_id=publisher_id)
+         .order_by('-start_date'),
+         drs),
+        ('DRS list page (keyset)',
+         DailyRevenueSheet.objects.select_related('advertiser', 'publisher')
+         .filter(updated_at__lt=timezone.now()).order_by('-updated_at', '-id')[:51],
+         drs),
+        ('Validations of a publisher for a month',
+         Validation.objects.filter(publisher_id=publisher_id, month=month),
+         validation),
+        ('Validations by status',
+         Validation.objects.filter(status='Pending').order_by('-created_at'),
+         validation),
+        ('Dashboard revenue today',
+         Invoice.objects.filter(created_at__gte=day_start, created_at__lt=day_start + timedelta(days=1))
+         .values('drs__campaign_revenue'),
+         invoice),
+        ('Invoices by party type and status',
+         Invoice.objects.filter(party_type='publisher', status='Pending'),
+         invoice),
+        ('Invoices of a publisher by status',
+         Invoice.objects.filter(party_type='publisher', publisher_id=publisher_id, status='Pending'),
+         invoice),
+    ]
+
+
+def full_scans(plan, table):
+    """Whether `plan` (the text of queryset.explain()) reads every row of `table`."""
+    vendor = connection.vendor
+    if vendor == 'mysql':
+        found = []
+
+        def walk(node):
+            if isinstance(node, dict):
+                if node.get('table_name') == table and node.get('access_type') == 'ALL':
+                    found.append(node)
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        walk(json.loads(plan))
+        return bool(found)
+    if vendor == 'postgresql':
+        return bool(re.search(rf'Seq Scan on {re.escape(table)}\b', plan))
+    # SQLite: "SCAN <table>" without "USING [COVERING] INDEX" is a table scan
+    return any(
+        re.search(rf'\bSCAN {re.escape(table)}\b', line) and 'USING' not in line
+        for line in plan.splitlines()
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the hot DRS / Validation / Invoice queries of the views and fail when any of them '
+        'scans its whole table. Run it against a database with representative data: on nearly empty '
+        'tables the optimizer may legitimately prefer a table scan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only failing ones')
+
+    def handle(self, *args, **options):
+        explain_options = {'format': 'JSON'} if connection.vendor == 'mysql' else {}
+        failures = []
+        for name, query, table in hot_queries():
+            plan = query.explain(**explain_options)
+            scanned = full_scans(plan, table)
+            if scanned:
+                failures.append(name)
+            self.stdout.write(f"{'FULL SCAN' if scanned else 'ok':<10} {name}")
+            if scanned or options['verbose_plans']:
+                self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f"Full table scan in {len(failures)} quer{'y' if len(failures) == 1 else 'ies'}: "
+                               + ', '.join(failures))
+        self.stdout.write(self.style.SUCCESS('No full table scans.'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.drs.importer import DEFAULT_BATCH_SIZE, ImportFileError, import_drs
+
+
+class Command(BaseCommand):
+    help = 'Bulk import Daily Revenue Sheets from a CSV or XLSX file and print a per-row error report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per INSERT')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without creating rows')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, 'rb') as upload:
+                report = import_drs(upload, path, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+        except ImportFileError as e:
+            raise CommandError(str(e))
+
+        for problem in report['errors']:
+            self.stdout.write(self.style.ERROR(f"Row {problem['row']}: {'; '.join(problem['errors'])}"))
+        if report['rejected'] > len(report['errors']):
+            self.stdout.write(f"... {report['rejected'] - len(report['errors'])} more rejected row(s)")
+
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['created']} DRS row(s); rejected {report['rejected']} of {report['rows']}"
+        ))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.drs.models import DRSDailyRollup
+from apps.drs.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the DRS daily rollups from the DailyRevenueSheet table, optionally only for a '
+        'range of start dates. Run it after writes that bypass DailyRevenueSheet.save() (raw SQL, '
+        'queryset.update()) and once after adding the rollup table.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', help='First start date (YYYY-MM-DD)')
+        parser.add_argument('--date-to', help='Last start date (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        bounds = {}
+        for option in ('date_from', 'date_to'):
+            if options[option]:
+                try:
+                    bounds[option] = parse_date(options[option])
+                except ValueError:
+                    bounds[option] = None
+                if bounds[option] is None:
+                    raise CommandError(f"--{option.replace('_', '-')} must be a date (YYYY-MM-DD)")
+
+        started = time.perf_counter()
+        written = rebuild_rollups(**bounds)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} rollup row(s); {DRSDailyRollup.objects.count()} in total, "
+            f"in {time.perf_counter() - started:.2f}s"
+        ))
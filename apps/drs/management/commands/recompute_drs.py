@@ -0,0 +1,75 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min, Q
+
+from apps.drs.models import ROLLUP_KEY_FIELDS, DailyRevenueSheet
+from apps.drs.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute revenue, payout, profit and validation_required of every DRS with set-based '
+        'UPDATEs (the rules of DailyRevenueSheet.save()), in id-range chunks. Only rows whose values '
+        'change are written (and their daily rollups refreshed); updated_at is left as is.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Ids per UPDATE')
+        parser.add_argument('--dry-run', action='store_true', help='Show what would change without writing')
+        parser.add_argument('--show', type=int, default=50, help='Changed rows listed in a dry run')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        expressions = DailyRevenueSheet.derived_field_expressions()
+        stale = Q()
+        for field, expression in expressions.items():
+            stale |= ~Q(**{field: expression})
+            if field != 'validation_required':
+                stale |= Q(**{f'{field}__isnull': True})
+
+        bounds = DailyRevenueSheet.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            self.stdout.write('No Daily Revenue Sheets to recompute.')
+            return
+
+        started = time.perf_counter()
+        changed = shown = 0
+        for low in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            chunk = DailyRevenueSheet.objects.filter(id__gte=low, id__lt=low + chunk_size).filter(stale)
+            if options['dry_run']:
+                rows = chunk.order_by('id').annotate(**{f'new_{f}': e for f, e in expressions.items()}).values(
+                    'id', *expressions, *(f'new_{f}' for f in expressions)
+                )
+                for row in rows:
+                    changed += 1
+                    if shown < options['show']:
+                        shown += 1
+                        self.stdout.write(self._diff(row, expressions))
+            else:
+                with transaction.atomic():
+                    # update() skips save(); refresh the rollups of the rows it changes
+                    keys = set(chunk.order_by().values_list(*ROLLUP_KEY_FIELDS).distinct())
+                    changed += chunk.update(**expressions)
+                    refresh_rollups(keys)
+
+        if options['dry_run'] and changed > shown:
+            self.stdout.write(f"... and {changed - shown} more")
+        verb = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {changed} Daily Revenue Sheet(s) (ids {bounds['low']}-{bounds['high']}) "
+            f"in {time.perf_counter() - started:.2f}s"
+        ))
+
+    def _diff(self, row, expressions):
+        changes = [
+            f"{field} {self._format(row[field])} -> {self._format(row[f'new_{field}'])}"
+            for field in expressions
+            if self._format(row[field]) != self._format(row[f'new_{field}'])
+        ]
+        return f"DRS #{row['id']}: " + ', '.join(changes)
+
+    def _format(self, value):
+        return f"{value:.2f}" if isinstance(value, Decimal) else str(value)
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advertisers', '0007_remove_advertiser_unique_advertiser_email'),
+        ('drs', '0006_choicecatalogversion'),
+        ('invoicing', '0014_invoice_validation_alter_invoice_drs'),
+        ('publishers', '0011_wishlistnamegram'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyrevenuesheet',
+            index=models.Index(fields=['status', 'start_date'], name='drs_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyrevenuesheet',
+            index=models.Index(fields=['publisher', 'status', 'start_date'], name='drs_pub_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyrevenuesheet',
+            index=models.Index(fields=['updated_at', 'id'], name='drs_updated_id_idx'),
+        ),
+    ]
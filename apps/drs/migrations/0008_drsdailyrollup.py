@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advertisers', '0007_remove_advertiser_unique_advertiser_email'),
+        ('drs', '0007_dailyrevenuesheet_drs_status_start_idx_and_more'),
+        ('publishers', '0011_wishlistnamegram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DRSDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('active', 'Active'), ('paused', 'Paused'), ('completed', 'Completed'), ('paid', 'Paid')], max_length=20)),
+                ('drs_count', models.PositiveIntegerField(default=0)),
+                ('advertiser_conversions', models.BigIntegerField(default=0)),
+                ('publisher_conversions', models.BigIntegerField(default=0)),
+                ('campaign_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('payout', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('profit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('advertiser', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='drs_rollups', to='advertisers.advertiser')),
+                ('publisher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='drs_rollups', to='publishers.publisher')),
+            ],
+            options={
+                'verbose_name': 'DRS Daily Rollup',
+                'verbose_name_plural': 'DRS Daily Rollups',
+                'indexes': [models.Index(fields=['status', 'day'], name='drs_rollup_status_day_idx'), models.Index(fields=['publisher', 'status', 'day'], name='drs_rollup_pub_status_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'publisher', 'advertiser', 'status'), name='drs_rollup_key_uniq')],
+            },
+        ),
+    ]
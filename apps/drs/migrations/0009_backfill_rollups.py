@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+CENT = Decimal('0.01')
+
+# The rollup totals as of this migration (frozen copy of apps.drs.rollups.AGGREGATES)
+AGGREGATES = {
+    'drs_count': Count('id'),
+    'advertiser_conversions': Coalesce(Sum('advertiser_conversions'), 0),
+    'publisher_conversions': Coalesce(Sum('publisher_conversions'), 0),
+    'campaign_revenue': Coalesce(Sum('campaign_revenue'), Decimal('0')),
+    'revenue': Coalesce(Sum('revenue'), Decimal('0')),
+    'payout': Coalesce(Sum('payout'), Decimal('0')),
+    'profit': Coalesce(Sum('profit'), Decimal('0')),
+}
+
+
+def backfill(apps, schema_editor):
+    """Fill DRSDailyRollup from the DRS rows saved before it existed"""
+    DailyRevenueSheet = apps.get_model('drs', 'DailyRevenueSheet')
+    DRSDailyRollup = apps.get_model('drs', 'DRSDailyRollup')
+
+    totals = (
+        DailyRevenueSheet.objects.order_by()
+        .values('start_date', 'publisher_id', 'advertiser_id', 'status')
+        .annotate(**AGGREGATES)
+    )
+    batch = []
+    for row in totals.iterator(chunk_size=BATCH_SIZE):
+        batch.append(DRSDailyRollup(
+            day=row['start_date'], publisher_id=row['publisher_id'],
+            advertiser_id=row['advertiser_id'], status=row['status'],
+            # Back to the columns' 2 places (SQLite sums decimals in floating point)
+            **{f: row[f].quantize(CENT) if isinstance(row[f], Decimal) else row[f] for f in AGGREGATES},
+        ))
+        if len(batch) >= BATCH_SIZE:
+            DRSDailyRollup.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        DRSDailyRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drs', '0008_drsdailyrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,23 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models.functions import Coalesce, Round
 from django.contrib.auth import get_user_model
 
+from apps.core.tracking import TrackedFieldsMixin
+from apps.core.versioning import VersionCounter
+
 User = get_user_model()
 
-class DailyRevenueSheet(models.Model):
+# DailyRevenueSheet fields that identify its DRSDailyRollup row
+ROLLUP_KEY_FIELDS = ('start_date', 'publisher_id', 'advertiser_id', 'status')
+# ... and every field its rollup totals are computed from
+ROLLUP_SOURCE_FIELDS = {
+    'start_date', 'publisher', 'advertiser', 'status',
+    'advertiser_conversions', 'publisher_conversions', 'campaign_revenue', 'revenue', 'payout', 'profit',
+}
+
+class DailyRevenueSheet(TrackedFieldsMixin, models.Model):
     # Update STATUS_CHOICES to include the full flow
     STATUS_CHOICES = [
         ('active', 'Active'),
@@ -94,8 +108,79 @@ class DailyRevenueSheet(models.Model):
         if self.status == 'paid' and not self.paid_at:
             self.paid_at = models.DateTimeField(auto_now=True)
         
+        previous_key = self._rollup_key_in_db()
+        # What this save writes: the changed columns of a loaded row (nothing
+        # when it is unchanged), or the whole row
+        if kwargs.get('update_fields') is not None:
+            changed = {self._meta.get_field(name).name for name in kwargs['update_fields']}
+        else:
+            changed = self.changed_fields
         super().save(*args, **kwargs)
 
+        if 'account_manager' in changed:
+            # Account managers on DRS rows feed the form's choice catalog
+            ChoiceCatalogVersion.bump()
+        if changed & ROLLUP_SOURCE_FIELDS:
+            from apps.drs.rollups import refresh_rollups
+            refresh_rollups({previous_key, self.rollup_key()} - {None})
+
+    def delete(self, *args, **kwargs):
+        key = self._rollup_key_in_db()
+        result = super().delete(*args, **kwargs)
+        ChoiceCatalogVersion.bump()
+
+        from apps.drs.rollups import refresh_rollups
+        refresh_rollups({key} - {None})
+        return result
+
+    def rollup_key(self):
+        """(start_date, publisher_id, advertiser_id, status): the DRSDailyRollup row this DRS counts towards."""
+        start_date = self._meta.get_field('start_date').to_python(self.start_date)
+        return (start_date, self.publisher_id, self.advertiser_id, self.status)
+
+    def _rollup_key_in_db(self):
+        # From the values the row was loaded with, so save() and delete() know
+        # which rollup row to refresh without reading the row again
+        if self.pk is None:
+            return None
+        start_date, *rest = (self.old_value(name) for name in ROLLUP_KEY_FIELDS)
+        if start_date is None:
+            return None
+        # A date assigned as a string is saved as such
+        return (self._meta.get_field('start_date').to_python(start_date), *rest)
+
+    @classmethod
+    def derived_field_expressions(cls):
+        """
+        The derivations of save() as SQL expressions, for set-based updates
+        (manage.py recompute_drs). Each one is self-contained, so the UPDATE
+        is correct whether the database evaluates SET left to right (MySQL)
+        or against the old row.
+        """
+        money = models.DecimalField(max_digits=12, decimal_places=2)
+        revenue = models.Case(
+            models.When(advertiser_revenue__gt=0, then=models.F('advertiser_revenue')),
+            default=Coalesce('advertiser_conversions', 0) * Coalesce('campaign_revenue', Decimal('0')),
+            output_field=money,
+        )
+        payout = models.Case(
+            models.When(publisher_revenue__gt=0, then=models.F('publisher_revenue')),
+            default=Coalesce('publisher_conversions', 0) * Coalesce('publisher_payout', Decimal('0')),
+            output_field=money,
+        )
+        # Rounded to the column's 2 places, so stored and computed values compare
+        # equal on backends that multiply in floating point (SQLite)
+        return {
+            'revenue': Round(revenue, 2, output_field=money),
+            'payout': Round(payout, 2, output_field=money),
+            'profit': Round(models.ExpressionWrapper(revenue - payout, output_field=money), 2, output_field=money),
+            'validation_required': models.Case(
+                models.When(status__in=['paused', 'completed'], then=models.Value(True)),
+                default=models.Value(False),
+                output_field=models.BooleanField(),
+            ),
+        }
+
     def __str__(self):
         return f"{self.campaign_name} - {self.advertiser}"
 
@@ -103,6 +188,14 @@ class DailyRevenueSheet(models.Model):
         verbose_name = "Daily Revenue Sheet"
         verbose_name_plural = "Daily Revenue Sheets"
         ordering = ['-created_at']
+        indexes = [
+            # DRS awaiting validation: status__in=[paused, completed] ordered by -start_date
+            models.Index(fields=['status', 'start_date'], name='drs_status_start_idx'),
+            # Per-publisher lists filtered by status
+            models.Index(fields=['publisher', 'status', 'start_date'], name='drs_pub_status_start_idx'),
+            # Keyset pagination of the DRS list
+            models.Index(fields=['updated_at', 'id'], name='drs_updated_id_idx'),
+        ]
         permissions = [
             ("can_validate_drs", "Can validate DRS"),
             ("can_create_invoice", "Can create invoice from DRS"),
@@ -168,4 +261,53 @@ class DailyRevenueSheet(models.Model):
     @property
     def is_validated(self):
         """Check if DRS has been validated"""
-        return self.status == 'validated'
\ No newline at end of file
+        return self.status == 'validated'
+
+
+class ChoiceCatalogVersion(VersionCounter):
+    """
+    Single-row counter bumped on every write that can change the option
+    lists of DailyRevenueSheetForm (users, DRS account managers, advertisers,
+    publishers); cached catalogs of an older version are rebuilt.
+    """
+
+
+class DRSDailyRollup(models.Model):
+    """
+    Totals of the DailyRevenueSheet rows sharing a start date, publisher,
+    advertiser and status, for summaries that would otherwise aggregate the
+    whole DRS table on every request.
+
+    Kept current by DailyRevenueSheet.save()/delete(), the bulk import and
+    recompute_drs through apps.drs.rollups.refresh_rollups(); writes that
+    bypass them (raw SQL, queryset.update()) are repaired with
+    `manage.py rebuild_drs_rollups`.
+    """
+    day = models.DateField()
+    publisher = models.ForeignKey('publishers.Publisher', on_delete=models.CASCADE, related_name='drs_rollups')
+    advertiser = models.ForeignKey('advertisers.Advertiser', on_delete=models.CASCADE, related_name='drs_rollups')
+    status = models.CharField(max_length=20, choices=DailyRevenueSheet.STATUS_CHOICES)
+
+    drs_count = models.PositiveIntegerField(default=0)
+    advertiser_conversions = models.BigIntegerField(default=0)
+    publisher_conversions = models.BigIntegerField(default=0)
+    campaign_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payout = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    profit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.day} {self.publisher_id}/{self.advertiser_id} {self.status}: {self.drs_count} DRS"
+
+    class Meta:
+        verbose_name = "DRS Daily Rollup"
+        verbose_name_plural = "DRS Daily Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'publisher', 'advertiser', 'status'], name='drs_rollup_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'day'], name='drs_rollup_status_day_idx'),
+            models.Index(fields=['publisher', 'status', 'day'], name='drs_rollup_pub_status_day_idx'),
+        ]
@@ -0,0 +1,145 @@
+"""
+DRSDailyRollup maintenance and reads.
+
+A rollup row holds the totals of the DRS rows with one (start_date,
+publisher, advertiser, status) key. Writers report the keys they touched
+(old and new key of a saved row, the keys of an imported chunk, ...) and
+refresh_rollups() re-aggregates exactly those keys from DailyRevenueSheet:
+rows are updated, created, or deleted when no DRS is left under the key.
+Re-aggregating instead of applying deltas keeps the rollup idempotent - a
+missed or repeated refresh is fixed by the next one touching the key, and
+rebuild_rollups() recomputes everything.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+from .models import ROLLUP_KEY_FIELDS, DailyRevenueSheet, DRSDailyRollup
+
+REFRESH_CHUNK = 500
+CENT = Decimal('0.01')
+
+# rollup field -> aggregate over DailyRevenueSheet
+AGGREGATES = {
+    'drs_count': Count('id'),
+    'advertiser_conversions': Coalesce(Sum('advertiser_conversions'), 0),
+    'publisher_conversions': Coalesce(Sum('publisher_conversions'), 0),
+    'campaign_revenue': Coalesce(Sum('campaign_revenue'), Decimal('0')),
+    'revenue': Coalesce(Sum('revenue'), Decimal('0')),
+    'payout': Coalesce(Sum('payout'), Decimal('0')),
+    'profit': Coalesce(Sum('profit'), Decimal('0')),
+}
+ROLLUP_KEY = ('day', 'publisher_id', 'advertiser_id', 'status')
+
+
+def _column_value(value):
+    # Back to the columns' 2 places (SQLite sums decimals in floating point)
+    return value.quantize(CENT) if isinstance(value, Decimal) else value
+
+
+def _totals(drs_rows):
+    """{key: {rollup field: value}} for a DailyRevenueSheet queryset."""
+    return {
+        tuple(row[f] for f in ROLLUP_KEY_FIELDS): {f: _column_value(row[f]) for f in AGGREGATES}
+        for row in drs_rows.order_by().values(*ROLLUP_KEY_FIELDS).annotate(**AGGREGATES)
+    }
+
+
+def _write(totals, existing):
+    """Bring rollup rows `existing` ({key: rollup}) in line with `totals` ({key: values})."""
+    stale = [rollup.pk for key, rollup in existing.items() if key not in totals]
+    if stale:
+        DRSDailyRollup.objects.filter(pk__in=stale).delete()
+
+    changed, created = [], []
+    for key, values in totals.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            created.append(DRSDailyRollup(**dict(zip(ROLLUP_KEY, key)), **values))
+        elif any(getattr(rollup, f) != v for f, v in values.items()):
+            for f, v in values.items():
+                setattr(rollup, f, v)
+            changed.append(rollup)
+    if changed:
+        DRSDailyRollup.objects.bulk_update(changed, list(AGGREGATES))
+    if created:
+        DRSDailyRollup.objects.bulk_create(created)
+    return len(stale) + len(changed) + len(created)
+
+
+def refresh_rollups(keys):
+    """
+    Re-aggregate the rollup rows of `keys`, (start_date, publisher_id,
+    advertiser_id, status) tuples. Returns the number of rollup rows written.
+    """
+    keys = list(set(keys))
+    written = 0
+    for start in range(0, len(keys), REFRESH_CHUNK):
+        wanted = set(keys[start:start + REFRESH_CHUNK])
+        days = {key[0] for key in wanted}
+        publishers = {key[1] for key in wanted}
+
+        try:
+            written += _refresh_chunk(wanted, days, publishers)
+        except IntegrityError:
+            # A concurrent refresh created one of the new rows first; it exists
+            # (and is locked) now, so the retry updates it instead
+            written += _refresh_chunk(wanted, days, publishers)
+    return written
+
+
+def _refresh_chunk(wanted, days, publishers):
+    with transaction.atomic():
+        # Lock the rollup rows first so concurrent refreshes of a key serialize
+        existing = {
+            key: rollup
+            for rollup in DRSDailyRollup.objects.select_for_update().filter(day__in=days, publisher_id__in=publishers)
+            for key in [tuple(getattr(rollup, f) for f in ROLLUP_KEY)]
+            if key in wanted
+        }
+        totals = {
+            key: values
+            for key, values in _totals(
+                DailyRevenueSheet.objects.filter(start_date__in=days, publisher_id__in=publishers)
+            ).items()
+            if key in wanted
+        }
+        return _write(totals, existing)
+
+
+def rebuild_rollups(date_from=None, date_to=None):
+    """
+    Recompute every rollup row (of start dates in the optional range) from
+    the DRS table. Returns the number of rollup rows written.
+    """
+    drs_rows = DailyRevenueSheet.objects.all()
+    rollups = DRSDailyRollup.objects.all()
+    if date_from:
+        drs_rows = drs_rows.filter(start_date__gte=date_from)
+        rollups = rollups.filter(day__gte=date_from)
+    if date_to:
+        drs_rows = drs_rows.filter(start_date__lte=date_to)
+        rollups = rollups.filter(day__lte=date_to)
+
+    with transaction.atomic():
+        existing = {
+            tuple(getattr(rollup, f) for f in ROLLUP_KEY): rollup
+            for rollup in rollups.select_for_update()
+        }
+        return _write(_totals(drs_rows), existing)
+
+
+def summarize(rollups):
+    """
+    DRS count and totals of a DRSDailyRollup queryset in one query, with the
+    keys of the validation summaries.
+    """
+    return rollups.aggregate(
+        total_drs=Coalesce(Sum('drs_count'), 0),
+        total_conversions=Coalesce(Sum('publisher_conversions'), 0),
+        total_revenue=Coalesce(Sum('revenue'), Decimal('0')),
+        total_payout=Coalesce(Sum('payout'), Decimal('0')),
+        total_margin=Coalesce(Sum('profit'), Decimal('0')),
+    )
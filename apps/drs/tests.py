@@ -1,3 +1,214 @@
+import csv
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.advertisers.models import Advertiser
+from apps.drs.importer import ImportFileError, import_drs
+from apps.drs.management.commands.check_query_plans import full_scans, hot_queries
+from apps.drs.models import DailyRevenueSheet
+from apps.publishers.models import Publisher
+
+
+class QueryPlanTests(TestCase):
+    """The hot DRS / Validation / Invoice queries of the views are served from their indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        advertiser = Advertiser.objects.create(company_name='Adv')
+        publishers = [Publisher.objects.create(company_name=f'Pub {i}') for i in range(3)]
+        start = date(2025, 1, 1)
+        DailyRevenueSheet.objects.bulk_create(
+            DailyRevenueSheet(
+                advertiser=advertiser, publisher=publishers[i % 3], campaign_name=f'camp {i}', geo='US',
+                start_date=start + timedelta(days=i % 60), status=['active', 'paused', 'completed', 'paid'][i % 4],
+            )
+            for i in range(500)
+        )
+
+    def explain(self, query):
+        return query.explain(**({'format': 'JSON'} if connection.vendor == 'mysql' else {}))
+
+    def test_hot_queries_use_an_index(self):
+        for name, query, table in hot_queries():
+            with self.subTest(query=name):
+                plan = self.explain(query)
+                self.assertFalse(full_scans(plan, table), f'{name} scans {table}:\n{plan}')
+
+    def test_full_scans_detects_a_table_scan(self):
+        # geo has no index, so this plan must read the whole table
+        table = DailyRevenueSheet._meta.db_table
+        plan = self.explain(DailyRevenueSheet.objects.filter(geo='US'))
+        self.assertTrue(full_scans(plan, table), plan)
+
+
+class DRSListTests(TestCase):
+    """Keyset pages of the DRS list and its request filters."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'x')
+        advertiser = Advertiser.objects.create(company_name='Adv')
+        cls.publishers = [Publisher.objects.create(company_name=f'Pub {i}') for i in range(2)]
+        DailyRevenueSheet.objects.bulk_create(
+            DailyRevenueSheet(
+                advertiser=advertiser, publisher=cls.publishers[i % 2], campaign_name=f'camp {i}', geo='US',
+                start_date=date(2025, 1, 1) + timedelta(days=i % 30), status=['active', 'paused'][i % 2],
+            )
+            for i in range(120)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def pages(self, params=None):
+        """ids of every page of the list, following the cursors."""
+        params, pages = dict(params or {}), []
+        while True:
+            response = self.client.get(reverse('drs:drs_list'), params)
+            self.assertEqual(response.status_code, 200)
+            pages.append([drs.id for drs in response.context['drs_list']])
+            if not response.context['next_cursor']:
+                return pages
+            params['cursor'] = response.context['next_cursor']
+
+    def test_cursor_pages_cover_every_row_once_in_order(self):
+        pages = self.pages()
+        self.assertEqual([len(page) for page in pages], [50, 50, 20])
+        expected = list(DailyRevenueSheet.objects.order_by('-updated_at', '-id').values_list('id', flat=True))
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_fragment_returns_rows_and_cursor(self):
+        response = self.client.get(reverse('drs:drs_list'), {'fragment': '1'})
+        data = response.json()
+        self.assertIn('camp', data['html'])
+        self.assertTrue(data['next_cursor'])
+
+    def test_filters(self):
+        publisher = self.publishers[0]
+        ids = sum(self.pages({'status': 'active', 'publisher': publisher.pk, 'date_from': '2025-01-10'}), [])
+        expected = DailyRevenueSheet.objects.filter(
+            status='active', publisher=publisher, start_date__gte=date(2025, 1, 10)
+        )
+        self.assertEqual(set(ids), set(expected.values_list('id', flat=True)))
+
+    def test_invalid_filters_are_dropped(self):
+        for params in ({'date_from': '2024-02-30'}, {'date_to': '2024-13-01'}, {'status': 'bogus', 'publisher': 'x'}):
+            with self.subTest(params=params):
+                self.assertEqual(sum(len(page) for page in self.pages(params)), 120)
+
+    def test_query_count_does_not_depend_on_the_page_size(self):
+        def queries(params):
+            with CaptureQueriesContext(connection) as captured:
+                self.client.get(reverse('drs:drs_list'), dict(params, fragment='1'))
+            return len(captured)
+
+        self.assertEqual(queries({'date_to': '2025-01-02'}), queries({}))
+
+
+class ImportTests(TestCase):
+    """CSV / XLSX import: per-row errors, column ranges and unreadable files."""
+
+    HEADERS = ['Advertiser', 'Affiliate', 'Campaign Name', 'Start Date', 'Status', 'GEO',
+               'Adv Convs', 'Pub Convs', 'Rev/Conv', 'Payout/Conv', 'Advertiser Revenue', 'Publisher Revenue']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'x')
+        Advertiser.objects.create(company_name='Adv')
+        Publisher.objects.create(company_name='Pub')
+
+    def csv_file(self, *rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.HEADERS)
+        writer.writerows(rows)
+        return io.BytesIO(buffer.getvalue().encode())
+
+    def row(self, **values):
+        row = dict(zip(self.HEADERS, ['adv', 'PUB', 'camp', '2025-03-01', 'active', 'US', 0, 0, '', '', '', '']))
+        row.update(values)
+        return [row[header] for header in self.HEADERS]
+
+    def test_derived_amounts_match_save(self):
+        rows = [
+            self.row(**{'Adv Convs': 10, 'Rev/Conv': '1.25', 'Pub Convs': 7, 'Payout/Conv': '0.5'}),
+            self.row(**{'Status': 'Paused', 'Advertiser Revenue': '100.55', 'Pub Convs': 3, 'Payout/Conv': '2'}),
+            self.row(**{'Status': 'completed', 'Adv Convs': 4, 'Rev/Conv': '3.10', 'Publisher Revenue': '40.10'}),
+        ]
+        report = import_drs(self.csv_file(*rows), 'drs.csv')
+        self.assertEqual((report['created'], report['rejected']), (3, 0))
+
+        for imported in DailyRevenueSheet.objects.all():
+            saved = DailyRevenueSheet.objects.get(pk=imported.pk)
+            saved.pk = None
+            saved.save()
+            saved.refresh_from_db()
+            with self.subTest(campaign=imported.pk):
+                self.assertEqual(
+                    (imported.revenue, imported.payout, imported.profit, imported.validation_required),
+                    (saved.revenue, saved.payout, saved.profit, saved.validation_required),
+                )
+
+    def test_rejected_rows_are_reported_with_their_number(self):
+        rows = [
+            self.row(),
+            self.row(Advertiser='Nobody', **{'Start Date': '2025-13-01', 'Rev/Conv': '1.234'}),
+            self.row(**{'Advertiser Revenue': '10000000000'}),
+            self.row(**{'Adv Convs': 2 ** 31}),
+            # each value fits, their product does not
+            self.row(**{'Adv Convs': 2_000_000_000, 'Rev/Conv': '10'}),
+        ]
+        report = import_drs(self.csv_file(*rows), 'drs.csv')
+
+        self.assertEqual((report['rows'], report['created'], report['rejected']), (5, 1, 4))
+        errors = {error['row']: error['errors'] for error in report['errors']}
+        self.assertEqual(sorted(errors), [3, 4, 5, 6])
+        self.assertEqual(
+            {message.split(':')[0] for message in errors[3]}, {'advertiser', 'start_date', 'campaign_revenue'}
+        )
+        self.assertEqual(errors[4], ["advertiser_revenue: '10000000000' is too large"])
+        self.assertEqual(errors[5], [f"advertiser_conversions: '{2 ** 31}' is too large"])
+        self.assertEqual([message.split(':')[0] for message in errors[6]], ['revenue', 'profit'])
+        self.assertEqual(DailyRevenueSheet.objects.count(), 1)
+
+    def test_unreadable_files(self):
+        files = {
+            'latin-1.csv': self.csv_file(self.row(**{'Campaign Name': 'caf\xe9'})).getvalue().replace(b'\xc3\xa9', b'\xe9'),
+            'corrupt.xlsx': b'PK\x03\x04 not really a workbook',
+            'notes.txt': b'hello',
+        }
+        for filename, content in files.items():
+            with self.subTest(filename=filename):
+                with self.assertRaises(ImportFileError):
+                    import_drs(io.BytesIO(content), filename)
+
+                self.client.force_login(self.user)
+                response = self.client.post(
+                    reverse('drs:drs_import'), {'file': SimpleUploadedFile(filename, content)}
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.json()['success'])
+        self.assertFalse(DailyRevenueSheet.objects.exists())
+
+    def test_xlsx(self):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        workbook.active.append(self.HEADERS)
+        workbook.active.append(self.row(**{'Start Date': date(2025, 3, 2), 'Adv Convs': 2, 'Rev/Conv': 1.5}))
+        content = io.BytesIO()
+        workbook.save(content)
+        content.seek(0)
 
-# Create your tests here.
+        report = import_drs(content, 'drs.xlsx')
+        self.assertEqual((report['created'], report['rejected']), (1, 0))
+        drs = DailyRevenueSheet.objects.get()
+        self.assertEqual((drs.start_date, drs.revenue), (date(2025, 3, 2), Decimal('3.00')))
@@ -1,7 +1,8 @@
 
 from django.urls import path
 from .views import (
-    DailyRevenueSheetListView, DailyRevenueSheetCreateView, DailyRevenueSheetUpdateView, DailyRevenueSheetDeleteView, DailyRevenueSheetDetailView, DRSExportView, drs_currency_amount_api, DRSForValidationView
+    DailyRevenueSheetListView, DailyRevenueSheetCreateView, DailyRevenueSheetUpdateView, DailyRevenueSheetDeleteView, DailyRevenueSheetDetailView, DRSExportView, drs_currency_amount_api, DRSForValidationView,
+    DRSImportView, DRSCurrencyAmountsView
 )
 
 app_name = 'drs'
@@ -13,6 +14,8 @@ urlpatterns = [
     path('<int:pk>/delete/', DailyRevenueSheetDeleteView.as_view(), name='delete'),
     path('<int:pk>/', DailyRevenueSheetDetailView.as_view(), name='detail'),
     path('export/', DRSExportView.as_view(), name='drs_export'),
+    path('import/', DRSImportView.as_view(), name='drs_import'),
     path('api/get_amount/', drs_currency_amount_api, name='drs_get_amount'),
+    path('api/amounts/', DRSCurrencyAmountsView.as_view(), name='drs_amounts'),
     path('for-validation/', DRSForValidationView.as_view(), name='for_validation'),
 ]
@@ -4,23 +4,88 @@ from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from .models import DailyRevenueSheet
 from .forms import DailyRevenueSheetForm
+from .filters import apply_filters, filter_query, parse_filters
+from .exports import csv_response, export_rows, xlsx_response
+from .importer import ImportFileError, import_drs
 from django.http import JsonResponse, HttpResponse
-from apps.invoicing.models import CurrencyRate
+from apps.invoicing import rates
+from decimal import Decimal
 from django.db.models import Q
 from django.template.loader import render_to_string
 from django.views.generic import TemplateView
+from django.views import View
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core import signing
+from django.utils.dateparse import parse_datetime
+from apps.advertisers.models import Advertiser
+from apps.publishers.models import Publisher
 
 User = get_user_model()
 
 class DailyRevenueSheetListView(LoginRequiredMixin, ListView):
+    """
+    Newest-updated first, paged by keyset on (updated_at, id): the `cursor`
+    parameter carries the last row served, so every page is one indexed
+    range query however deep it is. `?fragment=1` (the "Load more" button)
+    returns just the next rows and cursor as JSON.
+    """
     model = DailyRevenueSheet
     template_name = 'drs/drs_list.html'
+    fragment_template_name = 'drs/drs_rows_fragment.html'
     context_object_name = 'drs_list'
+    page_size = 50
+    cursor_salt = 'drs.list'
+
+    def get_filters(self):
+        return parse_filters(self.request.GET)
 
     def get_queryset(self):
-        return DailyRevenueSheet.objects.all().order_by('-updated_at')
+        queryset = DailyRevenueSheet.objects.select_related('advertiser', 'publisher').order_by('-updated_at', '-id')
+        return apply_filters(queryset, self.get_filters())
+
+    def get_page(self, queryset):
+        """(rows, next_cursor) of the page after the `cursor` parameter."""
+        cursor = self.request.GET.get('cursor')
+        if cursor:
+            try:
+                position = signing.loads(cursor, salt=self.cursor_salt)
+                updated_at = parse_datetime(position['u'])
+                last_id = int(position['i'])
+            except (signing.BadSignature, KeyError, TypeError, ValueError):
+                updated_at = None
+            if updated_at is not None:
+                queryset = queryset.filter(
+                    Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, id__lt=last_id)
+                )
+
+        rows = list(queryset[:self.page_size + 1])
+        next_cursor = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            last = rows[-1]
+            next_cursor = signing.dumps({'u': last.updated_at.isoformat(), 'i': last.id}, salt=self.cursor_salt)
+        return rows, next_cursor
+
+    def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        rows, next_cursor = self.get_page(self.object_list)
+
+        if request.GET.get('fragment') == '1':
+            html = render_to_string(self.fragment_template_name, {'drs_list': rows}, request=request)
+            return JsonResponse({'html': html, 'next_cursor': next_cursor})
+
+        context = self.get_context_data(object_list=rows, next_cursor=next_cursor)
+        return self.render_to_response(context)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['filters'] = self.get_filters()
+        context['filter_query'] = filter_query(context['filters'])
+        context['status_choices'] = DailyRevenueSheet.STATUS_CHOICES
+        context['advertisers'] = Advertiser.objects.only('id', 'company_name').order_by('company_name')
+        context['publishers'] = Publisher.objects.only('id', 'company_name').order_by('company_name')
+        return context
 
 class DailyRevenueSheetCreateView(LoginRequiredMixin, CreateView):
     model = DailyRevenueSheet
@@ -124,51 +189,100 @@ class DRSExportView(LoginRequiredMixin, TemplateView):
     template_name = 'drs/drs_export.html'
 
     def get(self, request, *args, **kwargs):
-        if request.GET.get('export') == 'csv':
-            import csv
-            from django.http import HttpResponse
-            from apps.drs.models import DailyRevenueSheet
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = 'attachment; filename="drs.csv"'
-            writer = csv.writer(response)
-            writer.writerow(['ID', 'Advertiser', 'Campaign Name', 'Affiliate', 'Start Date', 'End Date',
-                'Adv Convs', 'Pub Convs', 'Rev/Conv', 'Payout/Conv', 'Revenue', 'Payout', 'Profit',
-                'PID', 'af_prt', 'Account Manager', 'Updated'])
-            for drs in DailyRevenueSheet.objects.all():
-                writer.writerow([
-                    drs.id, drs.advertiser, drs.campaign_name, drs.affiliate, drs.start_date, drs.end_date,
-                    drs.advertiser_conversions, drs.publisher_conversions, drs.campaign_revenue, drs.publisher_payout,
-                    drs.revenue, drs.payout, drs.profit, drs.pid, drs.af_prt, drs.account_manager, drs.updated_at
-                ])
-            return response
+        export_format = request.GET.get('export')
+        if export_format in ('csv', 'xlsx'):
+            queryset = apply_filters(DailyRevenueSheet.objects.all(), parse_filters(request.GET))
+            rows = export_rows(queryset)
+            if export_format == 'xlsx':
+                return xlsx_response(rows)
+            return csv_response(rows)
         return super().get(request, *args, **kwargs)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['drs_list'] = DailyRevenueSheet.objects.order_by('-updated_at')
+        context['drs_list'] = DailyRevenueSheet.objects.order_by('-updated_at')[:1]
+        context['filters'] = parse_filters(self.request.GET)
+        context['status_choices'] = DailyRevenueSheet.STATUS_CHOICES
+        context['advertisers'] = Advertiser.objects.only('id', 'company_name').order_by('company_name')
+        context['publishers'] = Publisher.objects.only('id', 'company_name').order_by('company_name')
         return context
 
+class DRSImportView(LoginRequiredMixin, View):
+    """POST a CSV/XLSX `file`; returns the import report as JSON."""
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if not upload:
+            return JsonResponse({'success': False, 'error': 'Please choose a CSV or XLSX file.'}, status=400)
+        try:
+            report = import_drs(upload, upload.name, dry_run=request.POST.get('dry_run') == '1')
+        except ImportFileError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        return JsonResponse({'success': True, **report})
+
+def _base_amount(conversions, payout):
+    # This is your base amount in INR (edit the formula if needed!)
+    return Decimal(conversions or 0) * (payout or Decimal('0'))
+
+
 def drs_currency_amount_api(request):
     drs_id = request.GET.get('drs_id')
     currency = request.GET.get('currency', 'INR').upper()
-    amount = 0
+    amount = Decimal('0')
     if drs_id:
         try:
             drs = DailyRevenueSheet.objects.get(pk=drs_id)
-            # This is your base amount in INR (edit the formula if needed!)
-            base_inr_amount = float(drs.publisher_conversions) * float(drs.publisher_payout)
-            if currency == 'INR':
-                amount = base_inr_amount
-            else:
-                rate_obj = CurrencyRate.objects.filter(currency=currency).first()
-                if rate_obj and rate_obj.rate_to_inr:
-                    amount = round(base_inr_amount * float(rate_obj.rate_to_inr), 2)
-                else:
-                    amount = base_inr_amount  # fallback no conversion if missing
+            base_inr_amount = _base_amount(drs.publisher_conversions, drs.publisher_payout)
+            amount = rates.convert(base_inr_amount, currency)
+            if amount is None:
+                amount = rates.to_cents(base_inr_amount)  # fallback no conversion if missing
         except DailyRevenueSheet.DoesNotExist:
             pass
     return JsonResponse({'amount': f'{amount:.2f}'})
 
+
+class DRSCurrencyAmountsView(LoginRequiredMixin, View):
+    """
+    Publisher amounts of many DRS rows in one or more currencies:
+    ?drs_ids=1,2,3&currencies=USD,EUR (or repeated drs_id / currency).
+    One DRS query plus the rate cache's version check per call.
+    """
+    MAX_IDS = 1000
+
+    def get(self, request):
+        raw_ids = [part for value in request.GET.getlist('drs_ids') + request.GET.getlist('drs_id')
+                   for part in value.split(',') if part.strip()]
+        try:
+            drs_ids = list(dict.fromkeys(int(value) for value in raw_ids))
+        except ValueError:
+            return JsonResponse({'error': 'drs_ids must be integers'}, status=400)
+        if not drs_ids:
+            return JsonResponse({'error': 'drs_ids is required'}, status=400)
+        if len(drs_ids) > self.MAX_IDS:
+            return JsonResponse({'error': f'At most {self.MAX_IDS} drs_ids per call'}, status=400)
+
+        currencies = [part.strip().upper() for value in request.GET.getlist('currencies') + request.GET.getlist('currency')
+                      for part in value.split(',') if part.strip()]
+        currencies = list(dict.fromkeys(currencies)) or [rates.BASE_CURRENCY]
+
+        current_rates = rates.get_rates()
+        amounts = {}
+        for pk, conversions, payout in DailyRevenueSheet.objects.filter(pk__in=drs_ids).values_list(
+                'pk', 'publisher_conversions', 'publisher_payout'):
+            base_inr_amount = _base_amount(conversions, payout)
+            amounts[str(pk)] = {
+                currency: None if converted is None else f'{converted:.2f}'
+                for currency in currencies
+                for converted in [rates.convert(base_inr_amount, currency, current_rates)]
+            }
+
+        return JsonResponse({
+            'base_currency': rates.BASE_CURRENCY,
+            'amounts': amounts,
+            'missing_ids': [pk for pk in drs_ids if str(pk) not in amounts],
+            'unknown_currencies': [c for c in currencies if c != rates.BASE_CURRENCY and c not in current_rates],
+        })
+
 # Update the DRSForValidationView class
 class DRSForValidationView(LoginRequiredMixin, ListView):
     """View to show DRS entries that need validation (status: paused or completed)"""
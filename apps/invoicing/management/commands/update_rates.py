@@ -1,5 +1,8 @@
+from decimal import Decimal
+
 from django.core.management.base import BaseCommand
-from apps.invoicing.models import CurrencyRate
+from django.db import transaction
+from apps.invoicing.models import CurrencyRate, CurrencyRateVersion
 
 class Command(BaseCommand):
     help = 'Manually update currency rates to INR (no API, no internet)'
@@ -7,14 +10,18 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         # UPDATE these values whenever you need new rates
         rates = {
-            'USD': 0.0120,  # 1 INR = 0.012 USD (July 2025 example; use up-to-date rates)
-            'EUR': 0.0110,  # 1 INR = 0.011 EUR
+            'USD': Decimal('0.0120'),  # 1 INR = 0.012 USD (July 2025 example; use up-to-date rates)
+            'EUR': Decimal('0.0110'),  # 1 INR = 0.011 EUR
             # Add more currencies if needed
         }
-        for currency, rate in rates.items():
-            CurrencyRate.objects.update_or_create(
-                currency=currency,
-                defaults={'rate_to_inr': rate},
-            )
-            self.stdout.write(self.style.SUCCESS(f"Set 1 INR = {rate} {currency}"))
-        self.stdout.write(self.style.SUCCESS("Currency rates UPDATED (manual/hardcoded)"))
+        # Each save bumps CurrencyRateVersion; cached rates reload on their next lookup
+        with transaction.atomic():
+            for currency, rate in rates.items():
+                CurrencyRate.objects.update_or_create(
+                    currency=currency,
+                    defaults={'rate_to_inr': rate},
+                )
+                self.stdout.write(self.style.SUCCESS(f"Set 1 INR = {rate} {currency}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Currency rates UPDATED (manual/hardcoded), version {CurrencyRateVersion.current()}"
+        ))
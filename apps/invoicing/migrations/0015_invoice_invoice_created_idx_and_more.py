@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advertisers', '0007_remove_advertiser_unique_advertiser_email'),
+        ('drs', '0007_dailyrevenuesheet_drs_status_start_idx_and_more'),
+        ('invoicing', '0014_invoice_validation_alter_invoice_drs'),
+        ('publishers', '0011_wishlistnamegram'),
+        ('validation', '0003_alter_validation_options_validation_approved_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['created_at'], name='invoice_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['party_type', 'status'], name='invoice_party_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['publisher', 'status'], name='invoice_pub_status_idx'),
+        ),
+    ]
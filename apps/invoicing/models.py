@@ -1,11 +1,18 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Max
+from django.db.models.functions import Cast, Substr
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import date, timedelta, timezone
 
+from apps.core.tracking import TrackedFieldsMixin
+from apps.core.versioning import VersionCounter
+
+INVOICE_NUMBER_ATTEMPTS = 3
+
 def default_due_date():
     return date.today() + timedelta(days=30)
 
-class Invoice(models.Model):
+class Invoice(TrackedFieldsMixin, models.Model):
     CURRENCY_CHOICES = [
         ('USD', 'USD'), ('EUR', 'EUR'), ('INR', 'INR'),
     ]
@@ -74,6 +81,14 @@ class Invoice(models.Model):
     bank_swift_code = models.CharField(max_length=20, default="HDFCINBB", blank=True)
     bank_branch_address = models.TextField(default="Ward No 12, Gr Flr, Muslim Chowdhirian, Dhampur, Hayatnagar Seohara Bijnor - 246746", blank=True)
 
+    class Meta:
+        indexes = [
+            # Dashboard revenue by creation day / week / month
+            models.Index(fields=['created_at'], name='invoice_created_idx'),
+            models.Index(fields=['party_type', 'status'], name='invoice_party_status_idx'),
+            models.Index(fields=['publisher', 'status'], name='invoice_pub_status_idx'),
+        ]
+
     def calculate_gst(self):
         if self.currency == 'INR':
             base = self.subtotal or self.amount or Decimal('0')
@@ -98,20 +113,33 @@ class Invoice(models.Model):
         self.sgst_amount = gst_data['sgst']
         self.total_amount = self.subtotal + self.gst_amount
 
+    def next_invoice_number(self):
+        """
+        Number after the highest <prefix>-NNNNNN one of this party type,
+        comparing the numeric suffixes (a string order ranks PUB-1000000
+        below PUB-999999), instead of counting the invoices (which also
+        reused numbers once an invoice was deleted). The maximum is taken in
+        the database, over the all-digit suffixes only.
+        """
+        prefix = f"{'PUB' if self.party_type == 'publisher' else 'INV'}-"
+        last = Invoice.objects.filter(
+            invoice_number__startswith=prefix, invoice_number__regex=rf'^{prefix}[0-9]+$',
+        ).aggregate(
+            last=Max(Cast(Substr('invoice_number', len(prefix) + 1), models.BigIntegerField()))
+        )['last'] or 0
+        return f'{prefix}{last + 1:06d}'
+
     def save(self, *args, **kwargs):
         # Auto-generate invoice_number if blank
-        if not self.invoice_number:
-            count = Invoice.objects.filter(party_type=self.party_type).count() + 1
-            prefix = 'PUB' if self.party_type == 'publisher' else 'INV'
-            self.invoice_number = f'{prefix}-{count:06d}'
+        generated_number = not self.invoice_number
+        if generated_number:
+            self.invoice_number = self.next_invoice_number()
 
-        # Calculate totals BEFORE first save (works without pk now)
-        if hasattr(self, 'lines') and hasattr(self.lines, 'exists'):
-            try:
-                if self.lines.exists():
-                    self.subtotal = sum(line.amount for line in self.lines.all())
-            except:
-                pass  # lines might not exist yet
+        # Calculate totals BEFORE first save (an unsaved invoice has no lines)
+        if self.pk is not None:
+            line_amounts = [line.amount for line in self.lines.all()]
+            if line_amounts:
+                self.subtotal = sum(line_amounts)
         
         if not self.subtotal:
             self.subtotal = self.amount or Decimal('0')
@@ -156,26 +184,22 @@ class Invoice(models.Model):
         else:
             self.publisher = None
 
-        # Save the invoice first
-        super().save(*args, **kwargs)
-        
-        # AFTER saving, check if we need to update related validation
-        # If this invoice was created from a validation (via DRS link)
-        if self.drs and hasattr(self.drs, 'validation'):
+        if not generated_number:
+            super().save(*args, **kwargs)
+            return
+
+        # A generated number can be taken by a concurrent save between reading
+        # the highest one and inserting; invoice_number is unique, so retry
+        # with the next number
+        for attempt in range(INVOICE_NUMBER_ATTEMPTS):
             try:
-                # Get the validation for this DRS
-                validation = Validation.objects.filter(drs=self.drs).first()
-                if validation:
-                    # Link validation to this invoice
-                    validation.invoice = self
-                    validation.save()
-                    
-                    # Also update the reverse relationship on invoice
-                    if not self.validation:
-                        self.validation = validation
-                        self.save(update_fields=['validation'])
-            except Exception as e:
-                print(f"Error linking validation to invoice: {e}")
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                if attempt == INVOICE_NUMBER_ATTEMPTS - 1:
+                    raise
+                self.invoice_number = self.next_invoice_number()
 
     def get_display_company_name(self):
         if self.party_type == 'publisher' and self.publisher:
@@ -199,7 +223,7 @@ class Invoice(models.Model):
         return f"Invoice #{self.invoice_number} - {self.get_party_type_display()}"
 
 
-class InvoiceLine(models.Model):
+class InvoiceLine(TrackedFieldsMixin, models.Model):
     invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name='lines')
     item_description = models.CharField(max_length=200, default="Service")
     hsn_sac = models.CharField(max_length=20, blank=True, null=True)
@@ -226,9 +250,11 @@ class InvoiceLine(models.Model):
     
     def save(self, *args, **kwargs):
         self.calculate_amounts()
+        # Only a new amount (or invoice) changes the invoice totals
+        totals_changed = bool(self.changed_fields & {'amount', 'invoice'})
         super().save(*args, **kwargs)
         
-        if self.invoice:
+        if self.invoice and totals_changed:
             self.invoice.calculate_totals()
             self.invoice.save()
     
@@ -253,3 +279,20 @@ class CurrencyRate(models.Model):
 
     def __str__(self):
         return f"1 INR = {self.rate_to_inr} {self.currency} (as of {self.last_updated})"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Processes reload their cached rates (apps.invoicing.rates) on the next lookup
+        CurrencyRateVersion.bump()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        CurrencyRateVersion.bump()
+        return result
+
+
+class CurrencyRateVersion(VersionCounter):
+    """
+    Single-row counter bumped on every CurrencyRate write; the in-process
+    rate cache reloads when it sees a newer version.
+    """
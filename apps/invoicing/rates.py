@@ -0,0 +1,59 @@
+"""
+In-process CurrencyRate cache and Decimal currency conversion.
+
+All rates are held per process and tagged with CurrencyRateVersion, which
+every CurrencyRate write bumps (update_rates included). A lookup costs one
+version query; the rates themselves are reloaded only when the version
+moved, so other processes pick up new rates on their next lookup.
+
+Amounts are Decimals rounded half-up to 2 places, like Invoice.calculate_gst.
+"""
+import threading
+from decimal import ROUND_HALF_UP, Decimal
+
+from .models import CurrencyRate, CurrencyRateVersion
+
+BASE_CURRENCY = 'INR'
+CENT = Decimal('0.01')
+
+_lock = threading.Lock()
+_cached = {'version': None, 'rates': {}}
+
+
+def get_rates():
+    """{currency: rate_to_inr} at the current CurrencyRateVersion."""
+    version = CurrencyRateVersion.current()
+    with _lock:
+        if _cached['version'] == version:
+            return _cached['rates']
+    rates = {
+        currency.upper(): rate
+        for currency, rate in CurrencyRate.objects.values_list('currency', 'rate_to_inr')
+        if rate
+    }
+    with _lock:
+        _cached['version'], _cached['rates'] = version, rates
+    return rates
+
+
+def clear():
+    with _lock:
+        _cached['version'], _cached['rates'] = None, {}
+
+
+def to_cents(value):
+    return Decimal(value or 0).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def convert(amount_inr, currency, rates=None):
+    """
+    `amount_inr` in `currency`, or None when there is no rate for it.
+    `rates` defaults to get_rates(); pass it in when converting many amounts.
+    """
+    currency = (currency or BASE_CURRENCY).upper()
+    if currency == BASE_CURRENCY:
+        return to_cents(amount_inr)
+    rate = (get_rates() if rates is None else rates).get(currency)
+    if rate is None:
+        return None
+    return to_cents(Decimal(amount_inr or 0) * rate)
@@ -1,3 +1,140 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.invoicing import rates
+from apps.invoicing.models import CurrencyRate, CurrencyRateVersion, Invoice
+from apps.publishers.models import Publisher
+
+
+class CurrencyRateCacheTests(TestCase):
+    """The in-process rate cache reloads exactly when CurrencyRateVersion moves."""
+
+    def setUp(self):
+        rates.clear()
+        self.addCleanup(rates.clear)
+        CurrencyRate.objects.create(currency='usd', rate_to_inr=Decimal('0.012'))
+
+    def test_cached_rates_cost_one_version_query(self):
+        self.assertEqual(rates.get_rates(), {'USD': Decimal('0.012')})
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(rates.convert(Decimal('1000'), 'usd'), Decimal('12.00'))
+        self.assertEqual(len(captured), 1)
+
+    def test_writes_invalidate_the_cache(self):
+        self.assertEqual(rates.get_rates(), {'USD': Decimal('0.012')})
+
+        rate = CurrencyRate.objects.get()
+        rate.rate_to_inr = Decimal('0.0125')
+        rate.save()
+        self.assertEqual(rates.convert(Decimal('1000'), 'USD'), Decimal('12.50'))
+
+        CurrencyRate.objects.create(currency='EUR', rate_to_inr=Decimal('0.011'))
+        self.assertEqual(rates.convert(Decimal('1000'), 'EUR'), Decimal('11.00'))
+
+        rate.delete()
+        self.assertIsNone(rates.convert(Decimal('1000'), 'USD'))
+
+    def test_update_rates_command_invalidates_the_cache(self):
+        rates.get_rates()
+        version = CurrencyRateVersion.current()
+        call_command('update_rates', stdout=StringIO())
+        self.assertGreater(CurrencyRateVersion.current(), version)
+        self.assertEqual(rates.get_rates()['USD'], Decimal('0.0120'))
+        self.assertEqual(str(CurrencyRateVersion.objects.get()), f'Currency rate version {CurrencyRateVersion.current()}')
+
+
+class InvoiceNumberTests(TestCase):
+    """Generated invoice numbers follow the highest numeric suffix of their prefix."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.publisher = Publisher.objects.create(company_name='Pub')
+
+    def create(self, invoice_number=None, **fields):
+        return Invoice.objects.create(publisher=self.publisher, invoice_number=invoice_number, **fields)
+
+    def test_numbers_are_sequential_per_party_type(self):
+        self.assertEqual(self.create().invoice_number, 'PUB-000001')
+        self.assertEqual(self.create().invoice_number, 'PUB-000002')
+        self.assertEqual(self.create(party_type='advertiser').invoice_number, 'INV-000001')
+
+    def test_numeric_order_past_six_digits(self):
+        self.create('PUB-999999')
+        self.assertEqual(self.create().invoice_number, 'PUB-1000000')
+        self.assertEqual(self.create().invoice_number, 'PUB-1000001')
+
+    def test_non_numeric_suffixes_are_ignored(self):
+        self.create('PUB-000007')
+        self.create('PUB-draft')
+        self.create('PUB-9x')
+        self.assertEqual(self.create().invoice_number, 'PUB-000008')
+
+    def test_deleting_an_invoice_does_not_repeat_a_later_number(self):
+        self.create()
+        second = self.create()
+        self.create()
+        second.delete()
+        fourth = self.create()
+        self.assertEqual(fourth.invoice_number, 'PUB-000004')
+
+        # Only the highest number is free again once its invoice is gone
+        fourth.delete()
+        self.assertEqual(self.create().invoice_number, 'PUB-000004')
+
+
+class TrackedFieldsTests(TestCase):
+    """TrackedFieldsMixin on Invoice: changed fields and the columns save() writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.invoice = Invoice.objects.create(publisher=Publisher.objects.create(company_name='Pub'))
+
+    def test_changed_fields(self):
+        self.assertEqual(Invoice(status='Paid').changed_fields, {f.name for f in Invoice._meta.concrete_fields} - {'id'})
+
+        invoice = Invoice.objects.get(pk=self.invoice.pk)
+        self.assertEqual(invoice.changed_fields, set())
+        invoice.status = 'Paid'
+        invoice.amount = invoice.amount
+        self.assertEqual(invoice.changed_fields, {'status'})
+        self.assertEqual(invoice.old_value('status'), 'Pending')
+        self.assertEqual(invoice.changed_update_fields(), {'status', 'updated_at'})
+
+        invoice.save()
+        self.assertEqual(invoice.changed_fields, set())
+        self.assertEqual(invoice.old_value('status'), 'Paid')
+
+    def updates(self, invoice, **kwargs):
+        """The UPDATE statements of invoice.save(**kwargs)."""
+        with CaptureQueriesContext(connection) as captured:
+            invoice.save(**kwargs)
+        return [query['sql'] for query in captured if query['sql'].startswith('UPDATE')]
+
+    def test_save_writes_only_the_changed_columns(self):
+        invoice = Invoice.objects.get(pk=self.invoice.pk)
+        self.assertEqual(self.updates(invoice), [])
+
+        invoice.status = 'Paid'
+        [update] = self.updates(invoice)
+        self.assertIn('"status"', update)
+        self.assertIn('"updated_at"', update)
+        self.assertNotIn('"bill_from_company"', update)
+        self.assertEqual(Invoice.objects.get(pk=invoice.pk).status, 'Paid')
+
+        # Explicit update_fields are kept as given
+        invoice.terms = 'Net 30'
+        [update] = self.updates(invoice, update_fields=['terms'])
+        self.assertNotIn('"updated_at"', update)
 
-# Create your tests here.
+    def test_copies_are_written_in_full(self):
+        copy = Invoice.objects.get(pk=self.invoice.pk)
+        copy.pk = None
+        copy.invoice_number = None
+        copy.save()
+        self.assertNotEqual(copy.pk, self.invoice.pk)
+        self.assertEqual(Invoice.objects.count(), 2)
@@ -0,0 +1,122 @@
+"""
+Matcher benchmark suite (`manage.py benchmark_matcher`).
+
+Each case is run `repeat` times for wall time and query count, then once more
+under tracemalloc for peak Python memory (tracing slows the code down, so it
+is kept out of the timed runs). Result caching is switched off while the
+suite runs, so every run does the full work.
+
+Cases:
+  manual:name_only / geo_only / name_and_geo / all
+      OffersMatcherView._perform_manual_match for the four search modes
+  results:default[:<engine>]
+      OffersMatcherResultsView default flow, rendered, for the configured
+      engine or each engine asked for
+"""
+import statistics
+import time
+import tracemalloc
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from apps.offers.cache import NullBackend, using_backend
+
+MANUAL_MODES = {
+    'name_only': lambda name, geo: (name, ''),
+    'geo_only': lambda name, geo: ('', geo),
+    'name_and_geo': lambda name, geo: (name, geo),
+    'all': lambda name, geo: ('', ''),
+}
+
+
+def measure(run, repeat=3):
+    """Wall time (min / median / max), queries and peak memory of `run()`."""
+    timings = []
+    queries = 0
+    result = None
+    for _ in range(max(repeat, 1)):
+        count = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            started = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - started)
+        queries = count
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    run()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    if not tracing:
+        tracemalloc.stop()
+
+    return {
+        'wall_seconds': {
+            'min': round(min(timings), 6),
+            'median': round(statistics.median(timings), 6),
+            'max': round(max(timings), 6),
+        },
+        'queries': queries,
+        'peak_memory_bytes': peak,
+        'results': result,
+    }
+
+
+def _manual_case(offer_name_q, geo_q):
+    from apps.offers.recording import MatchRecorder
+    from apps.offers.views import OffersMatcherView
+
+    view = OffersMatcherView()
+
+    def run():
+        return len(view._perform_manual_match(offer_name_q, geo_q, recorder=MatchRecorder(defer=False)))
+    return run
+
+
+def _results_case(engine):
+    from apps.offers.views import OffersMatcherResultsView
+
+    factory = RequestFactory()
+    view = OffersMatcherResultsView.as_view()
+
+    def run():
+        request = factory.get(reverse('offers:matcher_results'))
+        request.user = AnonymousUser()
+        if engine:
+            with override_settings(OFFERS_MATCHER_ENGINE=engine):
+                response = view(request)
+                response.render()
+        else:
+            response = view(request)
+            response.render()
+        return len(response.context_data['matches'])
+    return run
+
+
+def run_suite(offer_name_q, geo_q, engines=None, repeat=3, progress=None):
+    """Run every case; returns {case name: measurement}."""
+    cases = [
+        (f'manual:{mode}', _manual_case(*terms(offer_name_q, geo_q)))
+        for mode, terms in MANUAL_MODES.items()
+    ]
+    for engine in engines or [None]:
+        cases.append((f'results:default:{engine}' if engine else 'results:default', _results_case(engine)))
+
+    report = {}
+    with using_backend(NullBackend()):
+        for name, run in cases:
+            report[name] = measure(run, repeat=repeat)
+            if progress:
+                progress(name, report[name])
+    return report
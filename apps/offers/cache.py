@@ -0,0 +1,185 @@
+"""
+Result cache for matcher searches.
+
+Keys are the normalized search (mode, offer name, geo, ...) plus
+MatcherDataVersion, which is bumped whenever offers, wishlists, advertisers
+or publishers are written (bulk uploads included). A write therefore never
+has to find and delete cached entries: results computed from older data are
+simply never looked up again and age out of the backend.
+
+settings.OFFERS_MATCHER_CACHE picks the backend:
+    {'BACKEND': 'lru', 'MAX_ENTRIES': 128}        in-process LRU (default)
+    {'BACKEND': 'django', 'ALIAS': 'default', 'TIMEOUT': 300}
+    {'BACKEND': 'none'}                            caching disabled
+Every backend counts hits and misses (`stats()`).
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from apps.offers.models import MatcherDataVersion
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class _CountingBackend:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def get(self, key):
+        value = self._get(key)
+        if value is _MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+class LRUBackend(_CountingBackend):
+    """Per-process cache keeping the `max_entries` most recently used results."""
+
+    name = 'lru'
+
+    def __init__(self, max_entries=128):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend(_CountingBackend):
+    """Shared cache through a Django cache alias (eviction is up to that backend)."""
+
+    name = 'django'
+
+    def __init__(self, alias='default', timeout=300):
+        super().__init__()
+        from django.core.cache import caches
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def _get(self, key):
+        return self.cache.get(self._key(key), _MISSING)
+
+    def set(self, key, value):
+        self.cache.set(self._key(key), value, self.timeout)
+
+    def clear(self):
+        # Entries of older data versions are unreachable and expire on their own
+        pass
+
+    def _key(self, key):
+        return 'offers:matcher:' + hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+class NullBackend(_CountingBackend):
+    name = 'none'
+
+    def _get(self, key):
+        return _MISSING
+
+    def set(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _build_backend(getattr(settings, 'OFFERS_MATCHER_CACHE', {}))
+    return _backend
+
+
+@contextmanager
+def using_backend(backend):
+    """Temporarily serve every lookup from `backend` (e.g. NullBackend() in benchmarks)."""
+    global _backend
+    previous, _backend = _backend, backend
+    try:
+        yield backend
+    finally:
+        _backend = previous
+
+
+def _build_backend(config):
+    name = config.get('BACKEND', 'lru')
+    if name == 'lru':
+        return LRUBackend(max_entries=config.get('MAX_ENTRIES', 128))
+    if name == 'django':
+        return DjangoCacheBackend(alias=config.get('ALIAS', 'default'), timeout=config.get('TIMEOUT', 300))
+    if name == 'none':
+        return NullBackend()
+    raise ImproperlyConfigured(f"Unknown OFFERS_MATCHER_CACHE backend {name!r}; use 'lru', 'django' or 'none'")
+
+
+def cached(key, compute):
+    """
+    Return `(value, hit)` for `key` at the current data version, calling
+    `compute()` and storing its result on a miss.
+    """
+    backend = get_backend()
+    full_key = (MatcherDataVersion.current(),) + tuple(key)
+    value = backend.get(full_key)
+    if value is not _MISSING:
+        logger.info(f"⚡ Matcher cache hit {key} ({backend.stats()})")
+        return value, True
+
+    value = compute()
+    backend.set(full_key, value)
+    return value, False
+
+
+def peek(key):
+    """Cached value for `key` at the current data version, or None."""
+    value = get_backend().get((MatcherDataVersion.current(),) + tuple(key))
+    return None if value is _MISSING else value
+
+
+def stats():
+    return get_backend().stats()
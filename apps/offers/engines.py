@@ -0,0 +1,139 @@
+"""
+Engines for the default flow of OffersMatcherResultsView.
+
+The default flow lists
+  * matches:     same campaign name and same geo string
+  * suggestions: same geo string, different campaign name
+both compared after strip() + casefold(), in wishlist-major / offer-minor
+order. Each engine returns `(matches, suggestions)` as lists of
+{'wishlist', 'offer'} dicts:
+
+  * precomputed - matches flagged in MatchHistory on write (see
+                  apps.offers.incremental), read with one indexed query;
+                  suggestions are the other same-geo pairs, without
+                  comparing names
+  * python      - offers grouped by geo in a dict, one pass over wishlists
+  * pandas      - columnar frames joined on geo with a single merge
+
+The engine is chosen with settings.OFFERS_MATCHER_ENGINE. EngineParityTests
+(apps/offers/tests.py) keep them in agreement on synthetic catalogs;
+`manage.py check_matcher_engines` runs the same comparison on live data.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from apps.offers.incremental import precomputed_pair_ids
+from apps.offers.matching import casefolded, same_name_and_geo
+from apps.offers.models import Offer
+from apps.publishers.models import Wishlist
+
+DEFAULT_ENGINE = 'precomputed'
+
+
+def active_offers():
+    return Offer.objects.filter(is_active=True).select_related('advertiser').order_by('-created_at', '-id')
+
+
+def all_wishlists():
+    return Wishlist.objects.select_related('publisher').order_by('id')
+
+
+def python_engine():
+    offers_by_geo = defaultdict(list)
+    for off in active_offers():
+        offers_by_geo[casefolded(off.geo)].append(off)
+
+    matches, suggestions = [], []
+    for wl in all_wishlists():
+        wl_name = casefolded(wl.desired_campaign)
+        for off in offers_by_geo.get(casefolded(wl.geo), ()):
+            if casefolded(off.campaign_name) == wl_name:
+                matches.append({'wishlist': wl, 'offer': off})
+            else:
+                suggestions.append({'wishlist': wl, 'offer': off})
+    return matches, suggestions
+
+
+def precomputed_engine():
+    offers = list(active_offers())
+    wishlists = list(all_wishlists())
+    offer_by_id = {off.id: off for off in offers}
+    wishlist_by_id = {wl.id: wl for wl in wishlists}
+    offer_pos = {off.id: pos for pos, off in enumerate(offers)}
+
+    # Flagged pairs are re-checked against the loaded rows, so one left behind
+    # by a write that bypassed save() (e.g. QuerySet.update) is skipped
+    pairs = sorted(
+        (pair for pair in precomputed_pair_ids() if pair[0] in wishlist_by_id and pair[1] in offer_by_id),
+        key=lambda pair: (pair[0], offer_pos[pair[1]]),
+    )
+    matches = [
+        {'wishlist': wishlist_by_id[wl_id], 'offer': offer_by_id[off_id]}
+        for wl_id, off_id in pairs
+        if same_name_and_geo(offer_by_id[off_id], wishlist_by_id[wl_id])
+    ]
+    matched = defaultdict(set)
+    for pair in matches:
+        matched[pair['wishlist'].id].add(pair['offer'].id)
+
+    offers_by_geo = defaultdict(list)
+    for off in offers:
+        offers_by_geo[casefolded(off.geo)].append(off)
+    suggestions = []
+    for wl in wishlists:
+        same_geo = offers_by_geo.get(casefolded(wl.geo), ())
+        exact = matched.get(wl.id)
+        suggestions.extend(
+            {'wishlist': wl, 'offer': off} for off in same_geo if not exact or off.id not in exact
+        )
+    return matches, suggestions
+
+
+def _frame(queryset, name_field, prefix):
+    import pandas as pd
+
+    rows = list(queryset.values_list('id', name_field, 'geo'))
+    frame = pd.DataFrame(rows, columns=[f'{prefix}_id', 'name', 'geo'])
+    frame[f'{prefix}_pos'] = range(len(frame))
+    for column in ('name', 'geo'):
+        frame[column] = frame[column].fillna('').astype(str).str.strip().str.casefold()
+    return frame
+
+
+def pandas_engine():
+    offers_qs = active_offers()
+    wishlists_qs = all_wishlists()
+    offers = _frame(offers_qs, 'campaign_name', 'off')
+    wishlists = _frame(wishlists_qs, 'desired_campaign', 'wl')
+
+    pairs = wishlists.merge(offers, on='geo', suffixes=('_wl', '_off'))
+    pairs = pairs.sort_values(['wl_pos', 'off_pos'], kind='stable')
+    is_match = (pairs['name_wl'] == pairs['name_off']).to_numpy()
+
+    offer_objs = offers_qs.in_bulk(pairs['off_id'].unique().tolist())
+    wishlist_objs = wishlists_qs.in_bulk(pairs['wl_id'].unique().tolist())
+
+    matches, suggestions = [], []
+    for wl_id, off_id, matched in zip(pairs['wl_id'].tolist(), pairs['off_id'].tolist(), is_match):
+        pair = {'wishlist': wishlist_objs[wl_id], 'offer': offer_objs[off_id]}
+        (matches if matched else suggestions).append(pair)
+    return matches, suggestions
+
+
+ENGINES = {
+    'precomputed': precomputed_engine,
+    'python': python_engine,
+    'pandas': pandas_engine,
+}
+
+
+def get_engine(name=None):
+    name = name or getattr(settings, 'OFFERS_MATCHER_ENGINE', DEFAULT_ENGINE)
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown OFFERS_MATCHER_ENGINE {name!r}; choose one of {', '.join(ENGINES)}"
+        )
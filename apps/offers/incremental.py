@@ -0,0 +1,91 @@
+"""
+Incremental exact-match computation for the default matcher results flow.
+
+When offers or wishlists are written (their save() and the CSV/XLSX bulk
+uploads) only those rows are matched: the other side is looked up through
+its indexed normalized campaign name column, and the pairs that also share
+the geo are upserted into MatchHistory with is_exact set. The flag of their
+earlier pairs is cleared first, so a renamed, moved or deactivated row drops
+out. The results page then reads the current pairs with one indexed query
+(`precomputed_pair_ids()`) instead of comparing every offer with every
+wishlist.
+
+Existing rows are matched once with `manage.py precompute_matches`.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Value
+
+from apps.offers.matching import same_name_and_geo
+from apps.offers.models import Offer, MatchHistory
+from apps.offers.recording import MatchRecorder
+from apps.publishers.models import Wishlist
+
+logger = logging.getLogger(__name__)
+
+# Keeps the IN (...) lists of the name lookups bounded on bulk writes
+LOOKUP_CHUNK_SIZE = 500
+
+
+def _by_name(queryset, name_field, names):
+    rows = defaultdict(list)
+    names = sorted(names)
+    for i in range(0, len(names), LOOKUP_CHUNK_SIZE):
+        lookup = {f'{name_field}__in': names[i:i + LOOKUP_CHUNK_SIZE]}
+        for obj in queryset.filter(**lookup):
+            rows[getattr(obj, name_field)].append(obj)
+    return rows
+
+
+def _clear_exact(field, ids):
+    ids = sorted(ids)
+    for i in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+        MatchHistory.objects.filter(is_exact=True, **{f'{field}__in': ids[i:i + LOOKUP_CHUNK_SIZE]}).update(
+            is_exact=False
+        )
+
+
+def record_offer_matches(offers):
+    """Re-flag the exact MatchHistory pairs of the given saved offers; returns the pair count."""
+    offers = [off for off in offers if off.pk]
+    if not offers:
+        return 0
+
+    active = [off for off in offers if off.is_active]
+    wishlists = _by_name(Wishlist.objects.all(), 'desired_campaign_norm',
+                         {off.campaign_name_norm for off in active})
+    recorder = MatchRecorder(defer=False, exact=True)
+    for off in active:
+        for wl in wishlists.get(off.campaign_name_norm, ()):
+            if same_name_and_geo(off, wl):
+                recorder.add(off, wl)
+    with transaction.atomic():
+        _clear_exact('offer_id', {off.pk for off in offers})
+        return recorder.flush()
+
+
+def record_wishlist_matches(wishlists):
+    """Re-flag the exact MatchHistory pairs of the given saved wishlists; returns the pair count."""
+    wishlists = [wl for wl in wishlists if wl.pk]
+    if not wishlists:
+        return 0
+
+    offers = _by_name(Offer.objects.filter(is_active=True), 'campaign_name_norm',
+                      {wl.desired_campaign_norm for wl in wishlists})
+    recorder = MatchRecorder(defer=False, exact=True)
+    for wl in wishlists:
+        for off in offers.get(wl.desired_campaign_norm, ()):
+            if same_name_and_geo(off, wl):
+                recorder.add(off, wl)
+    with transaction.atomic():
+        _clear_exact('wishlist_id', {wl.pk for wl in wishlists})
+        return recorder.flush()
+
+
+def precomputed_pair_ids():
+    """(wishlist id, offer id) of the pairs flagged exact, read through matchhistory_exact_wl_idx."""
+    # Value(True) keeps "is_exact = true"; a plain True renders "WHERE is_exact",
+    # which SQLite and MySQL do not serve from the index
+    return list(MatchHistory.objects.filter(is_exact=Value(True)).values_list('wishlist_id', 'offer_id'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.offers.models import Offer
+from apps.publishers.models import Wishlist
+
+
+class Command(BaseCommand):
+    help = 'Fill the normalized campaign name columns, geo tables and name trigram tables for existing rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows processed per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model, norm_field in (
+            (Offer, 'campaign_name_norm'),
+            (Wishlist, 'desired_campaign_norm'),
+        ):
+            total = 0
+            batch = []
+            for obj in model.objects.order_by('id').iterator(chunk_size=batch_size):
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    self._process(model, norm_field, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                self._process(model, norm_field, batch)
+                total += len(batch)
+
+            self.stdout.write(self.style.SUCCESS(f"Indexed {total} {model._meta.verbose_name_plural}"))
+
+    def _process(self, model, norm_field, batch):
+        for obj in batch:
+            obj.refresh_search_fields()
+        with transaction.atomic():
+            model.objects.bulk_update(batch, [norm_field], batch_size=len(batch))
+            model.sync_search_index(batch)
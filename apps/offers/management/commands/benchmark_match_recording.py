@@ -0,0 +1,76 @@
+import time
+from itertools import islice, product
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.offers.models import Offer, MatchHistory
+from apps.offers.recording import MatchRecorder
+from apps.publishers.models import Wishlist
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare DB round trips of per-pair get_or_create vs batched MatchHistory recording (nothing is kept)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pairs', type=int, default=5000, help='Number of offer/wishlist pairs to record')
+        parser.add_argument('--batch-size', type=int, default=None, help='MatchRecorder batch size')
+
+    def handle(self, *args, **options):
+        offers = list(Offer.objects.filter(is_active=True).order_by('id')[:options['pairs']])
+        wishlists = list(Wishlist.objects.order_by('id')[:options['pairs']])
+        pairs = list(islice(product(offers, wishlists), options['pairs']))
+        if not pairs:
+            raise CommandError('Need at least one active offer and one wishlist to benchmark.')
+
+        self.stdout.write(f"Benchmarking {len(pairs)} pair(s)\n")
+        self.stdout.write(f"{'strategy':<28}{'pass':<10}{'round trips':>12}{'seconds':>10}")
+
+        try:
+            with transaction.atomic():
+                # Start from a clean slate for these pairs; rolled back below.
+                MatchHistory.objects.filter(offer__in=offers, wishlist__in=wishlists).delete()
+
+                for label, run in (
+                    ('get_or_create per pair', lambda: self._legacy(pairs)),
+                    ('MatchRecorder bulk', lambda: self._batched(pairs, options['batch_size'])),
+                ):
+                    sid = transaction.savepoint()
+                    for pass_name in ('new', 'existing'):
+                        queries, seconds = self._measure(run)
+                        self.stdout.write(f"{label:<28}{pass_name:<10}{queries:>12}{seconds:>10.3f}")
+                    transaction.savepoint_rollback(sid)
+
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished; no MatchHistory rows were kept.'))
+
+    def _measure(self, run):
+        round_trips = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal round_trips
+            round_trips += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            started = time.perf_counter()
+            run()
+            seconds = time.perf_counter() - started
+        return round_trips, seconds
+
+    def _legacy(self, pairs):
+        for off, wl in pairs:
+            MatchHistory.objects.get_or_create(offer=off, wishlist=wl)
+
+    def _batched(self, pairs, batch_size):
+        recorder = MatchRecorder(batch_size=batch_size, defer=False)
+        for off, wl in pairs:
+            recorder.add(off, wl)
+        recorder.flush()
@@ -0,0 +1,112 @@
+import json
+import platform
+import subprocess
+from datetime import datetime
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.offers.benchmarks import run_suite
+from apps.offers.engines import ENGINES
+from apps.offers.synthetic import GEOS, generate_catalog
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Time the offers matcher (manual search modes and the results page default flow) on a '
+            'synthetic catalog and write wall time, query count and peak memory to a JSON report. '
+            'The catalog is rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offers', type=int, default=5000, help='Synthetic offers')
+        parser.add_argument('--wishlists', type=int, default=5000, help='Synthetic wishlists')
+        parser.add_argument('--advertisers', type=int, default=50, help='Synthetic advertisers')
+        parser.add_argument('--publishers', type=int, default=50, help='Synthetic publishers')
+        parser.add_argument('--campaigns', type=int, default=200, help='Distinct campaign names')
+        parser.add_argument('--geos', type=int, default=len(GEOS), help='Distinct geo codes')
+        parser.add_argument('--name-overlap', type=float, default=1.0,
+                            help='Share of wishlists asking for a campaign name offers use (0-1)')
+        parser.add_argument('--seed', type=int, default=0, help='Synthetic catalog seed')
+        parser.add_argument('--current-data', action='store_true',
+                            help='Benchmark the existing rows instead of a synthetic catalog')
+        parser.add_argument('--offer-name', default='shop', help='Name term of the manual searches')
+        parser.add_argument('--geo', default=GEOS[0], help='Geo term of the manual searches')
+        parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES),
+                            help='Default-flow engines to time (default: the configured one)')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case')
+        parser.add_argument('--output', default='matcher-benchmark.json', help="Report path ('-' for stdout)")
+
+    def handle(self, *args, **options):
+        catalog = None
+        try:
+            with transaction.atomic():
+                if not options['current_data']:
+                    catalog = generate_catalog(
+                        offers=options['offers'],
+                        wishlists=options['wishlists'],
+                        advertisers=options['advertisers'],
+                        publishers=options['publishers'],
+                        campaigns=options['campaigns'],
+                        seed=options['seed'],
+                        geos=options['geos'],
+                        name_overlap=options['name_overlap'],
+                    )
+                    catalog.update(
+                        campaigns=options['campaigns'],
+                        geos=options['geos'],
+                        name_overlap=options['name_overlap'],
+                        seed=options['seed'],
+                    )
+                cases = run_suite(
+                    options['offer_name'],
+                    options['geo'],
+                    engines=options['engines'],
+                    repeat=options['repeat'],
+                    progress=self._progress,
+                )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        report = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'revision': self._revision(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'engine': getattr(settings, 'OFFERS_MATCHER_ENGINE', None),
+            },
+            'catalog': catalog or 'current data',
+            'search': {'offer_name': options['offer_name'], 'geo': options['geo']},
+            'repeat': options['repeat'],
+            'cases': cases,
+        }
+
+        text = json.dumps(report, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(text)
+        else:
+            with open(options['output'], 'w') as fh:
+                fh.write(text + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def _progress(self, name, result):
+        self.stderr.write(
+            f"{name:<32}{result['wall_seconds']['median']:>10.4f}s{result['queries']:>8} queries"
+            f"{result['peak_memory_bytes'] / 1024 / 1024:>10.1f} MiB{result['results']:>8} results"
+        )
+
+    def _revision(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
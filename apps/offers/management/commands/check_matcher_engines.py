@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.offers.engines import ENGINES
+from apps.offers.synthetic import generate_catalog
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Check that every default-flow matcher engine returns the same matches and suggestions '
+            'as the python engine, on the current data and/or a synthetic catalog (rolled back). '
+            'The test suite runs the synthetic comparison (EngineParityTests); this is for live data.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES), default=sorted(ENGINES))
+        parser.add_argument('--synthetic', action='store_true', help='Also check a generated catalog')
+        parser.add_argument('--only-synthetic', action='store_true', help='Skip the current data')
+        parser.add_argument('--offers', type=int, default=2000, help='Synthetic offers')
+        parser.add_argument('--wishlists', type=int, default=2000, help='Synthetic wishlists')
+        parser.add_argument('--seed', type=int, nargs='+', default=[0], help='Synthetic catalog seed(s)')
+
+    def handle(self, *args, **options):
+        failures = 0
+        if not options['only_synthetic']:
+            failures += self._compare('current data', options['engines'])
+
+        if options['synthetic'] or options['only_synthetic']:
+            for seed in options['seed']:
+                try:
+                    with transaction.atomic():
+                        generate_catalog(offers=options['offers'], wishlists=options['wishlists'], seed=seed)
+                        failures += self._compare(f'synthetic seed {seed}', options['engines'])
+                        raise _Rollback
+                except _Rollback:
+                    pass
+
+        if failures:
+            raise CommandError(f"{failures} engine comparison(s) differ from the python engine")
+        self.stdout.write(self.style.SUCCESS('All engines agree with the python engine.'))
+
+    def _compare(self, label, engines):
+        reference = self._pairs(ENGINES['python']())
+        self.stdout.write(f"{label}: {len(reference[0])} matches, {len(reference[1])} suggestions")
+
+        failures = 0
+        for name in engines:
+            if name == 'python':
+                continue
+            result = self._pairs(ENGINES[name]())
+            differences = 0
+            for kind, expected, got in zip(('matches', 'suggestions'), reference, result):
+                if expected == got:
+                    continue
+                differences += 1
+                missing = set(expected) - set(got)
+                extra = set(got) - set(expected)
+                order_only = not missing and not extra
+                self.stdout.write(self.style.ERROR(
+                    f"  {name}: {kind} differ"
+                    + (" (order only)" if order_only else f" ({len(missing)} missing, {len(extra)} extra)")
+                ))
+                for wl_id, off_id in sorted(missing)[:5]:
+                    self.stdout.write(f"    missing wishlist={wl_id} offer={off_id}")
+                for wl_id, off_id in sorted(extra)[:5]:
+                    self.stdout.write(f"    extra wishlist={wl_id} offer={off_id}")
+            if not differences:
+                self.stdout.write(f"  {name}: identical")
+            failures += differences
+        return failures
+
+    def _pairs(self, result):
+        return tuple(
+            [(pair['wishlist'].id, pair['offer'].id) for pair in pairs]
+            for pairs in result
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.offers.incremental import record_offer_matches
+from apps.offers.models import Offer
+
+
+class Command(BaseCommand):
+    help = 'Record the exact (same name and geo) matches of all active offers in MatchHistory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Offers matched per batch')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        offers = Offer.objects.filter(is_active=True).order_by('id')
+        last_id = 0
+        total_offers = total_pairs = 0
+        while True:
+            batch = list(offers.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            total_pairs += record_offer_matches(batch)
+            total_offers += len(batch)
+            last_id = batch[-1].id
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Matched {total_offers} active offers; submitted {total_pairs} pair(s) to MatchHistory"
+        ))
@@ -0,0 +1,73 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.offers.models import Offer
+from apps.offers.recording import MatchRecorder
+from apps.offers.sharding import match_shard, partition
+from apps.publishers.models import Wishlist
+
+
+class Command(BaseCommand):
+    help = (
+        'Compute every exact (same name and geo) offer/wishlist match offline, sharded by geo '
+        'across worker processes, and record the pairs in MatchHistory'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes (1 runs the shards in this process)')
+        parser.add_argument('--shards', type=int, default=None,
+                            help='Geo shards (default: 4 per worker)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Pairs per MatchHistory INSERT')
+        parser.add_argument('--dry-run', action='store_true', help='Match without writing MatchHistory')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        shards = options['shards'] or workers * 4
+        if workers < 1 or shards < 1:
+            raise CommandError('--workers and --shards must be positive')
+
+        started = time.perf_counter()
+        offer_rows = list(
+            Offer.objects.filter(is_active=True).order_by('id').values_list('id', 'campaign_name', 'geo')
+        )
+        wishlist_rows = list(Wishlist.objects.order_by('id').values_list('id', 'desired_campaign', 'geo'))
+        parts = partition(offer_rows, wishlist_rows, shards)
+        loaded = time.perf_counter()
+
+        if workers == 1 or len(parts) <= 1:
+            results = list(map(match_shard, parts))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(parts))) as pool:
+                results = list(pool.map(match_shard, parts))
+        matched_at = time.perf_counter()
+
+        evaluated = sum(count for count, _ in results)
+        recorder = MatchRecorder(batch_size=options['batch_size'], defer=False)
+        for _, pairs in results:
+            for off_id, wl_id in pairs:
+                recorder.add_ids(off_id, wl_id)
+        matches = len(recorder)
+        if not options['dry_run']:
+            recorder.flush()
+        finished = time.perf_counter()
+
+        match_seconds = max(matched_at - loaded, 1e-9)
+        total_seconds = max(finished - started, 1e-9)
+        self.stdout.write(
+            f"{len(offer_rows)} active offers x {len(wishlist_rows)} wishlists in {len(parts)} shard(s), "
+            f"{workers} worker(s)\n"
+            f"  load   {loaded - started:.2f}s\n"
+            f"  match  {matched_at - loaded:.2f}s  "
+            f"({evaluated / match_seconds:,.0f} pairs evaluated/s, {matches / match_seconds:,.0f} matches/s)\n"
+            f"  write  {finished - matched_at:.2f}s{' (dry run)' if options['dry_run'] else ''}\n"
+            f"  total  {total_seconds:.2f}s  "
+            f"({evaluated / total_seconds:,.0f} pairs evaluated/s, {matches / total_seconds:,.0f} matches/s)"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Evaluated {evaluated} pair(s); "
+            f"{'found' if options['dry_run'] else 'submitted'} {matches} match(es) to MatchHistory"
+        ))
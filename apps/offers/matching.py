@@ -0,0 +1,453 @@
+"""
+Inverted-index matching engine used by the offers matcher.
+
+Instead of walking every active offer against every wishlist, the index is
+built once from both sides and keeps:
+  - geo code -> offer ids / wishlist ids (plus the rows that have no geo)
+  - normalized company name -> offer ids / wishlist ids
+  - normalized campaign name -> offer ids / wishlist ids
+
+Partial name lookups ("contains X") are first narrowed through the
+OfferNameGram / WishlistNameGram trigram tables and only the returned
+candidates are substring-checked.
+
+A search only intersects those candidate sets, so its cost follows the
+number of matches instead of offers x wishlists. The strategies, their
+priority order, `match_type` and `match_reason` are the same as the
+original nested-loop implementation in OffersMatcherView.
+
+Geo matches - an offer and a wishlist that both list the searched code -
+come from `geo_pair_ids()`, one OfferGeo x WishlistGeo join on the indexed
+code column. `geo_pairs()` serves the exact / geo modes of
+OffersMatcherResultsView from it, and MatchIndex pairs the rows listing the
+searched geo with it; `same_name_and_geo()` is the comparison of the default
+flow (see apps.offers.engines).
+"""
+import logging
+from collections import defaultdict
+
+from django.db import connection
+
+from apps.offers.models import Offer, OfferGeo, OfferNameGram
+from apps.offers.normalization import norm, norm_geo, geo_set
+from apps.publishers.models import Wishlist, WishlistGeo, WishlistNameGram
+
+logger = logging.getLogger(__name__)
+
+NO_COMPANY = '_no_company'
+
+
+def _field_value(obj, field_name, default=''):
+    """Safely get field value, return default if None/empty"""
+    value = getattr(obj, field_name, default)
+    return value if value is not None else default
+
+
+def _field_match(offer_field, wishlist_field, exact_match=True):
+    """Check if fields match. If either is empty, consider it a match."""
+    if not offer_field or not wishlist_field:
+        return True
+    if exact_match:
+        return norm(offer_field) == norm(wishlist_field)
+    try:
+        # Offer payout >= desired payout
+        return float(offer_field) >= float(wishlist_field)
+    except (ValueError, TypeError):
+        return norm(offer_field) == norm(wishlist_field)
+
+
+def fields_compatible(offer, wishlist):
+    """Payout / KPI / model checks applied by the name based strategies."""
+    return (
+        _field_match(_field_value(offer, 'payout'), _field_value(wishlist, 'desired_payout'), exact_match=False)
+        and _field_match(_field_value(offer, 'kpi'), _field_value(wishlist, 'desired_kpi'))
+        and _field_match(_field_value(offer, 'model'), _field_value(wishlist, 'desired_model'))
+    )
+
+
+def geo_pair_ids(geo_code, campaign_name=None):
+    """
+    (offer id, wishlist id) of the active offers and wishlists that both list
+    `geo_code`, wishlist-major with the newest offers first.
+
+    One query joining OfferGeo and WishlistGeo on their indexed code column.
+    With `campaign_name` both sides must also carry that (normalized) name.
+    """
+    qn = connection.ops.quote_name
+    sql = (
+        f"SELECT og.{qn('offer_id')}, wg.{qn('wishlist_id')}"
+        f" FROM {qn(OfferGeo._meta.db_table)} og"
+        f" INNER JOIN {qn(WishlistGeo._meta.db_table)} wg ON wg.{qn('code')} = og.{qn('code')}"
+        f" INNER JOIN {qn(Offer._meta.db_table)} o ON o.{qn('id')} = og.{qn('offer_id')}"
+    )
+    where = [f"og.{qn('code')} = %s", f"o.{qn('is_active')} = %s"]
+    params = [norm_geo(geo_code), True]
+    if campaign_name is not None:
+        sql += f" INNER JOIN {qn(Wishlist._meta.db_table)} w ON w.{qn('id')} = wg.{qn('wishlist_id')}"
+        where += [f"o.{qn('campaign_name_norm')} = %s", f"w.{qn('desired_campaign_norm')} = %s"]
+        params += [norm(campaign_name), norm(campaign_name)]
+    sql += (
+        f" WHERE {' AND '.join(where)}"
+        f" ORDER BY wg.{qn('wishlist_id')}, o.{qn('created_at')} DESC, o.{qn('id')} DESC"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [tuple(row) for row in cursor.fetchall()]
+
+
+def geo_pairs(geo_code, campaign_name=None):
+    """
+    Pairs of active offers and wishlists that both list `geo_code` (and with
+    `campaign_name` both carry that name), as match dicts in geo_pair_ids() order.
+    """
+    pairs = geo_pair_ids(geo_code, campaign_name=campaign_name)
+    offers = Offer.objects.select_related('advertiser').in_bulk({off_id for off_id, _ in pairs})
+    wishlists = Wishlist.objects.select_related('publisher').in_bulk({wl_id for _, wl_id in pairs})
+    return [{'wishlist': wishlists[wl_id], 'offer': offers[off_id]} for off_id, wl_id in pairs]
+
+
+def casefolded(s):
+    return (s or '').strip().casefold()
+
+
+def same_name_and_geo(offer, wishlist):
+    """Default results flow: same campaign name and same geo string."""
+    return (
+        casefolded(offer.campaign_name) == casefolded(wishlist.desired_campaign)
+        and casefolded(offer.geo) == casefolded(wishlist.geo)
+    )
+
+
+class _Side:
+    """Indexed view over one side of the match (offers or wishlists)."""
+
+    def __init__(self, objects, name_field, company_getter, name_candidates=None):
+        self.name_candidates = name_candidates
+        self.objects = {}
+        self.position = {}
+        self.names = {}
+        self.geos = {}
+        self.company = {}
+        self.by_geo = defaultdict(set)
+        self.without_geo = set()
+        self.by_company = {}
+        self.by_name = defaultdict(list)
+
+        for pos, obj in enumerate(objects):
+            pk = obj.id
+            self.objects[pk] = obj
+            self.position[pk] = pos
+
+            name = norm(_field_value(obj, name_field))
+            self.names[pk] = name
+            self.by_name[name].append(pk)
+
+            geos = geo_set(_field_value(obj, 'geo'))
+            self.geos[pk] = geos
+            if geos:
+                for code in geos:
+                    self.by_geo[code].add(pk)
+            else:
+                self.without_geo.add(pk)
+
+            company_name = company_getter(obj)
+            company = norm(company_name) if company_name else NO_COMPANY
+            self.company[pk] = company
+            self.by_company.setdefault(company, []).append(pk)
+
+        # Position of each row when walking the company buckets in order;
+        # used where the original code iterated company by company.
+        self.company_position = {}
+        for bucket in self.by_company.values():
+            for pk in bucket:
+                self.company_position[pk] = len(self.company_position)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def ordered(self, ids):
+        return sorted(ids, key=self.position.__getitem__)
+
+    def all_ids(self):
+        return list(self.objects)
+
+    def with_geo(self, geo_code):
+        """Rows accepted by has_geo_match(): listed geo or no geo at all."""
+        return self.by_geo.get(geo_code, set()) | self.without_geo
+
+    def overlapping(self, geos):
+        """Rows whose geo set overlaps `geos`; None means every row."""
+        if not geos:
+            return None
+        ids = set(self.without_geo)
+        for code in geos:
+            ids |= self.by_geo.get(code, set())
+        return ids
+
+    def containing(self, term):
+        """Ids whose normalized name contains `term` (case-insensitive)."""
+        candidates = self.name_candidates(term) if self.name_candidates else None
+        if candidates is not None:
+            names = self.names
+            return {pk for pk in candidates if pk in names and term in names[pk]}
+
+        # Term too short for the trigram index: scan the distinct names
+        ids = set()
+        for name, pks in self.by_name.items():
+            if name and term in name:
+                ids.update(pks)
+        return ids
+
+    def group_by_company(self, ids):
+        groups = {}
+        for pk in self.ordered(ids):
+            groups.setdefault(self.company[pk], []).append(pk)
+        return groups
+
+
+class MatchIndex:
+    """
+    Inverted indexes over active offers and all wishlists.
+
+    `search()` reproduces the four search modes of
+    OffersMatcherView._perform_manual_match:
+      * offer name only
+      * geo only
+      * offer name + geo
+      * neither (company match all)
+
+    `iter_search()` yields the same matches lazily, so a caller that only
+    needs the first page stops the search there.
+
+    Rows that both list the searched geo are paired through geo_pair_ids()
+    (one query per search); rows without a geo match every geo and come from
+    the index. `use_geo_table=False` pairs them in memory instead.
+    """
+
+    def __init__(self, offers, wishlists, use_name_grams=True, use_geo_table=True):
+        self.use_geo_table = use_geo_table
+        self.offers = _Side(
+            offers, 'campaign_name',
+            lambda off: off.advertiser.company_name if off.advertiser else None,
+            OfferNameGram.candidates if use_name_grams else None,
+        )
+        self.wishlists = _Side(
+            wishlists, 'desired_campaign',
+            lambda wl: wl.publisher.company_name if wl.publisher else None,
+            WishlistNameGram.candidates if use_name_grams else None,
+        )
+
+    @classmethod
+    def build(cls):
+        offers = Offer.objects.filter(is_active=True).select_related('advertiser')
+        wishlists = Wishlist.objects.all().select_related('publisher')
+        return cls(offers, wishlists)
+
+    def search(self, offer_name_norm, geo_norm):
+        """Return match dicts ({'wishlist', 'offer', 'match_reason', 'match_type'})."""
+        return list(self.iter_search(offer_name_norm, geo_norm))
+
+    def iter_search(self, offer_name_norm, geo_norm):
+        """Yield the match dicts of search() one by one, each pair once."""
+        common = [c for c in self.offers.by_company if c in self.wishlists.by_company]
+        logger.info(f"🏢 Found {len(common)} common companies")
+
+        if offer_name_norm and not geo_norm:
+            candidates = self._search_name_only(offer_name_norm)
+        elif geo_norm and not offer_name_norm:
+            candidates = self._search_geo_only(geo_norm)
+        elif offer_name_norm and geo_norm:
+            candidates = self._search_name_and_geo(offer_name_norm, geo_norm)
+        else:
+            candidates = self._search_all()
+
+        seen_pairs = set()
+        for off_id, wl_id, match_type, match_reason in candidates:
+            pair_id = (off_id, wl_id)
+            if pair_id in seen_pairs:
+                continue
+            seen_pairs.add(pair_id)
+            yield {
+                'wishlist': self.wishlists.objects[wl_id],
+                'offer': self.offers.objects[off_id],
+                'match_reason': match_reason,
+                'match_type': match_type,
+            }
+
+    def _geo_partners(self, geo):
+        """
+        ({offer id: wishlist ids}, {wishlist id: offer ids}) of the indexed
+        rows that both list `geo`.
+        """
+        offers, wishlists = self.offers, self.wishlists
+        if self.use_geo_table:
+            pairs = [
+                (off_id, wl_id) for off_id, wl_id in geo_pair_ids(geo)
+                if off_id in offers.objects and wl_id in wishlists.objects
+            ]
+        else:
+            pairs = [
+                (off_id, wl_id)
+                for off_id in offers.by_geo.get(geo, ()) for wl_id in wishlists.by_geo.get(geo, ())
+            ]
+        by_offer, by_wishlist = defaultdict(set), defaultdict(set)
+        for off_id, wl_id in pairs:
+            by_offer[off_id].add(wl_id)
+            by_wishlist[wl_id].add(off_id)
+        return by_offer, by_wishlist
+
+    @staticmethod
+    def _ordered_partners(side, ids, memo):
+        """side.ordered(ids), sorted once per distinct id set (most rows share theirs)."""
+        key = frozenset(ids)
+        if key not in memo:
+            memo[key] = side.ordered(key)
+        return memo[key]
+
+    def _fields_compatible(self, off_id, wl_id):
+        return fields_compatible(self.offers.objects[off_id], self.wishlists.objects[wl_id])
+
+    def _shared_company(self, off_id, wl_id):
+        """Normalized company if both sides name the same company, else ''."""
+        company = self.offers.company[off_id]
+        if company == NO_COMPANY or company != self.wishlists.company[wl_id]:
+            return ''
+        return company
+
+    # CASE 1: ONLY offer_name is provided (partial match)
+    def _search_name_only(self, term):
+        logger.info("🎯 Search Mode: OFFER NAME ONLY (partial matching)")
+        offers, wishlists = self.offers, self.wishlists
+        name_offers = offers.ordered(offers.containing(term))
+        logger.info(f"📊 Found {len(name_offers)} offers with name containing '{term}'")
+
+        # STRATEGY 1: Match by COMPANY NAME (with geo overlap)
+        for off_id in name_offers:
+            company = offers.company[off_id]
+            overlap = wishlists.overlapping(offers.geos[off_id])
+
+            if company != NO_COMPANY:
+                bucket = wishlists.by_company.get(company, [])
+                if overlap is None:
+                    candidates = bucket
+                elif len(overlap) < len(bucket):
+                    candidates = wishlists.ordered(
+                        pk for pk in overlap if wishlists.company[pk] == company
+                    )
+                else:
+                    candidates = [pk for pk in bucket if pk in overlap]
+            else:
+                # Offer without company is compared with every publisher company
+                ids = wishlists.all_ids() if overlap is None else overlap
+                candidates = sorted(ids, key=wishlists.company_position.__getitem__)
+
+            for wl_id in candidates:
+                if not self._fields_compatible(off_id, wl_id):
+                    continue
+                wl_company = wishlists.company[wl_id]
+                label = wl_company if wl_company != NO_COMPANY else 'No company specified'
+                yield off_id, wl_id, 'company', f"Company match: {label}"
+
+        # STRATEGY 2: Match by OFFER NAME (partial match on both sides)
+        name_wishlists = wishlists.containing(term)
+        logger.info(f"📊 Found {len(name_wishlists)} wishlists looking for offers containing '{term}'")
+        for off_id in name_offers:
+            overlap = wishlists.overlapping(offers.geos[off_id])
+            if overlap is None:
+                candidates = name_wishlists
+            else:
+                small, large = sorted((overlap, name_wishlists), key=len)
+                candidates = {pk for pk in small if pk in large}
+
+            for wl_id in wishlists.ordered(candidates):
+                if not self._fields_compatible(off_id, wl_id):
+                    continue
+                company = self._shared_company(off_id, wl_id)
+                if company:
+                    yield (off_id, wl_id, 'company_and_name',
+                           f"Both company and offer name match: {company}")
+                else:
+                    yield (off_id, wl_id, 'offer_name',
+                           f"Offer name partial match: '{term}'")
+
+    # CASE 2: ONLY geo is provided
+    def _search_geo_only(self, geo):
+        logger.info(f"🌍 Search Mode: GEO ONLY (searching for: {geo})")
+        geo_offers = self.offers.with_geo(geo)
+        geo_wishlists = self.wishlists.with_geo(geo)
+
+        # STRATEGY 1: Same company + same geo
+        yield from self._company_pairs(geo_offers, geo_wishlists, 'company_and_geo',
+                                       lambda company: f"Company and geo match: {company}")
+
+        # STRATEGY 2: Any geo match (regardless of company)
+        _, listed_partners = self._geo_partners(geo)
+        ordered_offers = self.offers.ordered(geo_offers)
+        memo = {}
+        for wl_id in self.wishlists.ordered(geo_wishlists):
+            if wl_id in self.wishlists.without_geo:
+                partners = ordered_offers
+            else:
+                partners = self._ordered_partners(
+                    self.offers, listed_partners.get(wl_id, set()) | self.offers.without_geo, memo
+                )
+            for off_id in partners:
+                yield off_id, wl_id, 'geo_only', f"Geo match: {geo}"
+
+    # CASE 3: BOTH offer_name and geo are provided
+    def _search_name_and_geo(self, term, geo):
+        logger.info("🎯 Search Mode: BOTH OFFER NAME AND GEO")
+        geo_offers = self.offers.with_geo(geo)
+        geo_wishlists = self.wishlists.with_geo(geo)
+        name_geo_offers = self.offers.containing(term) & geo_offers
+        name_geo_wishlists = self.wishlists.containing(term) & geo_wishlists
+
+        # STRATEGY 1: Company + Offer Name (partial) + Geo
+        yield from self._company_pairs(
+            name_geo_offers, name_geo_wishlists, 'company_name_geo',
+            lambda company: f"Company '{company}', offer name contains '{term}', geo '{geo}'",
+        )
+
+        # STRATEGY 2: Offer Name (partial) + Geo match (companies may differ)
+        listed_partners, _ = self._geo_partners(geo)
+        ordered_wishlists = self.wishlists.ordered(name_geo_wishlists)
+        memo = {}
+        for off_id in self.offers.ordered(name_geo_offers):
+            if off_id in self.offers.without_geo:
+                partners = ordered_wishlists
+            else:
+                partners = self._ordered_partners(
+                    self.wishlists,
+                    (listed_partners.get(off_id, set()) | self.wishlists.without_geo) & name_geo_wishlists,
+                    memo,
+                )
+            for wl_id in partners:
+                company = self._shared_company(off_id, wl_id)
+                if company:
+                    yield (off_id, wl_id, 'company_name_geo',
+                           f"Company '{company}' + name contains '{term}' + geo '{geo}'")
+                else:
+                    yield (off_id, wl_id, 'name_geo',
+                           f"Offer name contains '{term}' + geo '{geo}' (companies differ)")
+
+        # STRATEGY 3: Company + Geo match (offer names may differ)
+        yield from self._company_pairs(geo_offers, geo_wishlists, 'company_geo',
+                                       lambda company: f"Company '{company}' + geo '{geo}'")
+
+    # CASE 4: NEITHER offer_name nor geo provided
+    def _search_all(self):
+        logger.info("🔗 Search Mode: MATCH ALL")
+        yield from self._company_pairs(self.offers.all_ids(), self.wishlists.all_ids(),
+                                       'company_only', lambda company: f"Company match: {company}")
+
+    def _company_pairs(self, offer_ids, wishlist_ids, match_type, reason):
+        """Pair offers and wishlists that share the same company key."""
+        offer_groups = self.offers.group_by_company(offer_ids)
+        wishlist_groups = self.wishlists.group_by_company(wishlist_ids)
+        for company, group_offers in offer_groups.items():
+            group_wishlists = wishlist_groups.get(company)
+            if not group_wishlists:
+                continue
+            for off_id in group_offers:
+                for wl_id in group_wishlists:
+                    yield off_id, wl_id, match_type, reason(company)
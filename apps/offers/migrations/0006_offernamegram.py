@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers', '0005_offer_campaign_name_norm_offergeo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferNameGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(db_index=True, max_length=3)),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_grams', to='offers.offer')),
+            ],
+            options={
+                'unique_together': {('offer', 'gram')},
+            },
+        ),
+    ]
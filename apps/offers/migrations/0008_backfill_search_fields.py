@@ -0,0 +1,40 @@
+from django.db import migrations
+
+from apps.offers.normalization import geo_set, norm
+
+BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    """Fill campaign_name_norm and the OfferGeo rows of the offers saved before they existed"""
+    Offer = apps.get_model('offers', 'Offer')
+    OfferGeo = apps.get_model('offers', 'OfferGeo')
+
+    batch = []
+    for offer in Offer.objects.order_by('id').only('id', 'campaign_name', 'geo').iterator(chunk_size=BATCH_SIZE):
+        offer.campaign_name_norm = norm(offer.campaign_name)
+        batch.append(offer)
+        if len(batch) >= BATCH_SIZE:
+            _write(Offer, OfferGeo, batch)
+            batch = []
+    if batch:
+        _write(Offer, OfferGeo, batch)
+
+
+def _write(Offer, OfferGeo, offers):
+    Offer.objects.bulk_update(offers, ['campaign_name_norm'])
+    OfferGeo.objects.bulk_create(
+        [OfferGeo(offer_id=offer.pk, code=code) for offer in offers for code in geo_set(offer.geo)],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers', '0007_matcherdataversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from apps.offers.normalization import trigrams
+
+BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    """Fill the OfferNameGram rows of the offers saved before the table existed"""
+    Offer = apps.get_model('offers', 'Offer')
+    OfferNameGram = apps.get_model('offers', 'OfferNameGram')
+
+    batch = []
+    for offer_id, campaign_name in Offer.objects.order_by('id').values_list('id', 'campaign_name').iterator(chunk_size=BATCH_SIZE):
+        batch.extend(OfferNameGram(offer_id=offer_id, gram=gram) for gram in trigrams(campaign_name))
+        if len(batch) >= BATCH_SIZE:
+            OfferNameGram.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        OfferNameGram.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers', '0008_backfill_search_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers', '0009_backfill_name_grams'),
+        ('publishers', '0013_backfill_name_grams'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchhistory',
+            name='is_exact',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='matchhistory',
+            index=models.Index(fields=['is_exact', 'wishlist'], name='matchhistory_exact_wl_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db.models import F
+
+BATCH_SIZE = 1000
+
+
+def _casefolded(s):
+    return (s or '').strip().casefold()
+
+
+def backfill(apps, schema_editor):
+    """Flag the recorded pairs that match in the default flow (active offer, same name and geo)"""
+    MatchHistory = apps.get_model('offers', 'MatchHistory')
+
+    candidates = (
+        MatchHistory.objects
+        .filter(offer__is_active=True, offer__campaign_name_norm=F('wishlist__desired_campaign_norm'))
+        .order_by('id')
+        .values_list('id', 'offer__geo', 'wishlist__geo')
+    )
+    batch = []
+    for pk, offer_geo, wishlist_geo in candidates.iterator(chunk_size=BATCH_SIZE):
+        if _casefolded(offer_geo) == _casefolded(wishlist_geo):
+            batch.append(pk)
+        if len(batch) >= BATCH_SIZE:
+            MatchHistory.objects.filter(pk__in=batch).update(is_exact=True)
+            batch = []
+    if batch:
+        MatchHistory.objects.filter(pk__in=batch).update(is_exact=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers', '0010_matchhistory_is_exact'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
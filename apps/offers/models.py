@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import Count
 from apps.advertisers.models import Advertiser    
 from apps.publishers.models import Wishlist       
+from apps.core.versioning import VersionCounter
+from apps.offers.normalization import norm, geo_set, trigrams
 
 class Offer(models.Model):
     advertiser = models.ForeignKey(Advertiser, on_delete=models.CASCADE, related_name='offers')
@@ -14,6 +17,8 @@ class Offer(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
+    # Case-folded campaign name, kept in sync by save() and the bulk upload
+    campaign_name_norm = models.CharField(max_length=255, blank=True, db_index=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -24,13 +29,125 @@ class Offer(models.Model):
     def __str__(self):
         return self.campaign_name or self.title
 
+    def refresh_search_fields(self):
+        """Set the normalized columns; call before bulk_create (save() does it itself)"""
+        self.campaign_name_norm = norm(self.campaign_name)
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'campaign_name' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'campaign_name_norm'}
+        super().save(*args, **kwargs)
+        if update_fields is None or 'geo' in update_fields:
+            OfferGeo.sync([self])
+        if update_fields is None or 'campaign_name' in update_fields:
+            OfferNameGram.sync([self])
+        if update_fields is None or {'campaign_name', 'geo', 'is_active'} & set(update_fields):
+            from apps.offers.incremental import record_offer_matches
+            record_offer_matches([self])
+        MatcherDataVersion.bump()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        MatcherDataVersion.bump()
+        return result
+
+    @classmethod
+    def sync_search_index(cls, offers):
+        """Rebuild the geo and name trigram rows of saved offers (e.g. after bulk_create)"""
+        offers = list(offers)
+        OfferGeo.sync(offers)
+        OfferNameGram.sync(offers)
+        MatcherDataVersion.bump()
+
+
+class OfferGeo(models.Model):
+    """One row per geo code of an offer, so geo lookups can use an index"""
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name='geo_codes')
+    code = models.CharField(max_length=100, db_index=True)
+
+    class Meta:
+        unique_together = ('offer', 'code')
+
+    def __str__(self):
+        return f"{self.offer_id}: {self.code}"
+
+    @classmethod
+    def sync(cls, offers, batch_size=1000):
+        """Rebuild the geo rows of the given saved offers (instances or a queryset)"""
+        offers = [off for off in offers if off.pk]
+        if not offers:
+            return
+        cls.objects.filter(offer_id__in=[off.pk for off in offers]).delete()
+        cls.objects.bulk_create(
+            [cls(offer_id=off.pk, code=code) for off in offers for code in geo_set(off.geo)],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+class OfferNameGram(models.Model):
+    """Trigrams of the normalized campaign name, for indexed "contains" lookups"""
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name='name_grams')
+    gram = models.CharField(max_length=3, db_index=True)
+
+    class Meta:
+        unique_together = ('offer', 'gram')
+
+    def __str__(self):
+        return f"{self.offer_id}: {self.gram}"
+
+    @classmethod
+    def sync(cls, offers, batch_size=1000):
+        """Rebuild the trigram rows of the given saved offers"""
+        offers = [off for off in offers if off.pk]
+        if not offers:
+            return
+        cls.objects.filter(offer_id__in=[off.pk for off in offers]).delete()
+        cls.objects.bulk_create(
+            [cls(offer_id=off.pk, gram=gram) for off in offers for gram in trigrams(off.campaign_name)],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def candidates(cls, term):
+        """
+        Ids of offers whose name has every trigram of `term`: a superset of the
+        names containing it. None when the term is too short to use the index.
+        """
+        grams = trigrams(term)
+        if not grams:
+            return None
+        return set(
+            cls.objects.filter(gram__in=grams)
+            .values('offer_id')
+            .annotate(hits=Count('gram'))
+            .filter(hits=len(grams))
+            .values_list('offer_id', flat=True)
+        )
+
+
 class MatchHistory(models.Model):
     offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name="offer_matches")
     wishlist = models.ForeignKey(Wishlist, on_delete=models.CASCADE, related_name="wishlist_matches")
     matched_at = models.DateTimeField(auto_now_add=True)
+    # Set for the pairs that currently match in the default flow (same name
+    # and geo), kept up to date on offer / wishlist writes (apps.offers.incremental)
+    is_exact = models.BooleanField(default=False, editable=False)
 
     class Meta:
         unique_together = ('offer', 'wishlist')
+        indexes = [
+            models.Index(fields=['is_exact', 'wishlist'], name='matchhistory_exact_wl_idx'),
+        ]
 
     def __str__(self):
         return f"Match: {self.offer} <-> {self.wishlist} at {self.matched_at}"
+
+
+class MatcherDataVersion(VersionCounter):
+    """
+    Single-row counter bumped on every write that can change matcher results
+    (offers, wishlists and their bulk uploads); part of the result cache keys.
+    """
@@ -0,0 +1,30 @@
+"""
+Normalization helpers shared by the offer/wishlist models and the matcher.
+
+The stored `campaign_name_norm` / `desired_campaign_norm` columns, the
+OfferGeo / WishlistGeo rows and the name trigram rows are produced with
+these functions, so SQL lookups and the in-memory matcher agree on what
+"equal" and "contains" mean.
+"""
+
+
+def norm(s):
+    # casefold(), like the in-memory default flow, so e.g. 'ß' and 'ss' compare equal on every path
+    return (s or '').strip().casefold()
+
+
+def norm_geo(s):
+    return (s or '').strip().upper()
+
+
+def geo_set(val):
+    """Return set of geo codes, empty if val is None/empty"""
+    if not val:
+        return frozenset()
+    return frozenset(g.strip().upper() for g in val.split(',') if g.strip())
+
+
+def trigrams(s):
+    """Set of 3-character substrings of the normalized string (empty if shorter)"""
+    s = norm(s)
+    return {s[i:i + 3] for i in range(len(s) - 2)}
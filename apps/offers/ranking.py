@@ -0,0 +1,181 @@
+"""
+Ranked top-K matching for the offers matcher (`rank=topk&k=N`).
+
+Every candidate offer is scored against a wishlist with the rules of
+OffersMatcherView._calculate_match_score: one point per equal field
+(campaign name, geo, payout, KPI, model, vertical), plus two points when the
+advertiser and publisher company names are the same, as a percentage of the
+six fields.
+
+The offer side is turned into numpy arrays once, so a wishlist is scored
+against all candidate offers with a handful of vector comparisons. Only the
+best K pairs per wishlist (or per publisher) are kept, in bounded heaps, so
+the full offers x wishlists score matrix is never materialized.
+"""
+import heapq
+
+import numpy as np
+
+from apps.offers.cache import cached
+from apps.offers.models import Offer
+from apps.offers.normalization import norm, norm_geo
+from apps.publishers.models import Wishlist
+
+DEFAULT_K = 10
+MAX_K = 100
+
+# (offer field, wishlist field); wishlist fields missing on the model never score
+FIELD_PAIRS = [
+    ('campaign_name', 'desired_campaign'),
+    ('geo', 'geo'),
+    ('payout', 'desired_payout'),
+    ('kpi', 'desired_kpi'),
+    ('model', 'desired_model'),
+    ('vertical', 'desired_vertical'),
+]
+COMPANY_BONUS = 2
+
+
+def _key(value):
+    return str(value).strip().lower() if value else ''
+
+
+def _company(obj, relation):
+    related = getattr(obj, relation, None)
+    return _key(related.company_name) if related and related.company_name else ''
+
+
+def match_score(offer, wishlist):
+    """Score of one pair, 0-100 plus the company bonus."""
+    score = 0
+    for offer_field, wishlist_field in FIELD_PAIRS:
+        offer_val = _key(getattr(offer, offer_field, None))
+        if offer_val and offer_val == _key(getattr(wishlist, wishlist_field, None)):
+            score += 1
+
+    company = _company(offer, 'advertiser')
+    if company and company == _company(wishlist, 'publisher'):
+        score += COMPANY_BONUS
+
+    return round((score / len(FIELD_PAIRS)) * 100, 1)
+
+
+def parse_k(value):
+    """`k` request parameter clamped to 1..MAX_K (DEFAULT_K when missing/invalid)."""
+    try:
+        k = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_K
+    return max(1, min(k, MAX_K))
+
+
+def candidates(offer_name_q='', geo_q=''):
+    """Active offers and wishlists narrowed by the optional search terms."""
+    offers = Offer.objects.filter(is_active=True).select_related('advertiser').order_by('-created_at', '-id')
+    wishlists = Wishlist.objects.select_related('publisher').order_by('id')
+    if norm(offer_name_q):
+        offers = offers.filter(campaign_name_norm__contains=norm(offer_name_q))
+    if norm_geo(geo_q):
+        offers = offers.filter(geo_codes__code=norm_geo(geo_q))
+        wishlists = wishlists.filter(geo_codes__code=norm_geo(geo_q))
+    return offers, wishlists
+
+
+class _OfferColumns:
+    """Candidate offers as numpy arrays of normalized field values."""
+
+    def __init__(self, offers):
+        self.offers = list(offers)
+        self.fields = {
+            offer_field: np.array([_key(getattr(off, offer_field, None)) for off in self.offers], dtype=object)
+            for offer_field, _ in FIELD_PAIRS
+        }
+        self.companies = np.array([_company(off, 'advertiser') for off in self.offers], dtype=object)
+
+    def __len__(self):
+        return len(self.offers)
+
+    def scores(self, wishlist):
+        points = np.zeros(len(self.offers))
+        for offer_field, wishlist_field in FIELD_PAIRS:
+            wanted = _key(getattr(wishlist, wishlist_field, None))
+            if wanted:
+                points += self.fields[offer_field] == wanted
+
+        company = _company(wishlist, 'publisher')
+        if company:
+            points += (self.companies == company) * COMPANY_BONUS
+
+        return np.round(points / len(FIELD_PAIRS) * 100, 1)
+
+
+def _best(scores, k):
+    """Positions of the k highest positive scores, best first (ties: offer order)."""
+    positive = np.flatnonzero(scores > 0)
+    if len(positive) > k:
+        values = scores[positive]
+        threshold = np.partition(values, len(values) - k)[len(values) - k]
+        above = positive[values > threshold]
+        tied = positive[values == threshold][:k - len(above)]
+        positive = np.concatenate([above, tied])
+    return sorted(positive.tolist(), key=lambda pos: (-scores[pos], pos))
+
+
+def rank_top_k(offers, wishlists, k=DEFAULT_K, per='wishlist'):
+    """
+    Best `k` offers per wishlist (per='wishlist') or per publisher
+    (per='publisher'), as match dicts with 'score', best first in each group.
+    """
+    columns = _OfferColumns(offers)
+    if not len(columns):
+        return []
+
+    heaps = {}
+    order = []
+    for wl_pos, wl in enumerate(wishlists):
+        group = wl.publisher_id if per == 'publisher' else wl.id
+        heap = heaps.get(group)
+        if heap is None:
+            heap = heaps[group] = []
+            order.append(group)
+
+        scores = columns.scores(wl)
+        for off_pos in _best(scores, k):
+            # Min-heap on (score, earlier pair first): the root is the weakest kept pair
+            entry = (float(scores[off_pos]), -wl_pos, -off_pos, wl)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:3] > heap[0][:3]:
+                heapq.heapreplace(heap, entry)
+            else:
+                break
+
+    ranked = []
+    for group in order:
+        for score, _, neg_off_pos, wl in sorted(heaps[group], key=lambda e: e[:3], reverse=True):
+            ranked.append({
+                'wishlist': wl,
+                'offer': columns.offers[-neg_off_pos],
+                'score': score,
+                'match_type': 'top_k',
+                'match_reason': f"Score {score}%",
+            })
+    return ranked
+
+
+def ranked_matches(params, offer_name_q='', geo_q=''):
+    """
+    Top-K pairs for request parameters `rank=topk&k=N[&per=publisher]`,
+    or None when ranking was not requested.
+    """
+    if (params.get('rank') or '').strip().lower() != 'topk':
+        return None
+    per = 'publisher' if (params.get('per') or '').strip().lower() == 'publisher' else 'wishlist'
+    k = parse_k(params.get('k'))
+
+    def compute():
+        offers, wishlists = candidates(offer_name_q, geo_q)
+        return rank_top_k(offers, wishlists, k=k, per=per)
+
+    matches, _ = cached(('ranked', norm(offer_name_q), norm_geo(geo_q), k, per), compute)
+    return matches
@@ -0,0 +1,99 @@
+"""
+Batched MatchHistory persistence for the offers matcher.
+
+Matched pairs are collected while a search runs and written afterwards with
+chunked `bulk_create(ignore_conflicts=True)` inside a single transaction.
+Duplicates are skipped by the database through the existing
+unique_together ('offer', 'wishlist') constraint, so a search costs a few
+INSERTs instead of one or two round trips per matched pair.
+"""
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from apps.offers.models import MatchHistory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class MatchRecorder:
+    """
+    Collects (offer, wishlist) pairs and records them in MatchHistory.
+
+    Usage:
+        recorder = MatchRecorder()
+        recorder.add(offer, wishlist)
+        ...
+        return recorder.finish(response)
+
+    With `defer=True` (or settings.OFFERS_MATCHER_DEFER_HISTORY) the write
+    happens when the response is closed, i.e. after it has been sent.
+    With `exact=True` the pairs are also flagged is_exact, existing rows
+    included (see apps.offers.incremental).
+    """
+
+    def __init__(self, batch_size=None, defer=None, exact=False):
+        self.batch_size = batch_size or getattr(settings, 'OFFERS_MATCHER_HISTORY_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        if defer is None:
+            defer = getattr(settings, 'OFFERS_MATCHER_DEFER_HISTORY', False)
+        self.defer = defer
+        self.exact = exact
+        self._pairs = {}
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def add(self, offer, wishlist):
+        self.add_ids(offer.id, wishlist.id)
+
+    def add_ids(self, offer_id, wishlist_id):
+        self._pairs[(offer_id, wishlist_id)] = None
+
+    def add_matches(self, matches):
+        for pair in matches:
+            self.add(pair['offer'], pair['wishlist'])
+
+    def flush(self):
+        """Write all collected pairs; returns the number of pairs submitted."""
+        if not self._pairs:
+            return 0
+
+        pairs = list(self._pairs)
+        self._pairs = {}
+        if self.exact:
+            conflicts = {'update_conflicts': True, 'update_fields': ['is_exact']}
+            if connection.features.supports_update_conflicts_with_target:
+                conflicts['unique_fields'] = ['offer', 'wishlist']
+        else:
+            conflicts = {'ignore_conflicts': True}
+        with transaction.atomic():
+            for i in range(0, len(pairs), self.batch_size):
+                MatchHistory.objects.bulk_create(
+                    [MatchHistory(offer_id=off_id, wishlist_id=wl_id, is_exact=self.exact)
+                     for off_id, wl_id in pairs[i:i + self.batch_size]],
+                    **conflicts,
+                )
+        logger.info(f"📝 Recorded {len(pairs)} match pair(s) in {(len(pairs) - 1) // self.batch_size + 1} batch(es)")
+        return len(pairs)
+
+    def finish(self, response):
+        """Flush now, or after `response` has been sent when deferred."""
+        if not self.defer:
+            self.flush()
+            return response
+
+        close = response.close
+
+        def flush_and_close():
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Error recording deferred match history: {e}", exc_info=True)
+            finally:
+                close()
+
+        response.close = flush_and_close
+        return response
@@ -0,0 +1,59 @@
+"""
+Geo-sharded exact matching for `manage.py run_matcher`.
+
+Two rows can only match when their geo strings are equal (after strip() +
+casefold(), as in the default flow of OffersMatcherResultsView), so the
+catalog is split into shards by geo and every shard is matched on its own in
+a worker process. Workers get plain (id, name, geo) tuples and return id
+pairs; this module deliberately imports nothing from Django, so it can be
+loaded by `spawn`ed workers without settings or database connections.
+"""
+import zlib
+from collections import defaultdict
+
+
+def casefolded(value):
+    return (value or '').strip().casefold()
+
+
+def shard_of(geo, shards):
+    """Stable shard number of a geo string (the same in every process)."""
+    return zlib.crc32(casefolded(geo).encode()) % shards
+
+
+def partition(offer_rows, wishlist_rows, shards):
+    """
+    Split (id, name, geo) rows into `shards` lists of
+    (offer_rows, wishlist_rows); shards with no possible pair are dropped.
+    """
+    parts = [([], []) for _ in range(shards)]
+    for side, rows in ((0, offer_rows), (1, wishlist_rows)):
+        for row in rows:
+            parts[shard_of(row[2], shards)][side].append(row)
+    return [part for part in parts if part[0] and part[1]]
+
+
+def match_shard(shard):
+    """
+    Exact (same name, same geo) pairs of one shard.
+
+    Returns `(pairs_evaluated, pairs)`: `pairs_evaluated` is the number of
+    offer x wishlist combinations sharing a geo (what a nested loop would
+    compare), `pairs` the matched (offer_id, wishlist_id) tuples.
+    """
+    offer_rows, wishlist_rows = shard
+    offers = defaultdict(lambda: defaultdict(list))
+    for off_id, name, geo in offer_rows:
+        offers[casefolded(geo)][casefolded(name)].append(off_id)
+
+    geo_sizes = {geo: sum(len(ids) for ids in by_name.values()) for geo, by_name in offers.items()}
+    evaluated = 0
+    pairs = []
+    for wl_id, name, geo in wishlist_rows:
+        geo = casefolded(geo)
+        by_name = offers.get(geo)
+        if by_name is None:
+            continue
+        evaluated += geo_sizes[geo]
+        pairs.extend((off_id, wl_id) for off_id in by_name.get(casefolded(name), ()))
+    return evaluated, pairs
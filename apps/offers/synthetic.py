@@ -0,0 +1,130 @@
+"""
+Synthetic offer / wishlist catalogs for checking and benchmarking the matcher.
+
+Rows are written the way the bulk uploads write them (bulk_create, then the
+geo / trigram index and the incremental matches), and deliberately include
+case and whitespace variants, multi-geo strings, empty geos and inactive
+offers. `geos` sets how many distinct geo codes appear and `name_overlap`
+the share of wishlists asking for a campaign name that offers also use (the
+rest ask for names no offer has). Callers normally run this inside a
+transaction they roll back.
+"""
+import random
+import string
+from itertools import product
+
+from apps.advertisers.models import Advertiser
+from apps.offers.incremental import record_offer_matches, record_wishlist_matches
+from apps.offers.models import Offer
+from apps.publishers.models import Publisher, Wishlist
+
+GEOS = ['US', 'IN', 'UK', 'DE', 'FR', 'BR', 'CA', 'AU', 'JP', 'ID']
+CAMPAIGN_WORDS = ['Shop', 'Game', 'Loan', 'Travel', 'Food', 'Bet', 'Music', 'Dating', 'Crypto', 'News']
+
+
+def geo_codes(count):
+    """`count` distinct two-letter geo codes, the common ones first."""
+    codes = GEOS[:count]
+    extra = (a + b for a, b in product(string.ascii_uppercase, repeat=2))
+    while len(codes) < count:
+        code = next(extra)
+        if code not in GEOS:
+            codes.append(code)
+    return codes
+
+
+def _geo(rng, codes):
+    roll = rng.random()
+    if roll < 0.05 or not codes:
+        return ''
+    if roll < 0.7 or len(codes) < 2:
+        return rng.choice(codes)
+    return ','.join(rng.sample(codes, rng.randint(2, min(3, len(codes)))))
+
+
+def _variant(rng, value):
+    """Same value as the matcher sees it, spelled differently."""
+    roll = rng.random()
+    if roll < 0.2:
+        return value.upper()
+    if roll < 0.3:
+        return f" {value.lower()} "
+    return value
+
+
+def _campaign(rng, names):
+    return _variant(rng, rng.choice(names))
+
+
+def generate_catalog(offers=1000, wishlists=1000, advertisers=50, publishers=50, campaigns=200, seed=0,
+                     batch_size=1000, geos=len(GEOS), name_overlap=1.0):
+    """Create the rows and return {'advertisers', 'publishers', 'offers', 'wishlists'} counts"""
+    rng = random.Random(seed)
+    codes = geo_codes(max(geos, 0))
+    names = [
+        f"{rng.choice(CAMPAIGN_WORDS)} {rng.choice(CAMPAIGN_WORDS)} {i}"
+        for i in range(max(campaigns, 1))
+    ]
+    wishlist_only = [f"{name} Wanted" for name in names]
+
+    advertiser_objs = Advertiser.objects.bulk_create(
+        [Advertiser(company_name=f"Synthetic Advertiser {i}") for i in range(max(advertisers, 1))]
+    )
+    publisher_objs = Publisher.objects.bulk_create(
+        [Publisher(company_name=f"Synthetic Publisher {i}") for i in range(max(publishers, 1))]
+    )
+    # MySQL does not return ids from bulk_create
+    advertiser_objs = list(Advertiser.objects.filter(company_name__startswith='Synthetic Advertiser '))
+    publisher_objs = list(Publisher.objects.filter(company_name__startswith='Synthetic Publisher '))
+
+    last_offer_id = Offer.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    last_wishlist_id = Wishlist.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+    for start in range(0, offers, batch_size):
+        batch = []
+        for _ in range(start, min(start + batch_size, offers)):
+            name = _campaign(rng, names)
+            offer = Offer(
+                advertiser=rng.choice(advertiser_objs),
+                campaign_name=name,
+                title=name.strip(),
+                geo=_variant(rng, _geo(rng, codes)),
+                payout=rng.choice([None, 0.5, 1, 2.5, 5]),
+                model=rng.choice([None, 'CPI', 'CPA', 'CPL']),
+                kpi=rng.choice(['', 'D7 retention', 'KYC']),
+                is_active=rng.random() < 0.9,
+            )
+            offer.refresh_search_fields()
+            batch.append(offer)
+        Offer.objects.bulk_create(batch)
+
+    for start in range(0, wishlists, batch_size):
+        batch = []
+        for _ in range(start, min(start + batch_size, wishlists)):
+            entry = Wishlist(
+                publisher=rng.choice(publisher_objs),
+                desired_campaign=_campaign(rng, names if rng.random() < name_overlap else wishlist_only),
+                geo=_variant(rng, _geo(rng, codes)),
+                payout=rng.choice([None, 1, 2]),
+            )
+            entry.refresh_search_fields()
+            batch.append(entry)
+        Wishlist.objects.bulk_create(batch)
+
+    new_offers = Offer.objects.filter(id__gt=last_offer_id).order_by('id')
+    new_wishlists = Wishlist.objects.filter(id__gt=last_wishlist_id).order_by('id')
+    for start in range(0, offers, batch_size):
+        batch = list(new_offers[start:start + batch_size])
+        Offer.sync_search_index(batch)
+        record_offer_matches(batch)
+    for start in range(0, wishlists, batch_size):
+        batch = list(new_wishlists[start:start + batch_size])
+        Wishlist.sync_search_index(batch)
+        record_wishlist_matches(batch)
+
+    return {
+        'advertisers': len(advertiser_objs),
+        'publishers': len(publisher_objs),
+        'offers': offers,
+        'wishlists': wishlists,
+    }
@@ -1,3 +1,165 @@
+from importlib.util import find_spec
+from unittest import skipUnless
+
 from django.test import TestCase
+from django.urls import reverse
+
+from apps.offers.cache import LRUBackend, using_backend
+from apps.offers.engines import ENGINES
+from apps.offers.matching import MatchIndex, geo_pairs
+from apps.offers.models import MatchHistory, Offer
+from apps.offers.normalization import geo_set, norm
+from apps.offers.synthetic import generate_catalog
+from apps.offers.views import OffersMatcherView
+from apps.publishers.models import Wishlist
+
+
+def pairs(result):
+    """(matches, suggestions) of an engine as lists of (wishlist id, offer id), in engine order."""
+    return tuple(
+        [(pair['wishlist'].id, pair['offer'].id) for pair in found]
+        for found in result
+    )
+
+
+class EngineParityTests(TestCase):
+    """Every default-flow engine returns the matches and suggestions of the python engine, in its order."""
+
+    seeds = (0, 1, 2)
+
+    def assertEnginesAgree(self, engines=('precomputed', 'pandas')):
+        expected = pairs(ENGINES['python']())
+        for name in engines:
+            with self.subTest(engine=name):
+                got = pairs(ENGINES[name]())
+                self.assertEqual(got[0], expected[0], f'{name}: matches differ')
+                self.assertEqual(got[1], expected[1], f'{name}: suggestions differ')
+        return expected
+
+    def catalog(self, seed, **options):
+        generate_catalog(offers=300, wishlists=300, advertisers=10, publishers=10, campaigns=40,
+                         geos=6, seed=seed, **options)
+
+    def test_precomputed_agrees_on_synthetic_catalogs(self):
+        for seed in self.seeds:
+            with self.subTest(seed=seed):
+                self.catalog(seed)
+                matches, suggestions = self.assertEnginesAgree(engines=('precomputed',))
+                self.assertTrue(matches)
+                self.assertTrue(suggestions)
+                Offer.objects.all().delete()
+                Wishlist.objects.all().delete()
+
+    @skipUnless(find_spec('pandas'), 'pandas is not installed')
+    def test_pandas_agrees_on_synthetic_catalogs(self):
+        for seed in self.seeds:
+            with self.subTest(seed=seed):
+                self.catalog(seed)
+                self.assertEnginesAgree(engines=('pandas',))
+                Offer.objects.all().delete()
+                Wishlist.objects.all().delete()
+
+    def test_precomputed_follows_single_row_writes(self):
+        self.catalog(3, name_overlap=0.5)
+        offer = Offer.objects.filter(is_active=True).exclude(geo='').order_by('id').first()
+        wishlist = Wishlist.objects.exclude(geo='').order_by('id').first()
+
+        # Rename an offer to what a wishlist asks for, in the wishlist's geo
+        offer.campaign_name = f"  {wishlist.desired_campaign.upper()} "
+        offer.geo = wishlist.geo
+        offer.save()
+        matches, _ = self.assertEnginesAgree(engines=('precomputed',))
+        self.assertIn((wishlist.id, offer.id), matches)
+
+        # Deactivating it drops its matches
+        offer.is_active = False
+        offer.save()
+        matches, _ = self.assertEnginesAgree(engines=('precomputed',))
+        self.assertNotIn((wishlist.id, offer.id), matches)
+
+        # A wishlist moved to another geo
+        wishlist.geo = 'ZZ'
+        wishlist.save()
+        self.assertEnginesAgree(engines=('precomputed',))
+
+    def test_writes_keep_the_exact_flags_current(self):
+        self.catalog(5)
+        flagged = set(MatchHistory.objects.filter(is_exact=True).values_list('wishlist_id', 'offer_id'))
+        matches, _ = self.assertEnginesAgree(engines=('precomputed',))
+        self.assertEqual(flagged, set(matches))
+
+        wishlist_id, offer_id = matches[0]
+        offer = Offer.objects.get(pk=offer_id)
+        offer.campaign_name = 'no wishlist asks for this'
+        offer.save()
+        self.assertFalse(MatchHistory.objects.filter(offer_id=offer_id, is_exact=True).exists())
+        # The history row itself is kept
+        self.assertTrue(MatchHistory.objects.filter(offer_id=offer_id, wishlist_id=wishlist_id).exists())
+        self.assertEnginesAgree(engines=('precomputed',))
+
+    def test_engines_agree_on_an_empty_catalog(self):
+        self.assertEqual(self.assertEnginesAgree(engines=('precomputed',)), ([], []))
+
+
+class GeoJoinTests(TestCase):
+    """The OfferGeo x WishlistGeo join pairs the same rows as the geo strings."""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_catalog(offers=200, wishlists=200, advertisers=8, publishers=8, campaigns=30, geos=5, seed=4)
+
+    def test_geo_pairs_match_the_geo_strings(self):
+        offers = Offer.objects.filter(is_active=True)
+        wishlists = Wishlist.objects.all()
+        for geo in ('US', 'in', 'ZZ'):
+            with self.subTest(geo=geo):
+                expected = {
+                    (wl.id, off.id) for wl in wishlists for off in offers
+                    if geo.upper() in geo_set(wl.geo) and geo.upper() in geo_set(off.geo)
+                }
+                self.assertEqual(set(pairs((geo_pairs(geo),))[0]), expected)
+
+    def test_geo_pairs_with_campaign_name(self):
+        wishlist = Wishlist.objects.exclude(geo='').order_by('id').first()
+        geo = sorted(geo_set(wishlist.geo))[0]
+        found = pairs((geo_pairs(geo, campaign_name=wishlist.desired_campaign.upper()),))[0]
+        self.assertTrue(found)
+        for wl_id, off_id in found:
+            self.assertEqual(norm(Wishlist.objects.get(pk=wl_id).desired_campaign), norm(wishlist.desired_campaign))
+            self.assertEqual(norm(Offer.objects.get(pk=off_id).campaign_name), norm(wishlist.desired_campaign))
+
+    def test_manual_search_agrees_with_in_memory_geo_matching(self):
+        with_table = MatchIndex.build()
+        in_memory = MatchIndex(
+            Offer.objects.filter(is_active=True).select_related('advertiser'),
+            Wishlist.objects.select_related('publisher'),
+            use_geo_table=False,
+        )
+        term = norm(Wishlist.objects.order_by('id').first().desired_campaign)[:4]
+        for name, geo in (('', 'US'), (term, 'US'), ('', 'ZZ'), (term, '')):
+            with self.subTest(name=name, geo=geo):
+                found = [(m['wishlist'].id, m['offer'].id, m['match_type']) for m in with_table.search(name, geo)]
+                self.assertEqual(
+                    found,
+                    [(m['wishlist'].id, m['offer'].id, m['match_type']) for m in in_memory.search(name, geo)],
+                )
+
+
+class MatcherApiRecordingTests(TestCase):
+    """Every match of a manual search ends up in MatchHistory, whichever view computed it."""
+
+    def setUp(self):
+        generate_catalog(offers=100, wishlists=100, advertisers=5, publishers=5, campaigns=20, geos=3, seed=6)
+        MatchHistory.objects.all().delete()
+
+    def test_cached_api_result_is_recorded_in_full(self):
+        with using_backend(LRUBackend()):
+            response = self.client.get(reverse('offers:matcher_api'), {'geo': 'US', 'limit': 5, 'count': '1'})
+            self.assertEqual(response.status_code, 200)
+            self.assertGreater(response.json()['count'], 5)
+
+            # The manual matcher now hits the entry the API filled
+            matches = OffersMatcherView()._perform_manual_match('', 'US')
 
-# Create your tests here.
+        recorded = set(MatchHistory.objects.values_list('offer_id', 'wishlist_id'))
+        self.assertEqual(recorded, {(m['offer'].id, m['wishlist'].id) for m in matches})
@@ -3,12 +3,13 @@ from django.urls import path
 from .views import (
     OfferListView, OfferCreateView, OfferUpdateView, OfferDeleteView, OfferDetailView, OffersMatcherView
 )
-from .views import OffersMatcherResultsView
+from .views import OffersMatcherResultsView, OffersMatcherApiView
 
 app_name = 'offers'
 
 urlpatterns = [
     path('matcher/', OffersMatcherView.as_view(), name='matcher'),
+    path('matcher/api/', OffersMatcherApiView.as_view(), name='matcher_api'),
     path('results/', OffersMatcherResultsView.as_view(), name='matcher_results'),
     path('add/', OfferCreateView.as_view(), name='add'),
     path('<int:pk>/edit/', OfferUpdateView.as_view(), name='edit'),
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publishers', '0009_remove_publisher_unique_publisher_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wishlist',
+            name='desired_campaign_norm',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.CreateModel(
+            name='WishlistGeo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(db_index=True, max_length=100)),
+                ('wishlist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='geo_codes', to='publishers.wishlist')),
+            ],
+            options={
+                'unique_together': {('wishlist', 'code')},
+            },
+        ),
+    ]
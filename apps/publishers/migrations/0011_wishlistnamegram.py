@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publishers', '0010_wishlist_desired_campaign_norm_wishlistgeo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WishlistNameGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(db_index=True, max_length=3)),
+                ('wishlist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_grams', to='publishers.wishlist')),
+            ],
+            options={
+                'unique_together': {('wishlist', 'gram')},
+            },
+        ),
+    ]
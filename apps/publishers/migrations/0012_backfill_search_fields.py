@@ -0,0 +1,40 @@
+from django.db import migrations
+
+from apps.offers.normalization import geo_set, norm
+
+BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    """Fill desired_campaign_norm and the WishlistGeo rows of the wishlists saved before they existed"""
+    Wishlist = apps.get_model('publishers', 'Wishlist')
+    WishlistGeo = apps.get_model('publishers', 'WishlistGeo')
+
+    batch = []
+    for wishlist in Wishlist.objects.order_by('id').only('id', 'desired_campaign', 'geo').iterator(chunk_size=BATCH_SIZE):
+        wishlist.desired_campaign_norm = norm(wishlist.desired_campaign)
+        batch.append(wishlist)
+        if len(batch) >= BATCH_SIZE:
+            _write(Wishlist, WishlistGeo, batch)
+            batch = []
+    if batch:
+        _write(Wishlist, WishlistGeo, batch)
+
+
+def _write(Wishlist, WishlistGeo, wishlists):
+    Wishlist.objects.bulk_update(wishlists, ['desired_campaign_norm'])
+    WishlistGeo.objects.bulk_create(
+        [WishlistGeo(wishlist_id=wishlist.pk, code=code) for wishlist in wishlists for code in geo_set(wishlist.geo)],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publishers', '0011_wishlistnamegram'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from apps.offers.normalization import trigrams
+
+BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    """Fill the WishlistNameGram rows of the wishlists saved before the table existed"""
+    Wishlist = apps.get_model('publishers', 'Wishlist')
+    WishlistNameGram = apps.get_model('publishers', 'WishlistNameGram')
+
+    batch = []
+    for wishlist_id, desired_campaign in Wishlist.objects.order_by('id').values_list('id', 'desired_campaign').iterator(chunk_size=BATCH_SIZE):
+        batch.extend(WishlistNameGram(wishlist_id=wishlist_id, gram=gram) for gram in trigrams(desired_campaign))
+        if len(batch) >= BATCH_SIZE:
+            WishlistNameGram.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        WishlistNameGram.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publishers', '0012_backfill_search_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,11 @@
 # apps/publishers/models.py
 from django.db import models
+from django.db.models import Count
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
+from apps.offers.normalization import norm, geo_set, trigrams
+
 class Publisher(models.Model):
     company_name = models.CharField(max_length=255)
     contact_person = models.CharField(max_length=255, blank=True, null=True)
@@ -49,6 +52,19 @@ class Publisher(models.Model):
         # Run validation before saving
         self.full_clean()  # This calls clean() and validates all fields
         super().save(*args, **kwargs)
+        # Company names take part in matching and in the DRS form options
+        from apps.offers.models import MatcherDataVersion
+        from apps.drs.models import ChoiceCatalogVersion
+        MatcherDataVersion.bump()
+        ChoiceCatalogVersion.bump()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from apps.offers.models import MatcherDataVersion
+        from apps.drs.models import ChoiceCatalogVersion
+        MatcherDataVersion.bump()
+        ChoiceCatalogVersion.bump()
+        return result
 
     def wishlist_count(self):
         return self.wishlists.count()
@@ -59,5 +75,109 @@ class Wishlist(models.Model):
     desired_campaign = models.CharField(max_length=255)
     geo = models.CharField(max_length=100)
     payout = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    # Case-folded desired campaign, kept in sync by save() and the bulk upload
+    desired_campaign_norm = models.CharField(max_length=255, blank=True, db_index=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
\ No newline at end of file
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def refresh_search_fields(self):
+        """Set the normalized columns; call before bulk_create (save() does it itself)"""
+        self.desired_campaign_norm = norm(self.desired_campaign)
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'desired_campaign' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'desired_campaign_norm'}
+        super().save(*args, **kwargs)
+        if update_fields is None or 'geo' in update_fields:
+            WishlistGeo.sync([self])
+        if update_fields is None or 'desired_campaign' in update_fields:
+            WishlistNameGram.sync([self])
+        if update_fields is None or {'desired_campaign', 'geo'} & set(update_fields):
+            from apps.offers.incremental import record_wishlist_matches
+            record_wishlist_matches([self])
+        from apps.offers.models import MatcherDataVersion
+        MatcherDataVersion.bump()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from apps.offers.models import MatcherDataVersion
+        MatcherDataVersion.bump()
+        return result
+
+    @classmethod
+    def sync_search_index(cls, wishlists):
+        """Rebuild the geo and name trigram rows of saved wishlists (e.g. after bulk_create)"""
+        wishlists = list(wishlists)
+        WishlistGeo.sync(wishlists)
+        WishlistNameGram.sync(wishlists)
+        from apps.offers.models import MatcherDataVersion
+        MatcherDataVersion.bump()
+
+
+class WishlistGeo(models.Model):
+    """One row per geo code of a wishlist, so geo lookups can use an index"""
+    wishlist = models.ForeignKey(Wishlist, on_delete=models.CASCADE, related_name='geo_codes')
+    code = models.CharField(max_length=100, db_index=True)
+
+    class Meta:
+        unique_together = ('wishlist', 'code')
+
+    def __str__(self):
+        return f"{self.wishlist_id}: {self.code}"
+
+    @classmethod
+    def sync(cls, wishlists, batch_size=1000):
+        """Rebuild the geo rows of the given saved wishlists (instances or a queryset)"""
+        wishlists = [wl for wl in wishlists if wl.pk]
+        if not wishlists:
+            return
+        cls.objects.filter(wishlist_id__in=[wl.pk for wl in wishlists]).delete()
+        cls.objects.bulk_create(
+            [cls(wishlist_id=wl.pk, code=code) for wl in wishlists for code in geo_set(wl.geo)],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+
+class WishlistNameGram(models.Model):
+    """Trigrams of the normalized desired campaign, for indexed "contains" lookups"""
+    wishlist = models.ForeignKey(Wishlist, on_delete=models.CASCADE, related_name='name_grams')
+    gram = models.CharField(max_length=3, db_index=True)
+
+    class Meta:
+        unique_together = ('wishlist', 'gram')
+
+    def __str__(self):
+        return f"{self.wishlist_id}: {self.gram}"
+
+    @classmethod
+    def sync(cls, wishlists, batch_size=1000):
+        """Rebuild the trigram rows of the given saved wishlists"""
+        wishlists = [wl for wl in wishlists if wl.pk]
+        if not wishlists:
+            return
+        cls.objects.filter(wishlist_id__in=[wl.pk for wl in wishlists]).delete()
+        cls.objects.bulk_create(
+            [cls(wishlist_id=wl.pk, gram=gram) for wl in wishlists for gram in trigrams(wl.desired_campaign)],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def candidates(cls, term):
+        """
+        Ids of wishlists whose name has every trigram of `term`: a superset of
+        the names containing it. None when the term is too short to use the index.
+        """
+        grams = trigrams(term)
+        if not grams:
+            return None
+        return set(
+            cls.objects.filter(gram__in=grams)
+            .values('wishlist_id')
+            .annotate(hits=Count('gram'))
+            .filter(hits=len(grams))
+            .values_list('wishlist_id', flat=True)
+        )
@@ -11,10 +11,11 @@ from django.template.loader import render_to_string
 import csv
 import io
 import logging
-from django.db.models import Count
+from django.db.models import Count, Max
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from .models import Publisher, Wishlist
+from apps.offers.incremental import record_wishlist_matches
 from .forms import PublisherForm
 from django.db.models import Q
 
@@ -514,13 +515,21 @@ class PublisherWishlistUploadView(TemplateView):
             if wishlist_entries:
                 try:
                     with transaction.atomic():
+                        last_id = Wishlist.objects.aggregate(last_id=Max('id'))['last_id'] or 0
                         # Create in batches to avoid memory issues
                         batch_size = 100
                         for i in range(0, len(wishlist_entries), batch_size):
                             batch = wishlist_entries[i:i + batch_size]
+                            for entry in batch:
+                                entry.refresh_search_fields()
                             Wishlist.objects.bulk_create(batch, ignore_conflicts=False)
                             created_count += len(batch)
                             logger.info(f"Created batch {i//batch_size + 1}: {len(batch)} wishlist entries")
+                        # bulk_create skips save(), so index the new entries here.
+                        # MySQL does not return ids from bulk_create; find them by id instead.
+                        new_entries = list(Wishlist.objects.filter(publisher=publisher, id__gt=last_id))
+                        Wishlist.sync_search_index(new_entries)
+                        record_wishlist_matches(new_entries)
                     
                     success_message = f"Successfully uploaded {created_count} wishlist entries from CSV for {publisher.company_name}."
                     if error_count > 0:
@@ -672,13 +681,21 @@ class PublisherWishlistUploadView(TemplateView):
             if wishlist_entries:
                 try:
                     with transaction.atomic():
+                        last_id = Wishlist.objects.aggregate(last_id=Max('id'))['last_id'] or 0
                         # Create in batches
                         batch_size = 100
                         for i in range(0, len(wishlist_entries), batch_size):
                             batch = wishlist_entries[i:i + batch_size]
+                            for entry in batch:
+                                entry.refresh_search_fields()
                             Wishlist.objects.bulk_create(batch, ignore_conflicts=False)
                             created_count += len(batch)
                             logger.info(f"Created batch {i//batch_size + 1}: {len(batch)} wishlist entries")
+                        # bulk_create skips save(), so index the new entries here.
+                        # MySQL does not return ids from bulk_create; find them by id instead.
+                        new_entries = list(Wishlist.objects.filter(publisher=publisher, id__gt=last_id))
+                        Wishlist.sync_search_index(new_entries)
+                        record_wishlist_matches(new_entries)
                     
                     success_message = f"Successfully uploaded {created_count} wishlist entries from XLSX for {publisher.company_name}."
                     if error_count > 0:
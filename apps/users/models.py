@@ -20,4 +20,21 @@ class User(AbstractUser):
         'publishers.Publisher',
         blank=True,
         related_name='assigned_users'
-    )
\ No newline at end of file
+    )
+
+    # Fields shown in the DRS form's account manager options
+    CHOICE_CATALOG_FIELDS = {'username', 'first_name', 'last_name', 'role'}
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        # Logins only touch last_login; don't invalidate for those
+        if update_fields is None or self.CHOICE_CATALOG_FIELDS & set(update_fields):
+            from apps.drs.models import ChoiceCatalogVersion
+            ChoiceCatalogVersion.bump()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from apps.drs.models import ChoiceCatalogVersion
+        ChoiceCatalogVersion.bump()
+        return result
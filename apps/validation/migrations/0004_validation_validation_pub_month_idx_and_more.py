@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drs', '0007_dailyrevenuesheet_drs_status_start_idx_and_more'),
+        ('invoicing', '0015_invoice_invoice_created_idx_and_more'),
+        ('publishers', '0011_wishlistnamegram'),
+        ('validation', '0003_alter_validation_options_validation_approved_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='validation',
+            index=models.Index(fields=['publisher', 'month'], name='validation_pub_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='validation',
+            index=models.Index(fields=['status', 'created_at'], name='validation_status_created_idx'),
+        ),
+    ]
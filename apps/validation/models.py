@@ -1,9 +1,11 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from apps.core.tracking import TrackedFieldsMixin
+
 User = get_user_model()
 
-class Validation(models.Model):
+class Validation(TrackedFieldsMixin, models.Model):
     # Update status choices to match the flow
     STATUS_CHOICES = [
         ('Pending', 'Pending'),
@@ -49,17 +51,9 @@ class Validation(models.Model):
         return f"Validation: {self.drs.campaign_name} ({self.publisher}) [{self.month}]"
     
     def save(self, *args, **kwargs):
-        # Auto-set timestamps based on status changes
-        is_new = self.pk is None
-        
-        if not is_new:
-            try:
-                old_instance = Validation.objects.get(pk=self.pk)
-                old_status = old_instance.status
-            except Validation.DoesNotExist:
-                old_status = None
-        else:
-            old_status = None
+        # Auto-set timestamps based on status changes (the status as loaded,
+        # no need to read the row again)
+        old_status = self.old_value('status')
         
         # Import timezone here to avoid circular imports
         from django.utils import timezone
@@ -90,6 +84,10 @@ class Validation(models.Model):
         ordering = ['-created_at']
         verbose_name = "Validation"
         verbose_name_plural = "Validations"
+        indexes = [
+            models.Index(fields=['publisher', 'month'], name='validation_pub_month_idx'),
+            models.Index(fields=['status', 'created_at'], name='validation_status_created_idx'),
+        ]
     
     def can_be_approved(self):
         """Check if validation can be approved"""
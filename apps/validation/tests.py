@@ -1,3 +1,245 @@
+import json
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.advertisers.models import Advertiser
+from apps.drs.models import DailyRevenueSheet
+from apps.drs.rollups import rebuild_rollups
+from apps.publishers.models import Publisher
+
+from . import transitions
+from .models import Validation
+
+
+def make_drs(advertiser, publisher, day, **fields):
+    return DailyRevenueSheet.objects.create(
+        advertiser=advertiser, publisher=publisher, campaign_name=f'camp {day}', geo='US', start_date=day, **fields
+    )
+
+
+# DRS columns a status change can touch, through save() or a set-based update
+STATUS_FIELDS = ('status', 'validation_required', 'revenue', 'payout', 'profit')
+
+
+class DRSParityMixin:
+    def assertMatchesSave(self, drs):
+        """`drs`, as a set-based update left it, has the values save() gives the same row."""
+        drs.refresh_from_db()
+        saved = DailyRevenueSheet.objects.get(pk=drs.pk)
+        saved.pk = None
+        saved.save()
+        saved.refresh_from_db()
+        self.assertEqual(
+            {f: getattr(drs, f) for f in STATUS_FIELDS}, {f: getattr(saved, f) for f in STATUS_FIELDS}
+        )
+        saved.delete()
+
+    def assertRollupsCurrent(self):
+        # A rebuild writes nothing when the rollup rows already match the DRS table
+        self.assertEqual(rebuild_rollups(), 0)
+
+
+class ValidationTabTests(TestCase):
+    """Month sections and totals of the validation tab."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'x')
+        cls.advertiser = Advertiser.objects.create(company_name='Adv')
+        cls.publisher = Publisher.objects.create(company_name='Pub')
+        for month, count in (('2025-01', 3), ('2025-02', 2), ('2025-03', 4)):
+            cls.add_validations(month, count)
+
+    @classmethod
+    def add_validations(cls, month, count):
+        year, month_number = map(int, month.split('-'))
+        for i in range(count):
+            drs = make_drs(
+                cls.advertiser, cls.publisher, date(year, month_number, i + 1),
+                advertiser_conversions=10 + i, campaign_revenue=Decimal('1.50'),
+            )
+            Validation.objects.create(
+                drs=drs, publisher=cls.publisher, month=month, status='Approved',
+                conversions=5 + i, payout=Decimal('2.25'), approve_payout=Decimal('2.25') * (i + 1),
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_monthly_totals(self):
+        response = self.client.get(reverse('validation:validation_tab'))
+        self.assertEqual(response.status_code, 200)
+
+        sections = response.context['month_sections']
+        self.assertEqual([section['month'] for section in sections], ['2025-03', '2025-02', '2025-01'])
+        for section in sections:
+            validations = Validation.objects.filter(month=section['month']).select_related('drs')
+            with self.subTest(month=section['month']):
+                self.assertEqual(section['count'], len(validations))
+                self.assertEqual(section['generated_amount'], sum(v.drs.revenue for v in validations))
+                self.assertEqual(section['total_payout'], sum(v.approve_payout for v in validations))
+                self.assertEqual(section['total_conversions'], sum(v.conversions for v in validations))
+                self.assertEqual(section['uploaded_invoices'], 0)
+        self.assertEqual(response.context['total_validations'], 9)
+
+        # Only the newest month comes with its rows; the rest load as fragments
+        self.assertEqual(len(sections[0]['validations']), 4)
+        self.assertEqual([section['validations'] for section in sections[1:]], [None, None])
+        fragment = self.client.get(reverse('validation:validation_tab'), {'month': '2025-01', 'fragment': '1'})
+        self.assertEqual(fragment.json()['rows'].count('data-validation-id='), 3)
+
+    def test_query_count_does_not_depend_on_the_validations(self):
+        def queries():
+            with CaptureQueriesContext(connection) as captured:
+                self.client.get(reverse('validation:validation_tab'))
+            return len(captured)
+
+        before = queries()
+        self.add_validations('2025-03', 5)
+        self.add_validations('2024-12', 5)
+        self.assertEqual(queries(), before)
+
+
+class BulkTransitionTests(DRSParityMixin, TestCase):
+    """bulk_transition(): per-id outcomes, and DRS rows left as save() would."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'x')
+        advertiser = Advertiser.objects.create(company_name='Adv')
+        publisher = Publisher.objects.create(company_name='Pub')
+        cls.validations = {}
+        for i, (status, drs_status) in enumerate(
+            (('Pending', 'paused'), ('Rejected', 'completed'), ('Approved', 'approved'), ('Paid', 'paid'))
+        ):
+            drs = make_drs(advertiser, publisher, date(2025, 1, i + 1), status=drs_status,
+                           advertiser_conversions=4, campaign_revenue=Decimal('2.50'),
+                           paid_at=timezone.now() if drs_status == 'paid' else None)
+            cls.validations[status] = Validation.objects.create(
+                drs=drs, publisher=publisher, month='2025-01', status=status
+            )
+
+    def test_approve(self):
+        ids = [v.pk for v in self.validations.values()] + [0, 'x']
+        results = transitions.bulk_transition(ids, 'Approved', user=self.user)
+
+        pending, rejected, approved, paid = (v.pk for v in self.validations.values())
+        self.assertEqual({pk: result['outcome'] for pk, result in results.items()}, {
+            pending: transitions.CHANGED, rejected: transitions.CHANGED, approved: transitions.UNCHANGED,
+            paid: transitions.NOT_ALLOWED, 0: transitions.NOT_FOUND, 'x': transitions.INVALID,
+        })
+        self.assertEqual(results[paid]['status'], 'Paid')
+
+        for status in ('Pending', 'Rejected'):
+            validation = Validation.objects.select_related('drs').get(pk=self.validations[status].pk)
+            with self.subTest(status=status):
+                self.assertEqual(validation.status, 'Approved')
+                self.assertEqual(validation.approved_by, self.user)
+                self.assertIsNotNone(validation.approved_at)
+                self.assertEqual(validation.drs.status, 'approved')
+                self.assertFalse(validation.drs.validation_required)
+                self.assertMatchesSave(validation.drs)
+        self.assertEqual(Validation.objects.get(pk=paid).drs.status, 'paid')
+        self.assertRollupsCurrent()
+
+    def test_reject_leaves_the_drs_alone(self):
+        pending = self.validations['Pending']
+        results = transitions.bulk_transition([pending.pk], 'Rejected')
+        self.assertEqual(results[pending.pk], {'outcome': transitions.CHANGED, 'status': 'Rejected'})
+        pending.drs.refresh_from_db()
+        self.assertEqual((pending.drs.status, pending.drs.validation_required), ('paused', True))
+
+    def test_query_count_does_not_depend_on_the_ids(self):
+        def queries(validations):
+            with CaptureQueriesContext(connection) as captured:
+                transitions.bulk_transition([v.pk for v in validations], 'Approved', user=self.user)
+            return len(captured)
+
+        one = queries([self.validations['Pending']])
+        self.assertEqual(queries([self.validations['Rejected'], self.validations['Paid']]), one)
+
+
+class SaveReportsTests(DRSParityMixin, TestCase):
+    """bulk_save_reports() and the batch "save all reports" endpoint."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'x')
+        advertiser = Advertiser.objects.create(company_name='Adv')
+        cls.publisher, cls.other_publisher = (Publisher.objects.create(company_name=f'Pub {i}') for i in range(2))
+        cls.new, cls.existing, cls.validated, cls.foreign = (
+            make_drs(advertiser, publisher, date(2025, 2, i + 1), status=status, publisher_conversions=3,
+                     publisher_payout=Decimal('1.20'), validated_at=timezone.now() if status == 'validated' else None)
+            for i, (status, publisher) in enumerate((
+                ('paused', cls.publisher), ('completed', cls.publisher),
+                ('validated', cls.publisher), ('paused', cls.other_publisher),
+            ))
+        )
+        Validation.objects.create(drs=cls.existing, publisher=cls.publisher, month='2025-02', status='Pending')
+
+    def post(self, data):
+        self.client.force_login(self.user)
+        return self.client.post(
+            reverse('validation:save_report_batch'), json.dumps(data), content_type='application/json'
+        )
+
+    def test_outcomes(self):
+        drs_rows = DailyRevenueSheet.objects.filter(
+            pk__in=[self.new.pk, self.existing.pk, self.validated.pk, self.foreign.pk]
+        )
+        results = transitions.bulk_save_reports(drs_rows, self.user, publisher_ids={self.publisher.pk})
+
+        self.assertEqual({pk: result['outcome'] for pk, result in results.items()}, {
+            self.new.pk: transitions.CREATED, self.existing.pk: transitions.UPDATED,
+            self.validated.pk: transitions.ALREADY_VALIDATED, self.foreign.pk: transitions.DENIED,
+        })
+        for drs in (self.new, self.existing):
+            validation = Validation.objects.get(drs=drs)
+            with self.subTest(drs=drs.pk):
+                self.assertEqual(results[drs.pk]['validation_id'], validation.pk)
+                self.assertEqual((validation.status, validation.approved_by), ('Approved', self.user))
+                drs.refresh_from_db()
+                self.assertEqual((drs.status, drs.validated_by, drs.validation_required), ('validated', self.user, False))
+                self.assertMatchesSave(drs)
+        # A new validation takes the DRS payout; an existing one keeps its amounts
+        self.assertEqual(Validation.objects.get(drs=self.new).approve_payout, Decimal('3.60'))
+        self.assertEqual(Validation.objects.get(drs=self.existing).approve_payout, Decimal('0'))
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, 'paused')
+        self.assertRollupsCurrent()
+
+    def test_batch_view(self):
+        response = self.post({'drs_ids': [self.new.pk, self.existing.pk, 0]})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['created_count'], data['updated_count']), (1, 1))
+        self.assertEqual(data['results']['0']['outcome'], transitions.NOT_FOUND)
+
+    def test_month_of_one_publisher(self):
+        response = self.post({'month': '2025-02', 'publisher': str(self.other_publisher.pk)})
+        self.assertEqual(set(response.json()['results']), {str(self.foreign.pk)})
+
+    def test_malformed_requests_are_rejected(self):
+        for data in ({'drs_ids': [self.new.pk, 'x']}, {'drs_ids': [{}]}, {'drs_ids': []},
+                     {'month': '2025-02', 'publisher': 'abc'}, {'month': '2025-02', 'publisher': [1]},
+                     {'month': 'February'}, {}):
+            with self.subTest(data=data):
+                response = self.post(data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+        self.assertFalse(Validation.objects.filter(drs=self.new).exists())
 
-# Create your tests here.
+    def test_errors_are_logged(self):
+        with mock.patch('apps.validation.views.bulk_save_reports', side_effect=RuntimeError('boom')), \
+                self.assertLogs('apps.validation.views', 'ERROR') as logs:
+            response = self.post({'drs_ids': [self.new.pk]})
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('RuntimeError: boom', logs.output[0])
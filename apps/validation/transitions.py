@@ -0,0 +1,191 @@
+"""
+Set-based validation status transitions.
+
+bulk_transition() moves many validations to a new status in one
+transaction and a fixed number of queries, whatever the number of ids:
+
+  * the selected validations are locked with one SELECT ... FOR UPDATE
+  * the status, its timestamp and the acting user are written with one UPDATE
+  * the linked DailyRevenueSheet rows get the matching status with a second
+    UPDATE (and their daily rollups are refreshed, as update() skips save())
+
+The per-validation flow of ValidationUpdateView (approve -> DRS 'approved',
+...) is the reference for what changes.
+
+bulk_save_reports() is the batch form of SaveReportView: every DRS gets an
+approved validation (bulk_create for new ones, bulk_update for existing
+ones) and moves to 'validated' with one UPDATE, in one transaction.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from apps.drs.models import ROLLUP_KEY_FIELDS, DailyRevenueSheet
+from apps.drs.rollups import refresh_rollups
+
+from .models import Validation
+
+# target status -> statuses it can be reached from, timestamp / user fields
+# set on the validation, and the status its DRS moves to
+TRANSITIONS = {
+    'Approved': {
+        'from': ('Pending', 'Rejected'),
+        'stamp': 'approved_at',
+        'user': 'approved_by',
+        'drs_status': 'approved',
+    },
+    'Rejected': {
+        'from': ('Pending',),
+        'stamp': None,
+        'user': None,
+        'drs_status': None,
+    },
+}
+
+# Per-id outcomes
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'      # already in the target status
+NOT_ALLOWED = 'not_allowed'  # current status cannot move to the target
+NOT_FOUND = 'not_found'
+INVALID = 'invalid'          # not an integer id
+CREATED = 'created'
+UPDATED = 'updated'
+ALREADY_VALIDATED = 'already_validated'
+DENIED = 'permission_denied'
+
+# Validation fields SaveReportView sets when it approves an existing validation
+REPORT_FIELDS = ('status', 'submitted_at', 'submitted_by', 'approved_at', 'approved_by', 'updated_at')
+BATCH_SIZE = 500
+
+
+def bulk_transition(validation_ids, status, user=None):
+    """
+    Move the validations `validation_ids` to `status` (a TRANSITIONS key).
+
+    Returns {id: {'outcome': ..., 'status': status after the call}}, keyed by
+    the ids as given (non-integer ids under their string form).
+    """
+    rule = TRANSITIONS[status]
+    results = {}
+    ids = []
+    for raw in validation_ids:
+        try:
+            ids.append(int(raw))
+        except (TypeError, ValueError):
+            results[str(raw)] = {'outcome': INVALID, 'status': None}
+
+    with transaction.atomic():
+        current = {
+            pk: (old_status, drs_id)
+            for pk, old_status, drs_id in Validation.objects.select_for_update().filter(pk__in=ids)
+            .order_by('pk').values_list('pk', 'status', 'drs_id')
+        }
+
+        moving = []
+        for pk in ids:
+            if pk not in current:
+                results[pk] = {'outcome': NOT_FOUND, 'status': None}
+            elif current[pk][0] == status:
+                results[pk] = {'outcome': UNCHANGED, 'status': status}
+            elif current[pk][0] not in rule['from']:
+                results[pk] = {'outcome': NOT_ALLOWED, 'status': current[pk][0]}
+            else:
+                results[pk] = {'outcome': CHANGED, 'status': status}
+                moving.append(pk)
+
+        if moving:
+            now = timezone.now()
+            changes = {'status': status, 'updated_at': now}
+            if rule['stamp']:
+                changes[rule['stamp']] = now
+            if rule['user'] and user is not None:
+                changes[rule['user']] = user
+            Validation.objects.filter(pk__in=moving).update(**changes)
+
+            if rule['drs_status']:
+                drs_rows = DailyRevenueSheet.objects.filter(pk__in={current[pk][1] for pk in moving})
+                old_keys = set(drs_rows.order_by().values_list(*ROLLUP_KEY_FIELDS).distinct())
+                # validation_required follows the status, as in DailyRevenueSheet.save()
+                drs_rows.update(
+                    status=rule['drs_status'],
+                    validation_required=rule['drs_status'] in ('paused', 'completed'),
+                    updated_at=now,
+                )
+                refresh_rollups(old_keys | {key[:-1] + (rule['drs_status'],) for key in old_keys})
+
+    return results
+
+
+def bulk_save_reports(drs_rows, user, publisher_ids=None):
+    """
+    SaveReportView for every DRS of the queryset `drs_rows`, in one
+    transaction: an approved validation is created for the DRS (or its
+    existing one approved) and the DRS moves to 'validated'.
+
+    `publisher_ids` limits the DRS the user may validate (None: any). Returns
+    {drs id: {'outcome': ..., 'validation_id': ..., 'drs_status': ...}}.
+    """
+    results = {}
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            drs_rows.select_for_update().order_by('pk')
+            .only('pk', 'start_date', 'publisher_id', 'advertiser_id', 'status', 'publisher_conversions', 'payout')
+        )
+        saving = []
+        for drs in rows:
+            if publisher_ids is not None and drs.publisher_id not in publisher_ids:
+                results[drs.pk] = {'outcome': DENIED, 'validation_id': None, 'drs_status': drs.status}
+            elif drs.status == 'validated':
+                results[drs.pk] = {'outcome': ALREADY_VALIDATED, 'validation_id': None, 'drs_status': drs.status}
+            else:
+                saving.append(drs)
+        if not saving:
+            return results
+
+        # The newest validation of each DRS, as SaveReportView's .first()
+        existing = {}
+        for validation in Validation.objects.filter(drs_id__in=[drs.pk for drs in saving]):
+            existing.setdefault(validation.drs_id, validation)
+
+        created, updated = [], []
+        for drs in saving:
+            validation = existing.get(drs.pk)
+            if validation is None:
+                validation = Validation(
+                    drs_id=drs.pk,
+                    publisher_id=drs.publisher_id,
+                    month=(drs.start_date or now).strftime('%Y-%m'),
+                    conversions=drs.publisher_conversions or 0,
+                    payout=drs.payout or 0,
+                    approve_payout=drs.payout or 0,
+                )
+                created.append(validation)
+            else:
+                updated.append(validation)
+            validation.status = 'Approved'
+            validation.submitted_at = validation.approved_at = validation.updated_at = now
+            validation.submitted_by = validation.approved_by = user
+
+        if created:
+            Validation.objects.bulk_create(created, batch_size=BATCH_SIZE)
+            if any(validation.pk is None for validation in created):
+                # Backends that do not return the inserted ids (MySQL)
+                ids = dict(
+                    Validation.objects.filter(drs_id__in=[v.drs_id for v in created], submitted_at=now)
+                    .values_list('drs_id', 'pk')
+                )
+                for validation in created:
+                    validation.pk = ids.get(validation.drs_id)
+        if updated:
+            Validation.objects.bulk_update(updated, REPORT_FIELDS, batch_size=BATCH_SIZE)
+
+        DailyRevenueSheet.objects.filter(pk__in=[drs.pk for drs in saving]).update(
+            status='validated', validation_required=False, validated_at=now, validated_by=user, updated_at=now,
+        )
+        old_keys = {drs.rollup_key() for drs in saving}
+        refresh_rollups(old_keys | {key[:-1] + ('validated',) for key in old_keys})
+
+    for outcome, validations in ((CREATED, created), (UPDATED, updated)):
+        for validation in validations:
+            results[validation.drs_id] = {'outcome': outcome, 'validation_id': validation.pk, 'drs_status': 'validated'}
+    return results
@@ -2,7 +2,7 @@ from django.urls import path
 from .views import (
     ValidationListView, ValidationCreateView, ValidationUpdateView,
     ValidationDeleteView, ValidationDetailView, ValidationExportView,
-    ValidationTabView, SaveReportView, MyValidationView, UploadInvoiceView,
+    ValidationTabView, SaveReportView, SaveReportBatchView, MyValidationView, UploadInvoiceView,
     InvoiceApprovalView, GenerateInvoiceView, BulkApproveValidationsView, CheckUserStatusView
 )
 
@@ -20,6 +20,7 @@ urlpatterns = [
     # New Validation Tab URLs (Validation Workflow)
     path('tab/', ValidationTabView.as_view(), name='validation_tab'),
     path('save-report/', SaveReportView.as_view(), name='save_report'),
+    path('save-report/batch/', SaveReportBatchView.as_view(), name='save_report_batch'),
     path('my-validation/', MyValidationView.as_view(), name='my_validation'),
     
     # Invoice URLs
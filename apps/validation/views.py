@@ -5,25 +5,39 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.http import JsonResponse, HttpResponse
 from django.template.loader import render_to_string
 from django.contrib import messages
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 from django.db.models import Sum, Count, Q
+from django.db.models.functions import Coalesce
 from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from urllib.parse import urlencode
+from decimal import Decimal
+from datetime import date, datetime
 import json
+import logging
 
 from .models import Validation
 from .forms import ValidationForm
-from apps.drs.models import DailyRevenueSheet
+from .transitions import CHANGED, CREATED, NOT_FOUND, UPDATED, bulk_save_reports, bulk_transition
+from apps.drs.models import DailyRevenueSheet, DRSDailyRollup
+from apps.drs.rollups import summarize
 from apps.publishers.models import Publisher
 from apps.invoicing.models import Invoice
 
+logger = logging.getLogger(__name__)
+
 class ValidationListView(LoginRequiredMixin, ListView):
     model = Validation
     template_name = 'validation/validation_list.html'
     context_object_name = 'validations'
+    # Validations page with ?page=, DRS requiring validation with ?drs_page=
+    paginate_by = 50
+    drs_paginate_by = 50
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('drs', 'publisher')
         
         # Check if user is in impersonation mode
         if 'impersonate_publisher_id' in self.request.session:
@@ -58,6 +72,7 @@ class ValidationListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        is_ajax = self.request.headers.get('X-Requested-With') == 'XMLHttpRequest'
         
         # Get filter parameters
         filter_type = self.request.GET.get('type', '')
@@ -68,19 +83,27 @@ class ValidationListView(LoginRequiredMixin, ListView):
         # Get DRS entries that need validation (paused or completed)
         drs_query = DailyRevenueSheet.objects.filter(
             status__in=['paused', 'completed']
-        ).order_by('-start_date')
+        ).select_related('publisher').order_by('-start_date', '-id')
+        # The summary reads the same filters off the daily rollups
+        rollups = DRSDailyRollup.objects.filter(status__in=['paused', 'completed'])
+        paused_rollups = DRSDailyRollup.objects.filter(status='paused')
         
         # Check if user is in impersonation mode
+        publisher = None
         if 'impersonate_publisher_id' in self.request.session:
             publisher_id = self.request.session.get('impersonate_publisher_id')
             publisher = get_object_or_404(Publisher, id=publisher_id)
-            drs_query = drs_query.filter(publisher=publisher)
         elif hasattr(self.request.user, 'publisher'):
-            drs_query = drs_query.filter(publisher=self.request.user.publisher)
+            publisher = self.request.user.publisher
+        if publisher is not None:
+            drs_query = drs_query.filter(publisher=publisher)
+            rollups = rollups.filter(publisher=publisher)
+            paused_rollups = paused_rollups.filter(publisher=publisher)
         
         # Apply filters to DRS
         if filter_publisher:
             drs_query = drs_query.filter(publisher_id=filter_publisher)
+            rollups = rollups.filter(publisher_id=filter_publisher)
         
         if filter_month:
             try:
@@ -89,92 +112,77 @@ class ValidationListView(LoginRequiredMixin, ListView):
                     start_date__year=year, 
                     start_date__month=month_num
                 )
+                rollups = rollups.filter(day__year=year, day__month=month_num)
             except:
                 pass
         
         if filter_status and filter_status in ['paused', 'completed']:
             drs_query = drs_query.filter(status=filter_status)
+            rollups = rollups.filter(status=filter_status)
         
         # Handle type filter
         if filter_type == 'validation':
             # Show only validations, no DRS
             drs_query = DailyRevenueSheet.objects.none()
+            rollups = DRSDailyRollup.objects.none()
+        
+        # Add the requested page of DRS for validation to context
+        drs_paginator = Paginator(drs_query, self.drs_paginate_by)
+        
+        # Calculate summary for filtered DRS (including paused/completed): the
+        # money totals from the rollups, the row count from the DRS themselves
+        summary = summarize(rollups)
+        summary['total_drs'] = drs_paginator.count
+        context['summary'] = summary
+        
+        drs_page = drs_paginator.get_page(self.request.GET.get('drs_page'))
+        context['drs_page_obj'] = drs_page
+        context['drs_for_validation'] = drs_page.object_list
+        context['filter_query'] = urlencode({
+            key: value for key, value in (
+                ('type', filter_type), ('publisher', filter_publisher),
+                ('month', filter_month), ('status', filter_status),
+            ) if value
+        })
         
-        # Add DRS for validation to context
-        context['drs_for_validation'] = drs_query
-        
-        # Calculate summary for filtered DRS (including paused/completed)
-        context['summary'] = {
-            'total_drs': drs_query.count(),
-            'total_conversions': drs_query.aggregate(
-                total=Sum('publisher_conversions')
-            )['total'] or 0,
-            'total_revenue': drs_query.aggregate(
-                total=Sum('revenue')
-            )['total'] or 0,
-            'total_payout': drs_query.aggregate(
-                total=Sum('payout')
-            )['total'] or 0,
-            'total_margin': drs_query.aggregate(
-                total=Sum('profit')
-            )['total'] or 0,
-        }
+        context['selected_publisher'] = filter_publisher
+        context['selected_month'] = filter_month
+        context['filter_type'] = filter_type
+        context['filter_status'] = filter_status
+        
+        # Check if it's an AJAX request
+        if is_ajax:
+            # Return only the table content for AJAX requests; it needs neither
+            # the paused totals nor the filter options
+            context['ajax_request'] = True
+            return context
         
-        # Get paused campaigns data
+        # Paused campaigns (rows are only fetched if a template iterates them)
         paused_campaigns = DailyRevenueSheet.objects.filter(
             status='paused'
-        ).order_by('-start_date')
-        
-        if hasattr(self.request.user, 'publisher'):
-            paused_campaigns = paused_campaigns.filter(publisher=self.request.user.publisher)
-        
-        # Prepare paused campaigns data
-        paused_campaigns_data = []
-        total_conversions_paused = 0
-        total_amount_paused = 0
-        
-        for campaign in paused_campaigns:
-            data = {
-                'campaign_name': campaign.campaign_name,
-                'pid': campaign.pid,
-                'duration': f"{campaign.start_date.strftime('%Y-%m-%d %H:%M')} - {campaign.end_date.strftime('%H:%M') if campaign.end_date else 'N/A'}",
-                'payout_rate': f"${campaign.publisher_payout:.2f}" if campaign.publisher_payout else "$0.00",
-                'total_conversions': campaign.publisher_conversions or 0,
-                'total_amount': f"${campaign.payout:.2f}" if campaign.payout else "$0.00",
-            }
-            paused_campaigns_data.append(data)
-            total_conversions_paused += campaign.publisher_conversions or 0
-            total_amount_paused += campaign.payout or 0
-        
-        # Add context data
-        context['paused_campaigns'] = paused_campaigns_data
-        context['total_conversions_paused'] = total_conversions_paused
-        context['total_amount_paused'] = total_amount_paused
-        context['publishers'] = Publisher.objects.all()
+        ).select_related('publisher').order_by('-start_date')
+        if publisher is not None:
+            paused_campaigns = paused_campaigns.filter(publisher=publisher)
+        paused = paused_rollups.aggregate(
+            conversions=Sum('publisher_conversions'), amount=Sum('payout'),
+        )
+        context['paused_campaigns'] = paused_campaigns
+        context['total_conversions_paused'] = paused['conversions'] or 0
+        context['total_amount_paused'] = paused['amount'] or 0
+        context['publishers'] = Publisher.objects.only('id', 'company_name').order_by('company_name')
         
         # Get unique months
-        validation_months = Validation.objects.values_list('month', flat=True).distinct()
-        drs_months = DailyRevenueSheet.objects.filter(
-            start_date__isnull=False
-        ).dates('start_date', 'month', order='DESC')
+        validation_months = Validation.objects.order_by().values_list('month', flat=True).distinct()
+        drs_months = DRSDailyRollup.objects.dates('day', 'month', order='DESC')
         
         all_months = set()
         for month in validation_months:
             if month:
                 all_months.add(month)
-        for date in drs_months:
-            all_months.add(date.strftime('%Y-%m'))
+        for month_start in drs_months:
+            all_months.add(month_start.strftime('%Y-%m'))
         
         context['months'] = sorted(all_months, reverse=True)
-        context['selected_publisher'] = filter_publisher
-        context['selected_month'] = filter_month
-        context['filter_type'] = filter_type
-        context['filter_status'] = filter_status
-        
-        # Check if it's an AJAX request
-        if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            # Return only the table content for AJAX requests
-            context['ajax_request'] = True
         
         return context
     
@@ -430,13 +438,14 @@ class ValidationExportView(TemplateView):
 class ValidationTabView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
     """Validation Tab - Shows saved validation reports grouped by month"""
     template_name = 'validation/validation_tab.html'
+    # Newest month sections rendered with the page; older ones load when scrolled to
+    eager_months = 1
     
     def test_func(self):
         # Allow all authenticated users to see validation tab
         return self.request.user.is_authenticated
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+    def get_validations(self):
         user = self.request.user
         
         # Determine which publisher's validations to show
@@ -444,68 +453,70 @@ class ValidationTabView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
             # Show impersonated publisher's validations
             publisher_id = self.request.session.get('impersonate_publisher_id')
             publisher = get_object_or_404(Publisher, id=publisher_id)
-            validations = Validation.objects.filter(publisher=publisher)
+            return Validation.objects.filter(publisher=publisher)
         elif hasattr(user, 'publisher'):
             # Show user's own publisher validations
-            validations = Validation.objects.filter(publisher=user.publisher)
-        else:
-            # Admin users - show all validations
-            validations = Validation.objects.all()
+            return Validation.objects.filter(publisher=user.publisher)
+        # Admin users - show all validations
+        return Validation.objects.all()
+    
+    def month_rows(self, validations, months):
+        """Validations of `months` with what the rows and modals display, newest first."""
+        return validations.filter(month__in=months).select_related(
+            'drs', 'publisher', 'invoice'
+        ).order_by('-month', '-created_at')
+    
+    def get(self, request, *args, **kwargs):
+        # Lazy month section: ?month=<month>&fragment=1
+        if request.GET.get('fragment') == '1' and 'month' in request.GET:
+            rows = list(self.month_rows(self.get_validations(), [request.GET['month']]))
+            return JsonResponse({
+                'rows': render_to_string('validation/partials/validation_month_rows.html',
+                                         {'validations': rows}, request),
+                'modals': render_to_string('validation/partials/validation_month_modals.html',
+                                           {'validations': rows}, request),
+            })
+        return super().get(request, *args, **kwargs)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        validations = self.get_validations()
         
-        # Order by month and created date
+        # Order by month and created date (rows are loaded per month section)
         ordered_validations = validations.order_by('-month', '-created_at')
-        context['my_validations'] = ordered_validations
-        
-        # Calculate monthly totals for grouped display
-        monthly_totals = {}
-        for validation in ordered_validations:
-            month = validation.month
-            
-            if month not in monthly_totals:
-                monthly_totals[month] = {
-                    'generated_amount': 0,
-                    'total_payout': 0,
-                    'total_conversions': 0,
-                    'count': 0
-                }
-            
-            # Add to monthly totals
-            # IMPORTANT: If generated_amount doesn't exist, we need an alternative
-            # Option 1: Use another field like total payout multiplied by some factor
-            # Option 2: Calculate from DRS if available
-            # For now, let's use a default value or calculate from DRS
-            
-            # Try to get generated amount from DRS if it exists
-            if hasattr(validation, 'drs') and validation.drs:
-                # If DRS has a revenue field, use it as generated amount
-                # Otherwise, use a calculation or default
-                generated = getattr(validation.drs, 'revenue', 0) or 0
-                # You can adjust this calculation based on your business logic
-                # For example: revenue * some_factor or fixed amount per conversion
-            else:
-                # Default calculation: payout * 10 (adjust this based on your needs)
-                generated = (validation.approve_payout or 0) * 10
-            
-            monthly_totals[month]['generated_amount'] += generated
-            monthly_totals[month]['total_payout'] += validation.approve_payout or 0
-            monthly_totals[month]['total_conversions'] += validation.conversions or 0
-            monthly_totals[month]['count'] += 1
-        
-        context['monthly_totals'] = monthly_totals
-        
-        # Calculate overall summary statistics
-        context['total_conversions'] = validations.aggregate(
-            total=Sum('conversions')
-        )['total'] or 0
-        
-        context['total_payout'] = validations.aggregate(
-            total=Sum('approve_payout')
-        )['total'] or 0
+        context['my_validations'] = ordered_validations.select_related('drs', 'publisher', 'invoice')
+        
+        # Monthly totals for the grouped display, in one grouped query.
+        # The generated amount is the revenue of each validation's DRS.
+        monthly = list(
+            validations.order_by('-month').values('month').annotate(
+                count=Count('id'),
+                generated_amount=Coalesce(Sum('drs__revenue'), Decimal('0')),
+                total_payout=Coalesce(Sum('approve_payout'), Decimal('0')),
+                total_conversions=Coalesce(Sum('conversions'), 0),
+                uploaded_invoices=Count('id', filter=Q(invoice__isnull=False)),
+            )
+        )
+        context['monthly_totals'] = {row['month']: row for row in monthly}
+        
+        # Month sections: the newest ones with their rows, the rest lazy
+        eager = [row['month'] for row in monthly[:self.eager_months]]
+        rows_by_month = {}
+        for validation in self.month_rows(validations, eager):
+            rows_by_month.setdefault(validation.month, []).append(validation)
+        context['month_sections'] = [
+            dict(row, validations=rows_by_month.get(row['month'], []) if row['month'] in eager else None)
+            for row in monthly
+        ]
+        
+        # Calculate overall summary statistics from the monthly totals
+        context['total_conversions'] = sum(row['total_conversions'] for row in monthly)
+        context['total_payout'] = sum(row['total_payout'] for row in monthly)
+        context['total_validations'] = sum(row['count'] for row in monthly)
         
         # Count uploaded invoices
-        context['uploaded_invoices'] = validations.filter(
-            invoice__isnull=False
-        ).count()
+        context['uploaded_invoices'] = sum(row['uploaded_invoices'] for row in monthly)
         
         # Get DRS entries that still need validation (paused or completed)
         drs_query = DailyRevenueSheet.objects.filter(
@@ -645,6 +656,94 @@ class SaveReportView(LoginRequiredMixin, View):
                 'details': error_trace if settings.DEBUG else None
             }, status=500)
                
+class SaveReportBatchView(LoginRequiredMixin, View):
+    """
+    Save Validation for many DRS at once ("validate all"): {"drs_ids": [...]},
+    or {"month": "YYYY-MM", "publisher": id} for the month's DRS awaiting
+    validation. Same permissions and result as SaveReportView per DRS; ids
+    or a publisher that are not integers are a 400.
+    """
+    max_ids = 1000
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+            user = request.user
+
+            # Check permissions once: admins validate any DRS, others the DRS
+            # of their own or the impersonated publisher
+            is_admin = user.is_superuser or user.groups.filter(name__in=['admin', 'subadmin']).exists()
+            publisher_ids = None
+            if not is_admin:
+                publisher_ids = set()
+                if hasattr(user, 'publisher'):
+                    publisher_ids.add(user.publisher.id)
+                impersonated_id = request.session.get('impersonate_publisher_id')
+                if impersonated_id and str(impersonated_id).isdigit():
+                    publisher_ids.add(int(impersonated_id))
+                if not publisher_ids:
+                    return JsonResponse({'error': 'Permission denied'}, status=403)
+
+            results = {}
+            drs_ids = data.get('drs_ids')
+            month = data.get('month')
+            if drs_ids is not None:
+                if not isinstance(drs_ids, list) or not drs_ids:
+                    return JsonResponse({'error': 'No DRS selected'}, status=400)
+                if len(drs_ids) > self.max_ids:
+                    return JsonResponse({'error': f'At most {self.max_ids} DRS per request'}, status=400)
+                ids, invalid = [], []
+                for raw in drs_ids:
+                    try:
+                        ids.append(int(raw))
+                    except (TypeError, ValueError):
+                        invalid.append(str(raw))
+                if invalid:
+                    return JsonResponse({'error': f"Invalid DRS IDs: {', '.join(invalid)}"}, status=400)
+                drs_rows = DailyRevenueSheet.objects.filter(pk__in=ids)
+            elif month:
+                try:
+                    first_day = datetime.strptime(str(month), '%Y-%m').date()
+                except ValueError:
+                    return JsonResponse({'error': 'Month must be YYYY-MM'}, status=400)
+                next_month = date(first_day.year + first_day.month // 12, first_day.month % 12 + 1, 1)
+                ids = None
+                drs_rows = DailyRevenueSheet.objects.filter(
+                    status__in=['paused', 'completed'], start_date__gte=first_day, start_date__lt=next_month,
+                )
+                if data.get('publisher'):
+                    try:
+                        publisher_id = int(data['publisher'])
+                    except (TypeError, ValueError):
+                        return JsonResponse({'error': 'Publisher must be an ID'}, status=400)
+                    drs_rows = drs_rows.filter(publisher_id=publisher_id)
+                if publisher_ids is not None:
+                    drs_rows = drs_rows.filter(publisher_id__in=publisher_ids)
+            else:
+                return JsonResponse({'error': 'DRS IDs or a month are required'}, status=400)
+
+            # Two reads, a bulk insert / update of the validations and one DRS UPDATE
+            results.update(bulk_save_reports(drs_rows, user, publisher_ids))
+            for pk in ids or []:
+                results.setdefault(pk, {'outcome': NOT_FOUND, 'validation_id': None, 'drs_status': None})
+
+            created_count = sum(1 for result in results.values() if result['outcome'] == CREATED)
+            updated_count = sum(1 for result in results.values() if result['outcome'] == UPDATED)
+            return JsonResponse({
+                'success': True,
+                'message': f'{created_count + updated_count} report(s) saved and approved. '
+                           'They will appear in your Validation tab and you can upload invoices.',
+                'created_count': created_count,
+                'updated_count': updated_count,
+                'results': {str(pk): result for pk, result in results.items()},
+            })
+
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'Invalid JSON format'}, status=400)
+        except Exception as e:
+            logger.exception("Error in SaveReportBatchView")
+            return JsonResponse({'error': f'Server error: {str(e)}'}, status=500)
+
 class MyValidationView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     """My Validation Section - Shows publisher's validations"""
     template_name = 'validation/my_validation.html'
@@ -894,25 +993,20 @@ class BulkApproveValidationsView(LoginRequiredMixin, UserPassesTestMixin, View):
             data = json.loads(request.body)
             validation_ids = data.get('validation_ids', [])
             
-            if not validation_ids:
+            if not validation_ids or not isinstance(validation_ids, list):
                 return JsonResponse({'error': 'No validations selected'}, status=400)
             
-            approved_count = 0
-            for validation_id in validation_ids:
-                try:
-                    validation = Validation.objects.get(id=validation_id)
-                    validation.status = 'Approved'
-                    validation.save()
-                    approved_count += 1
-                except Validation.DoesNotExist:
-                    continue
+            # One locking SELECT and two UPDATEs, however many ids
+            results = bulk_transition(validation_ids, 'Approved', user=request.user)
+            approved_count = sum(1 for result in results.values() if result['outcome'] == CHANGED)
             
             messages.success(request, f'{approved_count} validations approved successfully!')
             
             return JsonResponse({
                 'success': True,
                 'message': f'{approved_count} validations approved successfully!',
-                'approved_count': approved_count
+                'approved_count': approved_count,
+                'results': {str(pk): result for pk, result in results.items()},
             })
             
         except json.JSONDecodeError: